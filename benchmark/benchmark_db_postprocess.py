@@ -0,0 +1,124 @@
+# copyright (c) 2025 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Micro-benchmark of DBPostProcess.boxes_from_bitmap against the vectorized
+boxes_from_bitmap_vectorized on synthetic probability maps.
+
+python benchmark/benchmark_db_postprocess.py --num_boxes 1500 --size 1280
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, "..")))
+
+from ppocr.postprocess.db_postprocess import DBPostProcess
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=960, help="Side of the map.")
+    parser.add_argument(
+        "--num_boxes", type=int, default=1000, help="Text boxes drawn per map."
+    )
+    parser.add_argument(
+        "--rotated_ratio",
+        type=float,
+        default=0.2,
+        help="Fraction of boxes drawn with a small rotation.",
+    )
+    parser.add_argument("--num_maps", type=int, default=10, help="Maps to run.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per map.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def synthetic_prob_map(rng, size, num_boxes, rotated_ratio):
+    prob_map = np.zeros((size, size), dtype=np.float32)
+    for _ in range(num_boxes):
+        center = rng.uniform(0, size, 2)
+        box_size = (rng.uniform(8, size / 16), rng.uniform(4, 16))
+        angle = rng.uniform(-10, 10) if rng.rand() < rotated_ratio else 0
+        points = cv2.boxPoints((tuple(center), box_size, angle)).astype(np.int32)
+        cv2.fillPoly(prob_map, [points], float(rng.uniform(0.5, 1.0)))
+    return cv2.GaussianBlur(prob_map, (5, 5), 0)
+
+
+def time_call(func, prob_map, bitmap, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        st = time.time()
+        result = func(prob_map, bitmap, prob_map.shape[1], prob_map.shape[0])
+        best = min(best, time.time() - st)
+    return result, best
+
+
+def main(args):
+    rng = np.random.RandomState(args.seed)
+    post_process = DBPostProcess(thresh=0.3, box_thresh=0.6, unclip_ratio=1.5)
+
+    total_ref, total_vec = 0.0, 0.0
+    num_boxes, num_exact, max_diff, count_mismatch = 0, 0, 0, 0
+    for _ in range(args.num_maps):
+        prob_map = synthetic_prob_map(
+            rng, args.size, args.num_boxes, args.rotated_ratio
+        )
+        bitmap = prob_map > post_process.thresh
+        (ref_boxes, ref_scores), ref_time = time_call(
+            post_process.boxes_from_bitmap, prob_map, bitmap, args.repeat
+        )
+        (vec_boxes, vec_scores), vec_time = time_call(
+            post_process.boxes_from_bitmap_vectorized, prob_map, bitmap, args.repeat
+        )
+        total_ref += ref_time
+        total_vec += vec_time
+        if len(ref_boxes) != len(vec_boxes):
+            count_mismatch += 1
+            continue
+        num_boxes += len(ref_boxes)
+        if len(ref_boxes) > 0:
+            diff = np.abs(ref_boxes - vec_boxes).reshape(len(ref_boxes), -1).max(1)
+            num_exact += int(np.sum(diff == 0))
+            max_diff = max(max_diff, int(diff.max()))
+
+    print("maps: {}, size: {}".format(args.num_maps, args.size))
+    print(
+        "boxes_from_bitmap:            {:.2f} ms/map".format(
+            total_ref / args.num_maps * 1000
+        )
+    )
+    print(
+        "boxes_from_bitmap_vectorized: {:.2f} ms/map".format(
+            total_vec / args.num_maps * 1000
+        )
+    )
+    print("speedup: {:.2f}x".format(total_ref / max(total_vec, 1e-9)))
+    print(
+        "parity: {} boxes, {} exact, max corner diff {} px, "
+        "{} maps with different box count".format(
+            num_boxes, num_exact, max_diff, count_mismatch
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -38,7 +38,9 @@ from ppocr.data.lmdb_dataset import LMDBDataSet, LMDBDataSetSR, LMDBDataSetTable
 from ppocr.data.pgnet_dataset import PGDataSet
 from ppocr.data.pubtab_dataset import PubTabDataSet
 from ppocr.data.multi_scale_sampler import MultiScaleSampler
+from ppocr.data.ratio_sampler import RatioBatchSampler
 from ppocr.data.latexocr_dataset import LaTeXOCRDataSet
+from ppocr.data.sharded_dataset import ShardedRecDataSet, ShardedDataLoader
 
 # for PaddleX dataset_type
 TextDetDataset = SimpleDataSet
@@ -97,6 +99,7 @@ def build_dataloader(config, mode, device, logger, seed=None):
         "PubTabTableRecDataset",
         "KieDataset",
         "LaTeXOCRDataSet",
+        "ShardedRecDataSet",
     ]
     module_name = config[mode]["dataset"]["name"]
     assert module_name in support_dict, Exception(
@@ -114,6 +117,27 @@ def build_dataloader(config, mode, device, logger, seed=None):
         use_shared_memory = loader_config["use_shared_memory"]
     else:
         use_shared_memory = True
+    persistent_workers = loader_config.get("persistent_workers", None)
+
+    if "collate_fn" in loader_config:
+        from . import collate_fn
+
+        collate_fn = getattr(collate_fn, loader_config["collate_fn"])()
+    else:
+        collate_fn = None
+
+    if isinstance(dataset, ShardedRecDataSet):
+        # shards are split over cards and workers by the dataset itself
+        return ShardedDataLoader(
+            dataset=dataset,
+            batch_size=batch_size,
+            drop_last=drop_last,
+            places=device,
+            num_workers=num_workers,
+            return_list=True,
+            use_shared_memory=use_shared_memory,
+            collate_fn=collate_fn,
+        )
 
     if mode == "Train":
         # Distribute data to multiple cards
@@ -121,6 +145,13 @@ def build_dataloader(config, mode, device, logger, seed=None):
             config_sampler = config[mode]["sampler"]
             sampler_name = config_sampler.pop("name")
             batch_sampler = eval(sampler_name)(dataset, **config_sampler)
+        elif getattr(dataset, "ratio_list", None) is not None:
+            batch_sampler = RatioBatchSampler(
+                dataset=dataset,
+                batch_size=batch_size,
+                shuffle=shuffle,
+                drop_last=drop_last,
+            )
         else:
             batch_sampler = DistributedBatchSampler(
                 dataset=dataset,
@@ -134,12 +165,13 @@ def build_dataloader(config, mode, device, logger, seed=None):
             dataset=dataset, batch_size=batch_size, shuffle=shuffle, drop_last=drop_last
         )
 
-    if "collate_fn" in loader_config:
-        from . import collate_fn
+    if persistent_workers is None:
+        # the ratio sampler draws new subsets in the main process, so the
+        # workers can stay alive across epochs
+        persistent_workers = num_workers > 0 and isinstance(
+            batch_sampler, RatioBatchSampler
+        )
 
-        collate_fn = getattr(collate_fn, loader_config["collate_fn"])()
-    else:
-        collate_fn = None
     data_loader = DataLoader(
         dataset=dataset,
         batch_sampler=batch_sampler,
@@ -148,6 +180,7 @@ def build_dataloader(config, mode, device, logger, seed=None):
         return_list=True,
         use_shared_memory=use_shared_memory,
         collate_fn=collate_fn,
+        persistent_workers=persistent_workers,
     )
 
     return data_loader
@@ -0,0 +1,162 @@
+# copyright (c) 2025 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+On-disk cache of the output of the deterministic head of an eval transform
+list, e.g. DecodeImage and the resize ops.
+
+Entries live in `cache_dir/<hash of the cached op configs>/`. Every process
+appends to its own pair of segment files, so DataLoader workers never write
+to the same file:
+    <segment>.bin   raw bytes of the numpy arrays of the cached samples
+    <segment>.idx   length prefixed pickles of (key, meta), meta holds the
+                    non-array values and (offset, dtype, shape) of each array
+Arrays are returned as copy-on-write memory maps of the .bin files, so the
+ops after the cached ones may still modify them in place.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import uuid
+
+import numpy as np
+
+__all__ = ["EvalDataCache"]
+
+_LENGTH = struct.Struct("<Q")
+# Global keys that create_operators passes to the ops and that change outputs
+_GLOBAL_KEYS = ("character_dict_path", "use_space_char", "max_text_length")
+
+
+class EvalDataCache(object):
+    """
+    args:
+        cache_dir(str): root directory of the cache
+        op_param_list(list): configs of the cached ops, part of the cache key
+        global_config(dict): Global section of the config
+    """
+
+    def __init__(self, cache_dir, op_param_list, global_config=None):
+        global_config = global_config or {}
+        signature = json.dumps(
+            {
+                "ops": op_param_list,
+                "global": {k: global_config.get(k) for k in _GLOBAL_KEYS},
+            },
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha1(signature.encode("utf-8")).hexdigest()[:16]
+        self.cache_dir = os.path.join(cache_dir, digest)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._pid = None
+
+    def _reset(self):
+        # called in every new process, e.g. after the DataLoader forks workers
+        self._pid = os.getpid()
+        self._entries = {}
+        self._maps = {}
+        self._data_file = None
+        self._index_file = None
+        for name in sorted(os.listdir(self.cache_dir)):
+            if name.endswith(".idx"):
+                self._load_index(name[: -len(".idx")])
+
+    def _load_index(self, segment):
+        with open(os.path.join(self.cache_dir, segment + ".idx"), "rb") as f:
+            while True:
+                head = f.read(_LENGTH.size)
+                if len(head) < _LENGTH.size:
+                    break
+                (length,) = _LENGTH.unpack(head)
+                record = f.read(length)
+                if len(record) < length:
+                    # the writer of this segment was interrupted
+                    break
+                key, meta = pickle.loads(record)
+                self._entries[key] = (segment, meta)
+
+    @staticmethod
+    def make_key(data_line, img_path):
+        """Key of a sample, changes with its label line, the resolved path of
+        its image and the image file."""
+        stat = os.stat(img_path)
+        if isinstance(data_line, str):
+            data_line = data_line.encode("utf-8")
+        img_path = os.path.realpath(img_path).encode("utf-8", "surrogateescape")
+        return hashlib.sha1(
+            b"%s\0%s\0%d\0%d" % (data_line, img_path, stat.st_mtime_ns, stat.st_size)
+        ).hexdigest()
+
+    def _map(self, segment, end):
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            with open(os.path.join(self.cache_dir, segment + ".bin"), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            self._maps[segment] = mapped
+        return mapped
+
+    def get(self, key):
+        if self._pid != os.getpid():
+            self._reset()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        segment, meta = entry
+        values, arrays = meta
+        data = dict(values)
+        for name, (offset, dtype, shape) in arrays.items():
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape))
+            if count == 0:
+                data[name] = np.zeros(shape, dtype=dtype)
+                continue
+            mapped = self._map(segment, offset + count * dtype.itemsize)
+            data[name] = np.frombuffer(
+                mapped, dtype=dtype, count=count, offset=offset
+            ).reshape(shape)
+        return data
+
+    def put(self, key, data):
+        if self._pid != os.getpid():
+            self._reset()
+        if self._data_file is None:
+            segment = "{}-{}".format(self._pid, uuid.uuid4().hex[:8])
+            path = os.path.join(self.cache_dir, segment)
+            self._segment = segment
+            self._data_file = open(path + ".bin", "ab")
+            self._index_file = open(path + ".idx", "ab")
+        values, arrays = {}, {}
+        offset = self._data_file.tell()
+        for name, value in data.items():
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                value = np.ascontiguousarray(value)
+                arrays[name] = (offset, value.dtype.str, value.shape)
+                self._data_file.write(value.tobytes())
+                offset += value.nbytes
+            else:
+                values[name] = value
+        # the arrays must be on disk before the index points at them
+        self._data_file.flush()
+        record = pickle.dumps((key, (values, arrays)), protocol=4)
+        self._index_file.write(_LENGTH.pack(len(record)) + record)
+        self._index_file.flush()
+        self._entries[key] = (self._segment, (values, arrays))
+
+    def __getstate__(self):
+        # open files and memory maps are not shared with other processes
+        return {"cache_dir": self.cache_dir, "_pid": None}
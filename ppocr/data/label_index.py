@@ -0,0 +1,176 @@
+# copyright (c) 2025 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Compiled label index for SimpleDataSet.
+
+A label file `train.txt` is compiled once into two files next to it:
+    train.txt.lidx.blob          the label lines, without line breaks
+    train.txt.lidx.offsets.npy   int64 array of shape (N, 2), (offset, length)
+                                 of every line in the blob
+
+Both are memory mapped when loaded, so the lines are never held in Python
+objects and DataLoader workers share the pages of the OS page cache instead
+of each keeping a copy of the label list. Blank lines are dropped.
+
+Build the index with:
+    python ppocr/data/label_index.py --label_file train.txt val.txt
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+__all__ = ["LabelIndex", "IndexedLabelLines", "build_label_index", "index_prefix"]
+
+INDEX_SUFFIX = ".lidx"
+
+
+def index_prefix(label_file):
+    return label_file + INDEX_SUFFIX
+
+
+def _index_files(prefix):
+    return prefix + ".blob", prefix + ".offsets.npy"
+
+
+def build_label_index(label_file, prefix=None, chunk_lines=1 << 20):
+    """
+    Compile `label_file` into a label index at `prefix` (defaults to
+    `label_file + ".lidx"`) and return the number of indexed lines.
+    The file is streamed, so memory use does not grow with its size.
+    """
+    if prefix is None:
+        prefix = index_prefix(label_file)
+    blob_path, offsets_path = _index_files(prefix)
+    offsets = []
+    chunk = []
+    pos = 0
+    with open(label_file, "rb") as fin, open(blob_path + ".tmp", "wb") as fout:
+        for line in fin:
+            line = line.rstrip(b"\r\n")
+            if len(line.strip()) == 0:
+                continue
+            fout.write(line)
+            chunk.append((pos, len(line)))
+            pos += len(line)
+            if len(chunk) >= chunk_lines:
+                offsets.append(np.array(chunk, dtype=np.int64))
+                chunk = []
+    if len(chunk) > 0 or len(offsets) == 0:
+        offsets.append(np.array(chunk, dtype=np.int64).reshape(-1, 2))
+    offsets = np.concatenate(offsets, axis=0)
+    with open(offsets_path + ".tmp", "wb") as f:
+        np.save(f, offsets)
+    # rename last, so a half written index is never picked up
+    os.replace(blob_path + ".tmp", blob_path)
+    os.replace(offsets_path + ".tmp", offsets_path)
+    return len(offsets)
+
+
+class LabelIndex(object):
+    """
+    Read only view of one compiled label file, `index[i]` returns the bytes of
+    line i. The memory maps are opened on first access, and dropped when the
+    object is pickled, so every DataLoader worker maps the files itself.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.blob_path, self.offsets_path = _index_files(prefix)
+        for path in (self.blob_path, self.offsets_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(
+                    "label index {} does not exist, build it with "
+                    "`python ppocr/data/label_index.py --label_file <file>`".format(
+                        path
+                    )
+                )
+        self._offsets = None
+        self._blob = None
+
+    def _open(self):
+        self._offsets = np.load(self.offsets_path, mmap_mode="r")
+        if os.path.getsize(self.blob_path) > 0:
+            self._blob = np.memmap(self.blob_path, dtype=np.uint8, mode="r")
+        else:
+            # np.memmap refuses empty files
+            self._blob = np.zeros(0, dtype=np.uint8)
+
+    @property
+    def offsets(self):
+        if self._offsets is None:
+            self._open()
+        return self._offsets
+
+    def __len__(self):
+        return self.offsets.shape[0]
+
+    def __getitem__(self, idx):
+        offset, length = self.offsets[idx]
+        return self._blob[offset : offset + length].tobytes()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_offsets"] = None
+        state["_blob"] = None
+        return state
+
+
+class IndexedLabelLines(object):
+    """
+    Drop-in replacement of the `[(line, dir_idx), ...]` list built by
+    SimpleDataSet from several label indexes. Only two integer arrays are
+    kept in memory, the source of each sample and its line in that source.
+    """
+
+    def __init__(self, indexes, source_ids, line_ids):
+        self.indexes = indexes
+        self.source_ids = np.asarray(source_ids, dtype=np.int32)
+        self.line_ids = np.asarray(line_ids, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.line_ids)
+
+    def __getitem__(self, idx):
+        source_id = int(self.source_ids[idx])
+        return self.indexes[source_id][self.line_ids[idx]], source_id
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def shuffle(self, seed=None):
+        perm = np.random.RandomState(seed).permutation(len(self))
+        self.source_ids = self.source_ids[perm]
+        self.line_ids = self.line_ids[perm]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--label_file",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Label files to compile, each gets its own index",
+    )
+    args = parser.parse_args()
+    for label_file in args.label_file:
+        num = build_label_index(label_file)
+        print(
+            "Indexed {} lines of {} to {}".format(
+                num, label_file, index_prefix(label_file)
+            )
+        )
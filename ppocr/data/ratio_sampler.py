@@ -0,0 +1,72 @@
+# copyright (c) 2025 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+from paddle.io import DistributedBatchSampler
+
+__all__ = ["RatioBatchSampler"]
+
+
+class RatioBatchSampler(DistributedBatchSampler):
+    """
+    Distributed batch sampler over a random part of every data source.
+
+    The dataset keeps all its samples, `source_ids` gives the source of each
+    one and `ratio_list` the fraction of every source to use per epoch. A new
+    subset is drawn at every epoch from the epoch number, the same on all
+    cards, so neither the dataset nor the DataLoader is rebuilt between
+    epochs. The epoch moves on by one per iteration, or is set by
+    `set_epoch`.
+    """
+
+    def __init__(self, dataset, batch_size, shuffle=False, drop_last=False, **kwargs):
+        source_ids = np.asarray(dataset.source_ids)
+        self.source_indices = [
+            np.nonzero(source_ids == source_id)[0]
+            for source_id in range(len(dataset.ratio_list))
+        ]
+        self.subset_sizes = [
+            round(len(indices) * ratio)
+            for indices, ratio in zip(self.source_indices, dataset.ratio_list)
+        ]
+        # the parent only splits positions in the subset over cards and
+        # batches, the subset is shuffled here
+        super(RatioBatchSampler, self).__init__(
+            range(sum(self.subset_sizes)),
+            batch_size,
+            shuffle=False,
+            drop_last=drop_last,
+            **kwargs,
+        )
+        self.shuffle_subset = shuffle
+        self.data_source = dataset
+
+    def sample_subset(self, epoch):
+        """Dataset indices used in `epoch`."""
+        rng = np.random.RandomState(epoch)
+        subset = np.concatenate(
+            [
+                rng.choice(indices, size, replace=False)
+                for indices, size in zip(self.source_indices, self.subset_sizes)
+            ]
+        )
+        if self.shuffle_subset:
+            rng.shuffle(subset)
+        return subset
+
+    def __iter__(self):
+        subset = self.sample_subset(self.epoch)
+        self.epoch += 1
+        for batch in super(RatioBatchSampler, self).__iter__():
+            yield [int(subset[idx]) for idx in batch]
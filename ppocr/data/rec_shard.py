@@ -0,0 +1,235 @@
+# copyright (c) 2025 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Packed record shards for ShardedRecDataSet.
+
+A sharded dataset is a directory with a `manifest.json` and shard files:
+    manifest.json       {"version": 1, "num_samples": N,
+                         "shards": [{"name": ..., "num_samples": ...}, ...]}
+    shard-000000.rec    8 byte magic and uint32 version, then one record per
+                        sample: uint32 label length, uint32 image length,
+                        UTF-8 label, encoded image bytes
+
+Shards are only ever read front to back, which suits network filesystems
+much better than the random lookups of LMDB.
+
+Convert SimpleDataSet label files or LMDB directories with:
+    python ppocr/data/rec_shard.py --label_file train.txt --data_dir ./train_data \\
+        --output_dir ./train_shards
+    python ppocr/data/rec_shard.py --lmdb_dir ./lmdb/training --output_dir ./train_shards
+"""
+
+import argparse
+import json
+import os
+import struct
+
+__all__ = [
+    "RecShardWriter",
+    "read_shard",
+    "load_manifest",
+    "convert_label_files",
+    "convert_lmdb",
+]
+
+MAGIC = b"PPOCRREC"
+VERSION = 1
+MANIFEST_NAME = "manifest.json"
+_HEADER = struct.Struct("<8sI")
+_RECORD = struct.Struct("<II")
+_READ_BUFFER = 4 << 20
+
+
+class RecShardWriter(object):
+    """
+    Write (image bytes, label) samples into shards of at most
+    `samples_per_shard` samples, the manifest is written by `close`.
+    """
+
+    def __init__(self, output_dir, samples_per_shard=100000):
+        assert samples_per_shard > 0, "samples_per_shard should be greater than 0"
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.samples_per_shard = samples_per_shard
+        self.shards = []
+        self._file = None
+        self._num = 0
+
+    def _open_shard(self):
+        name = "shard-{:06d}.rec".format(len(self.shards))
+        self._path = os.path.join(self.output_dir, name)
+        self._file = open(self._path + ".tmp", "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION))
+        self._num = 0
+
+    def _close_shard(self):
+        self._file.close()
+        os.replace(self._path + ".tmp", self._path)
+        self.shards.append(
+            {"name": os.path.basename(self._path), "num_samples": self._num}
+        )
+        self._file = None
+
+    def write(self, image, label):
+        if self._file is None:
+            self._open_shard()
+        label = label.encode("utf-8")
+        self._file.write(_RECORD.pack(len(label), len(image)))
+        self._file.write(label)
+        self._file.write(image)
+        self._num += 1
+        if self._num >= self.samples_per_shard:
+            self._close_shard()
+
+    def close(self):
+        if self._file is not None:
+            self._close_shard()
+        manifest = {
+            "version": VERSION,
+            "num_samples": sum(shard["num_samples"] for shard in self.shards),
+            "shards": self.shards,
+        }
+        with open(os.path.join(self.output_dir, MANIFEST_NAME), "w") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def load_manifest(data_dir):
+    with open(os.path.join(data_dir, MANIFEST_NAME), "r") as f:
+        manifest = json.load(f)
+    assert manifest["version"] == VERSION, "unsupported shard version {}".format(
+        manifest["version"]
+    )
+    return manifest
+
+
+def read_shard(path):
+    """Yield the (image bytes, label) samples of the shard at `path` in order."""
+    with open(path, "rb", buffering=_READ_BUFFER) as f:
+        magic, version = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a version {} rec shard".format(path, VERSION))
+        while True:
+            head = f.read(_RECORD.size)
+            if len(head) < _RECORD.size:
+                return
+            label_len, image_len = _RECORD.unpack(head)
+            label = f.read(label_len).decode("utf-8")
+            image = f.read(image_len)
+            if len(image) < image_len:
+                raise ValueError("{} is truncated".format(path))
+            yield image, label
+
+
+def convert_label_files(
+    label_files, data_dirs, output_dir, delimiter="\t", samples_per_shard=100000
+):
+    """
+    Pack the samples of SimpleDataSet label files, `data_dirs` is either one
+    directory for all files or one per file. Samples whose image is missing
+    are skipped. Returns the manifest and the number of skipped samples.
+    """
+    if isinstance(data_dirs, str):
+        data_dirs = [data_dirs] * len(label_files)
+    assert len(data_dirs) == len(label_files)
+    writer = RecShardWriter(output_dir, samples_per_shard)
+    skipped = 0
+    for label_file, data_dir in zip(label_files, data_dirs):
+        with open(label_file, "rb") as f:
+            for line in f:
+                substr = line.decode("utf-8").strip("\r\n").split(delimiter)
+                if len(substr) < 2:
+                    continue
+                file_name, label = substr[0], substr[1]
+                # multiple images -> one gt label, keep the first image
+                if file_name.startswith("["):
+                    file_name = json.loads(file_name)[0]
+                img_path = os.path.join(data_dir, file_name)
+                if not os.path.exists(img_path):
+                    skipped += 1
+                    continue
+                with open(img_path, "rb") as img_f:
+                    writer.write(img_f.read(), label)
+    return writer.close(), skipped
+
+
+def convert_lmdb(lmdb_dir, output_dir, samples_per_shard=100000):
+    """
+    Pack every LMDB database found under `lmdb_dir`, in the layout read by
+    LMDBDataSet. Returns the manifest and the number of skipped samples.
+    """
+    import lmdb
+
+    writer = RecShardWriter(output_dir, samples_per_shard)
+    skipped = 0
+    for dirpath, dirnames, filenames in sorted(os.walk(lmdb_dir + "/")):
+        if dirnames:
+            continue
+        env = lmdb.open(
+            dirpath, max_readers=32, readonly=True, lock=False, readahead=True
+        )
+        with env.begin(write=False) as txn:
+            num_samples = int(txn.get("num-samples".encode()))
+            for index in range(1, num_samples + 1):
+                label = txn.get("label-%09d".encode() % index)
+                image = txn.get("image-%09d".encode() % index)
+                if label is None or image is None:
+                    skipped += 1
+                    continue
+                writer.write(image, label.decode("utf-8"))
+        env.close()
+    return writer.close(), skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--label_file", type=str, nargs="+", default=None, help="Label files"
+    )
+    parser.add_argument(
+        "--data_dir",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Image directory, one for all label files or one per file",
+    )
+    parser.add_argument("--delimiter", type=str, default="\t")
+    parser.add_argument(
+        "--lmdb_dir", type=str, default=None, help="Root of LMDB databases"
+    )
+    parser.add_argument("--output_dir", type=str, required=True)
+    parser.add_argument("--samples_per_shard", type=int, default=100000)
+    args = parser.parse_args()
+    assert (args.label_file is None) != (
+        args.lmdb_dir is None
+    ), "exactly one of --label_file and --lmdb_dir should be given"
+    if args.label_file is not None:
+        assert args.data_dir is not None, "--data_dir is required with --label_file"
+        data_dirs = args.data_dir[0] if len(args.data_dir) == 1 else args.data_dir
+        manifest, skipped = convert_label_files(
+            args.label_file,
+            data_dirs,
+            args.output_dir,
+            args.delimiter,
+            args.samples_per_shard,
+        )
+    else:
+        manifest, skipped = convert_lmdb(
+            args.lmdb_dir, args.output_dir, args.samples_per_shard
+        )
+    print(
+        "Wrote {} samples in {} shards to {}, skipped {}".format(
+            manifest["num_samples"], len(manifest["shards"]), args.output_dir, skipped
+        )
+    )
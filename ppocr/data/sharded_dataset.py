@@ -0,0 +1,232 @@
+# copyright (c) 2025 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import math
+import os
+import traceback
+
+import numpy as np
+import paddle.distributed as dist
+from paddle.io import DataLoader, IterableDataset, get_worker_info
+
+from .imaug import transform, create_operators
+from .rec_shard import load_manifest, read_shard
+
+__all__ = ["ShardedRecDataSet", "ShardedDataLoader"]
+
+
+class ShardedRecDataSet(IterableDataset):
+    """
+    Recognition dataset streamed from the packed record shards written by
+    ppocr/data/rec_shard.py. Shards are read sequentially and assigned to
+    (rank, worker) pairs, shuffling is done by shuffling the shard order every
+    epoch and by a shuffle buffer of `shuffle_buffer_size` samples.
+
+    In shuffle mode every rank yields ceil(num_samples / world_size) samples
+    per epoch, starting over its shards when they run short, so all ranks
+    run the same number of steps. Without shuffle every sample is read once
+    in the order of the shards.
+    """
+
+    def __init__(self, config, mode, logger, seed=None):
+        super(ShardedRecDataSet, self).__init__()
+        self.logger = logger
+        self.mode = mode.lower()
+
+        global_config = config["Global"]
+        dataset_config = config[mode]["dataset"]
+        loader_config = config[mode]["loader"]
+
+        self.data_dir = dataset_config["data_dir"]
+        self.do_shuffle = loader_config["shuffle"]
+        self.shuffle_buffer_size = (
+            dataset_config.get("shuffle_buffer_size", 2000) if self.do_shuffle else 0
+        )
+        self.seed = 0 if seed is None else seed
+        self.epoch = 0
+
+        manifest = load_manifest(self.data_dir)
+        self.shards = [
+            (os.path.join(self.data_dir, shard["name"]), shard["num_samples"])
+            for shard in manifest["shards"]
+        ]
+        self.num_samples = manifest["num_samples"]
+        logger.info(
+            "Initialize sharded dataset {}: {} samples in {} shards".format(
+                self.data_dir, self.num_samples, len(self.shards)
+            )
+        )
+        # read in the main process, the dataset is copied to the workers
+        self.rank = dist.get_rank()
+        self.world_size = dist.get_world_size()
+        self.num_workers = max(loader_config.get("num_workers", 0), 1)
+        if len(self.shards) < self.world_size * self.num_workers:
+            logger.warning(
+                "{} shards for {} readers, every reader scans all shards and "
+                "keeps part of the samples".format(
+                    len(self.shards), self.world_size * self.num_workers
+                )
+            )
+
+        self.ops = create_operators(dataset_config["transforms"], global_config)
+        self.ext_op_transform_idx = dataset_config.get("ext_op_transform_idx", 1)
+        self.ext_data_num = 0
+        for op in self.ops:
+            if hasattr(op, "ext_data_num"):
+                self.ext_data_num = getattr(op, "ext_data_num")
+                break
+        # a new order is drawn every epoch through set_epoch
+        self.need_reset = False
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def _reader_plan(self, reader_id, num_readers):
+        """
+        Shards read by one reader, and the (stride, offset) of the samples it
+        keeps from their concatenation.
+        """
+        order = np.arange(len(self.shards))
+        if self.do_shuffle:
+            # the same permutation on every rank and worker
+            order = np.random.RandomState(self.seed + self.epoch).permutation(order)
+        shards = [self.shards[i] for i in order]
+        if len(shards) >= num_readers:
+            return shards[reader_id::num_readers], 1, 0
+        return shards, num_readers, reader_id
+
+    def _reader_quota(self, reader_id, num_readers):
+        if self.do_shuffle:
+            per_rank = int(math.ceil(self.num_samples / self.world_size))
+            rank_reader = reader_id % self.num_workers
+            quota = per_rank // self.num_workers
+            return quota + int(rank_reader < per_rank % self.num_workers)
+        shards, stride, offset = self._reader_plan(reader_id, num_readers)
+        total = sum(num for _, num in shards)
+        return len(range(offset, total, stride))
+
+    def num_batches(self, batch_size, drop_last):
+        """Batches per epoch on this rank, each worker batches on its own."""
+        num_readers = self.world_size * self.num_workers
+        num_batches = 0
+        for worker_id in range(self.num_workers):
+            num = self._reader_quota(
+                self.rank * self.num_workers + worker_id, num_readers
+            )
+            num_batches += (
+                num // batch_size if drop_last else int(math.ceil(num / batch_size))
+            )
+        return num_batches
+
+    def _iter_raw(self, reader_id, num_readers, repeat):
+        shards, stride, offset = self._reader_plan(reader_id, num_readers)
+        pass_no = 0
+        while True:
+            count = 0
+            for path, _ in shards:
+                for sample in read_shard(path):
+                    if count % stride == offset:
+                        yield sample
+                    count += 1
+            pass_no += 1
+            if not repeat or count == 0:
+                return
+            # start over in a different shard order
+            perm = np.random.RandomState(
+                self.seed + self.epoch + pass_no * 7919 + reader_id
+            )
+            shards = [shards[i] for i in perm.permutation(len(shards))]
+
+    def _decode(self, sample, ops, pool, rng):
+        image, label = sample
+        data = {"image": image, "label": label}
+        if ops is self.ops:
+            data["ext_data"] = self.get_ext_data(pool, rng)
+        try:
+            return transform(data, ops)
+        except Exception:
+            self.logger.error(
+                "When parsing sample with label {}, error happened with msg: {}".format(
+                    label, traceback.format_exc()
+                )
+            )
+            return None
+
+    def get_ext_data(self, pool, rng):
+        """Extra samples for ops like RecConAug, taken from the shuffle buffer."""
+        ext_data = []
+        if self.ext_data_num == 0 or len(pool) == 0:
+            return ext_data
+        load_data_ops = self.ops[: self.ext_op_transform_idx]
+        for _ in range(self.ext_data_num * 4):
+            if len(ext_data) >= self.ext_data_num:
+                break
+            data = self._decode(pool[rng.randint(len(pool))], load_data_ops, pool, rng)
+            if data is not None:
+                ext_data.append(data)
+        return ext_data
+
+    def __iter__(self):
+        worker_info = get_worker_info()
+        worker_id = 0 if worker_info is None else worker_info.id
+        num_readers = self.world_size * self.num_workers
+        reader_id = self.rank * self.num_workers + worker_id
+        quota = self._reader_quota(reader_id, num_readers)
+        rng = np.random.RandomState((self.seed + self.epoch) * num_readers + reader_id)
+        buffer = []
+        produced = 0
+        for sample in self._iter_raw(reader_id, num_readers, self.do_shuffle):
+            if produced >= quota:
+                return
+            if self.shuffle_buffer_size > 1:
+                if len(buffer) < self.shuffle_buffer_size:
+                    buffer.append(sample)
+                    continue
+                idx = rng.randint(len(buffer))
+                sample, buffer[idx] = buffer[idx], sample
+            outs = self._decode(sample, self.ops, buffer, rng)
+            if outs is not None:
+                produced += 1
+                yield outs
+        # without repeat the buffer still holds the tail of the data
+        rng.shuffle(buffer)
+        for sample in buffer:
+            if produced >= quota:
+                return
+            outs = self._decode(sample, self.ops, buffer, rng)
+            if outs is not None:
+                produced += 1
+                yield outs
+
+
+class ShardedDataLoader(DataLoader):
+    """
+    DataLoader of a ShardedRecDataSet. Paddle gives iterable datasets no
+    length, the training loop needs one, so it is computed from the manifest.
+    Every new iteration also moves the dataset to the next epoch.
+    """
+
+    def __init__(self, dataset, batch_size, drop_last, **kwargs):
+        super(ShardedDataLoader, self).__init__(
+            dataset=dataset, batch_size=batch_size, drop_last=drop_last, **kwargs
+        )
+        self._num_batches = dataset.num_batches(batch_size, drop_last)
+        self._epoch = 0
+
+    def __len__(self):
+        return self._num_batches
+
+    def __iter__(self):
+        self.dataset.set_epoch(self._epoch)
+        self._epoch += 1
+        return super(ShardedDataLoader, self).__iter__()
@@ -15,11 +15,14 @@ import numpy as np
 import cv2
 import math
 import os
+import copy
 import json
 import random
 import traceback
 from paddle.io import Dataset
 from .imaug import transform, create_operators
+from .label_index import LabelIndex, IndexedLabelLines, index_prefix
+from .eval_cache import EvalDataCache
 
 
 class SimpleDataSet(Dataset):
@@ -53,14 +56,53 @@ class SimpleDataSet(Dataset):
                 "The length of data_dir list should be the same as the label_file_list."
         self.do_shuffle = loader_config["shuffle"]
         self.seed = seed
+        # parts of the sources are drawn anew every epoch by RatioBatchSampler,
+        # so all lines are kept and the DataLoader is not rebuilt
+        self.need_reset = True in [x < 1 for x in ratio_list]
+        self.ratio_list = None
+        if self.need_reset and self.mode == "train" and "sampler" not in config[mode]:
+            self.ratio_list, ratio_list = ratio_list, [1.0] * data_source_num
+            self.need_reset = False
+        # read labels lazily from the indexes built by ppocr/data/label_index.py
+        self.use_label_index = dataset_config.get("use_label_index", False)
         logger.info("Initialize indexes of datasets:%s" % label_file_list)
-        self.data_lines = self.get_image_info_list(label_file_list, ratio_list)
-        self.data_idx_order_list = list(range(len(self.data_lines)))
+        if self.use_label_index:
+            self.data_lines = self.get_indexed_info_list(label_file_list, ratio_list)
+            self.data_idx_order_list = np.arange(len(self.data_lines))
+        else:
+            self.data_lines = self.get_image_info_list(label_file_list, ratio_list)
+            self.data_idx_order_list = list(range(len(self.data_lines)))
         if self.mode == "train" and self.do_shuffle:
             self.shuffle_data_random()
+        if self.ratio_list is not None:
+            if isinstance(self.data_lines, IndexedLabelLines):
+                self.source_ids = self.data_lines.source_ids
+            else:
+                self.source_ids = np.array(
+                    [dir_idx for _, dir_idx in self.data_lines], dtype=np.int32
+                )
+        # cache the output of the first cache_op_idx (deterministic) eval ops
+        self.cache_op_idx = dataset_config.get("cache_op_idx", 0)
+        self.eval_cache = None
+        if self.mode != "train" and self.cache_op_idx > 0:
+            cache_dir = dataset_config.get(
+                "cache_dir",
+                os.path.join(
+                    global_config.get("save_model_dir", "./output"), "eval_cache"
+                ),
+            )
+            self.eval_cache = EvalDataCache(
+                cache_dir,
+                copy.deepcopy(dataset_config["transforms"][: self.cache_op_idx]),
+                global_config,
+            )
+            logger.info(
+                "Cache eval data of the first {} ops in {}".format(
+                    self.cache_op_idx, self.eval_cache.cache_dir
+                )
+            )
         self.ops = create_operators(dataset_config["transforms"], global_config)
         self.ext_op_transform_idx = dataset_config.get("ext_op_transform_idx", 2)
-        self.need_reset = True in [x < 1 for x in ratio_list]
 
     def get_image_info_list(self, file_list, ratio_list):
         if isinstance(file_list, str):
@@ -77,7 +119,37 @@ class SimpleDataSet(Dataset):
                 data_lines.extend(lines_with_dir)
         return data_lines
 
+    def get_indexed_info_list(self, file_list, ratio_list):
+        if isinstance(file_list, str):
+            file_list = [file_list]
+        indexes, source_ids, line_ids = [], [], []
+        for idx, file in enumerate(file_list):
+            label_index = LabelIndex(index_prefix(file))
+            if os.path.exists(file) and os.path.getmtime(file) > os.path.getmtime(
+                label_index.offsets_path
+            ):
+                self.logger.warning(
+                    "{} is newer than its label index, rebuild the index".format(file)
+                )
+            indexes.append(label_index)
+            num_lines = len(label_index)
+            if self.mode == "train" or ratio_list[idx] < 1.0:
+                rng = np.random.RandomState(self.seed)
+                lines = rng.permutation(num_lines)[: round(num_lines * ratio_list[idx])]
+            else:
+                lines = np.arange(num_lines)
+            line_ids.append(lines)
+            source_ids.append(np.full(len(lines), idx, dtype=np.int32))
+        if len(line_ids) == 0:
+            return IndexedLabelLines(indexes, [], [])
+        return IndexedLabelLines(
+            indexes, np.concatenate(source_ids), np.concatenate(line_ids)
+        )
+
     def shuffle_data_random(self):
+        if isinstance(self.data_lines, IndexedLabelLines):
+            self.data_lines.shuffle(self.seed)
+            return
         random.seed(self.seed)
         random.shuffle(self.data_lines)
         return
@@ -127,6 +199,20 @@ class SimpleDataSet(Dataset):
             ext_data.append(data)
         return ext_data
 
+    def get_cached_data(self, data, data_line):
+        key = self.eval_cache.make_key(data_line, data["img_path"])
+        cached = self.eval_cache.get(key)
+        if cached is None:
+            with open(data["img_path"], "rb") as f:
+                data["image"] = f.read()
+            data["ext_data"] = self.get_ext_data()
+            data["filename"] = data["img_path"]
+            cached = transform(data, self.ops[: self.cache_op_idx])
+            if cached is None:
+                return None
+            self.eval_cache.put(key, cached)
+        return transform(cached, self.ops[self.cache_op_idx :])
+
     def __getitem__(self, idx):
         file_idx = self.data_idx_order_list[idx]
         data_line, dir_idx = self.data_lines[file_idx]
@@ -140,12 +226,15 @@ class SimpleDataSet(Dataset):
             data = {"img_path": img_path, "label": label}
             if not os.path.exists(img_path):
                 raise Exception("{} does not exist!".format(img_path))
-            with open(data["img_path"], "rb") as f:
-                img = f.read()
-                data["image"] = img
-            data["ext_data"] = self.get_ext_data()
-            data["filename"] = data["img_path"]
-            outs = transform(data, self.ops)
+            if self.eval_cache is not None:
+                outs = self.get_cached_data(data, data_line)
+            else:
+                with open(data["img_path"], "rb") as f:
+                    img = f.read()
+                    data["image"] = img
+                data["ext_data"] = self.get_ext_data()
+                data["filename"] = data["img_path"]
+                outs = transform(data, self.ops)
         except:
             self.logger.error(
                 "When parsing line {}, error happened with msg: {}".format(
@@ -175,19 +264,19 @@ class MultiScaleDataSet(SimpleDataSet):
             self.wh_aware()
 
     def wh_aware(self):
-        data_line_new = []
-        wh_ratio = []
-        for item in self.data_lines:
-            data_line_new.append(item)
+        wh_ratio = np.zeros(len(self.data_lines), dtype=np.float64)
+        for lno, item in enumerate(self.data_lines):
             lins, dir_idx = item
             lins = lins.decode("utf-8")
             name, label, w, h = lins.strip("\n").split(self.delimiter)
-            wh_ratio.append(float(w) / float(h))
+            wh_ratio[lno] = float(w) / float(h)
 
-        self.data_lines = data_line_new
-        self.wh_ratio = np.array(wh_ratio)
+        self.wh_ratio = wh_ratio
         self.wh_ratio_sort = np.argsort(self.wh_ratio)
-        self.data_idx_order_list = list(range(len(self.data_lines)))
+        if self.use_label_index:
+            self.data_idx_order_list = np.arange(len(self.data_lines))
+        else:
+            self.data_idx_order_list = list(range(len(self.data_lines)))
 
     def resize_norm_img(self, data, imgW, imgH, padding=True):
         img = data["image"]
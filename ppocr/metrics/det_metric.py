@@ -18,13 +18,25 @@ from __future__ import print_function
 
 __all__ = ["DetMetric", "DetFCEMetric"]
 
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 from .eval_det_iou import DetectionIoUEvaluator
 
 
 class DetMetric(object):
-    def __init__(self, main_indicator="hmean", **kwargs):
+    def __init__(self, main_indicator="hmean", num_workers=0, chunk_size=64, **kwargs):
+        """
+        num_workers: when greater than 0, images are evaluated in that many
+            worker processes while the model keeps running inference. The
+            workers are spawned for every evaluation and shut down by reset
+        chunk_size: number of images sent to a worker at once
+        """
         self.evaluator = DetectionIoUEvaluator()
         self.main_indicator = main_indicator
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.executor = None
         self.reset()
 
     def __call__(self, preds, batch, **kwargs):
@@ -51,8 +63,29 @@ class DetMetric(object):
             det_info_list = [
                 {"points": det_polyon, "text": ""} for det_polyon in pred["points"]
             ]
-            result = self.evaluator.evaluate_image(gt_info_list, det_info_list)
-            self.results.append(result)
+            if self.num_workers > 0:
+                self.chunk.append((gt_info_list, det_info_list))
+            else:
+                result = self.evaluator.evaluate_image(gt_info_list, det_info_list)
+                self.results.append(result)
+        if len(self.chunk) >= self.chunk_size:
+            self.submit_chunk()
+
+    def submit_chunk(self):
+        if len(self.chunk) == 0:
+            return
+        if self.executor is None:
+            # spawn rather than fork, a forked copy of the trainer would inherit
+            # its paddle runtime and threads
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        gts, preds = zip(*self.chunk)
+        self.futures.append(
+            self.executor.submit(self.evaluator.evaluate_images, gts, preds)
+        )
+        self.chunk = []
 
     def get_metric(self):
         """
@@ -62,13 +95,23 @@ class DetMetric(object):
                  'hmean': 0
             }
         """
+        self.submit_chunk()
+        for future in self.futures:
+            self.results.extend(future.result())
 
         metrics = self.evaluator.combine_results(self.results)
         self.reset()
         return metrics
 
     def reset(self):
+        if self.executor is not None:
+            for future in self.futures:
+                future.cancel()
+            self.executor.shutdown(wait=True)
+            self.executor = None
         self.results = []  # clear results
+        self.chunk = []  # images not yet sent to a worker
+        self.futures = []
 
 
 class DetFCEMetric(object):
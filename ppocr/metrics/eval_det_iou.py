@@ -4,11 +4,99 @@ from collections import namedtuple
 import numpy as np
 from shapely.geometry import Polygon
 
+from ppocr.utils.poly_nms import convex_intersection_area, orient_convex, signed_area
+
 """
 reference from :
 https://github.com/MhLiao/DB/blob/3c32b808d4412680310d3d28eeb6a2d5bf1566c5/concern/icdar2015_eval/detection/iou.py#L8
+
+Convex quadrilaterals, which covers boxes and quads from every quad based
+detector, take a vectorized path: all overlapping gt/det pairs are clipped
+against each other at once in NumPy. Shapely is only used for polygons with
+more points, concave or invalid ones.
 """
 
+# quads holds the counter-clockwise float64 vertices of the polygons that are
+# convex quadrilaterals (is_quad), shapes the shapely polygons of the others
+PolygonSet = namedtuple("PolygonSet", "quads is_quad shapes areas extents")
+
+
+def convex_quads(points_list):
+    """
+    Stack the polygons of `points_list` that have 4 points into an (N, 4, 2)
+    array oriented counter-clockwise, and flag those that are strictly convex.
+    Shapely considers exactly these quadrilaterals valid without checking.
+    """
+    quads = np.zeros((len(points_list), 4, 2), dtype=np.float64)
+    is_quad = np.zeros(len(points_list), dtype=bool)
+    for n, points in enumerate(points_list):
+        points = np.asarray(points, dtype=np.float64)
+        if points.shape == (4, 2):
+            quads[n] = points
+            is_quad[n] = True
+    quads, convex = orient_convex(quads)
+    return quads, is_quad & convex
+
+
+def valid_polygons(points_list):
+    """
+    Keep the polygons of `points_list` that shapely considers valid.
+    return:
+        keep(ndarray): indices of the valid polygons in `points_list`
+        polygons(PolygonSet): the valid polygons
+    """
+    quads, is_quad = convex_quads(points_list)
+    keep, shapes = [], []
+    for n, points in enumerate(points_list):
+        if is_quad[n]:
+            keep.append(n)
+            shapes.append(None)
+            continue
+        shape = Polygon(points)
+        if shape.is_valid:
+            keep.append(n)
+            shapes.append(shape)
+    keep = np.array(keep, dtype=np.int64)
+    quads, is_quad = quads[keep], is_quad[keep]
+    areas = signed_area(quads)
+    extents = np.concatenate([quads.min(axis=1), quads.max(axis=1)], axis=1)
+    for n, shape in enumerate(shapes):
+        if shape is not None:
+            areas[n] = shape.area
+            extents[n] = shape.bounds
+    return keep, PolygonSet(quads, is_quad, shapes, areas, extents)
+
+
+def _shape(polygons, n):
+    shape = polygons.shapes[n]
+    return Polygon(polygons.quads[n]) if shape is None else shape
+
+
+def intersection_matrix(polygons_a, polygons_b):
+    """Intersection areas between every polygon of two PolygonSets."""
+    inter = np.zeros((len(polygons_a.areas), len(polygons_b.areas)))
+    ext_a = polygons_a.extents[:, np.newaxis, :]
+    ext_b = polygons_b.extents[np.newaxis, :, :]
+    # pairs whose bounding boxes do not overlap cannot intersect
+    overlap = (
+        np.minimum(ext_a[..., 2], ext_b[..., 2])
+        > np.maximum(ext_a[..., 0], ext_b[..., 0])
+    ) & (
+        np.minimum(ext_a[..., 3], ext_b[..., 3])
+        > np.maximum(ext_a[..., 1], ext_b[..., 1])
+    )
+    rows, cols = np.nonzero(overlap)
+    fast = polygons_a.is_quad[rows] & polygons_b.is_quad[cols]
+    if fast.any():
+        inter[rows[fast], cols[fast]] = convex_intersection_area(
+            polygons_a.quads[rows[fast]], polygons_b.quads[cols[fast]]
+        )
+    for row, col in zip(rows[~fast], cols[~fast]):
+        inter[row, col] = (
+            _shape(polygons_a, row).intersection(_shape(polygons_b, col)).area
+        )
+    return inter
+
 
 class DetectionIoUEvaluator(object):
     def __init__(self, iou_constraint=0.5, area_precision_constraint=0.5):
@@ -16,179 +104,37 @@ class DetectionIoUEvaluator(object):
         self.area_precision_constraint = area_precision_constraint
 
     def evaluate_image(self, gt, pred):
-        def get_union(pD, pG):
-            return Polygon(pD).union(Polygon(pG)).area
-
-        def get_intersection_over_union(pD, pG):
-            return get_intersection(pD, pG) / get_union(pD, pG)
-
-        def get_intersection(pD, pG):
-            return Polygon(pD).intersection(Polygon(pG)).area
-
-        def compute_ap(confList, matchList, numGtCare):
-            correct = 0
-            AP = 0
-            if len(confList) > 0:
-                confList = np.array(confList)
-                matchList = np.array(matchList)
-                sorted_ind = np.argsort(-confList)
-                confList = confList[sorted_ind]
-                matchList = matchList[sorted_ind]
-                for n in range(len(confList)):
-                    match = matchList[n]
-                    if match:
-                        correct += 1
-                        AP += float(correct) / (n + 1)
-
-                if numGtCare > 0:
-                    AP /= numGtCare
-
-            return AP
-
-        perSampleMetrics = {}
-
-        matchedSum = 0
-
-        Rectangle = namedtuple("Rectangle", "xmin ymin xmax ymax")
-
-        numGlobalCareGt = 0
-        numGlobalCareDet = 0
-
-        arrGlobalConfidences = []
-        arrGlobalMatches = []
-
-        recall = 0
-        precision = 0
-        hmean = 0
+        gt_keep, gtPols = valid_polygons([g["points"] for g in gt])
+        _, detPols = valid_polygons([p["points"] for p in pred])
+        numGt, numDet = len(gt_keep), len(detPols.areas)
+        # Ground Truth Polygons marked as don't Care
+        gtDontCare = np.array([bool(gt[n]["ignore"]) for n in gt_keep], dtype=bool)
+        # Detected Polygons matched with a don't Care GT
+        detDontCare = np.zeros(numDet, dtype=bool)
 
         detMatched = 0
-
-        iouMat = np.empty([1, 1])
-
-        gtPols = []
-        detPols = []
-
-        gtPolPoints = []
-        detPolPoints = []
-
-        # Array of Ground Truth Polygons' keys marked as don't Care
-        gtDontCarePolsNum = []
-        # Array of Detected Polygons' matched with a don't Care GT
-        detDontCarePolsNum = []
-
-        pairs = []
-        detMatchedNums = []
-
-        arrSampleConfidences = []
-        arrSampleMatch = []
-
-        evaluationLog = ""
-
-        for n in range(len(gt)):
-            points = gt[n]["points"]
-            dontCare = gt[n]["ignore"]
-            if not Polygon(points).is_valid:
-                continue
-
-            gtPol = points
-            gtPols.append(gtPol)
-            gtPolPoints.append(points)
-            if dontCare:
-                gtDontCarePolsNum.append(len(gtPols) - 1)
-
-        evaluationLog += (
-            "GT polygons: "
-            + str(len(gtPols))
-            + (
-                " (" + str(len(gtDontCarePolsNum)) + " don't care)\n"
-                if len(gtDontCarePolsNum) > 0
-                else "\n"
-            )
-        )
-
-        for n in range(len(pred)):
-            points = pred[n]["points"]
-            if not Polygon(points).is_valid:
-                continue
-
-            detPol = points
-            detPols.append(detPol)
-            detPolPoints.append(points)
-            if len(gtDontCarePolsNum) > 0:
-                for dontCarePol in gtDontCarePolsNum:
-                    dontCarePol = gtPols[dontCarePol]
-                    intersected_area = get_intersection(dontCarePol, detPol)
-                    pdDimensions = Polygon(detPol).area
-                    precision = (
-                        0 if pdDimensions == 0 else intersected_area / pdDimensions
-                    )
-                    if precision > self.area_precision_constraint:
-                        detDontCarePolsNum.append(len(detPols) - 1)
-                        break
-
-        evaluationLog += (
-            "DET polygons: "
-            + str(len(detPols))
-            + (
-                " (" + str(len(detDontCarePolsNum)) + " don't care)\n"
-                if len(detDontCarePolsNum) > 0
-                else "\n"
-            )
-        )
-
-        if len(gtPols) > 0 and len(detPols) > 0:
-            # Calculate IoU and precision matrixs
-            outputShape = [len(gtPols), len(detPols)]
-            iouMat = np.empty(outputShape)
-            gtRectMat = np.zeros(len(gtPols), np.int8)
-            detRectMat = np.zeros(len(detPols), np.int8)
-            for gtNum in range(len(gtPols)):
-                for detNum in range(len(detPols)):
-                    pG = gtPols[gtNum]
-                    pD = detPols[detNum]
-                    iouMat[gtNum, detNum] = get_intersection_over_union(pD, pG)
-
-            for gtNum in range(len(gtPols)):
-                for detNum in range(len(detPols)):
-                    if (
-                        gtRectMat[gtNum] == 0
-                        and detRectMat[detNum] == 0
-                        and gtNum not in gtDontCarePolsNum
-                        and detNum not in detDontCarePolsNum
-                    ):
-                        if iouMat[gtNum, detNum] > self.iou_constraint:
-                            gtRectMat[gtNum] = 1
-                            detRectMat[detNum] = 1
-                            detMatched += 1
-                            pairs.append({"gt": gtNum, "det": detNum})
-                            detMatchedNums.append(detNum)
-                            evaluationLog += (
-                                "Match GT #"
-                                + str(gtNum)
-                                + " with Det #"
-                                + str(detNum)
-                                + "\n"
-                            )
-
-        numGtCare = len(gtPols) - len(gtDontCarePolsNum)
-        numDetCare = len(detPols) - len(detDontCarePolsNum)
-        if numGtCare == 0:
-            recall = float(1)
-            precision = float(0) if numDetCare > 0 else float(1)
-        else:
-            recall = float(detMatched) / numGtCare
-            precision = 0 if numDetCare == 0 else float(detMatched) / numDetCare
-
-        hmean = (
-            0
-            if (precision + recall) == 0
-            else 2.0 * precision * recall / (precision + recall)
-        )
-
-        matchedSum += detMatched
-        numGlobalCareGt += numGtCare
-        numGlobalCareDet += numDetCare
-
+        if numGt > 0 and numDet > 0:
+            interMat = intersection_matrix(gtPols, detPols)
+            if gtDontCare.any():
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    precision = interMat[gtDontCare] / detPols.areas
+                precision[:, detPols.areas == 0] = 0
+                detDontCare = np.any(precision > self.area_precision_constraint, axis=0)
+
+            # Calculate IoU matrix
+            unionMat = gtPols.areas[:, np.newaxis] + detPols.areas - interMat
+            iouMat = interMat / unionMat
+            detFree = ~detDontCare
+            # greedy matching, every gt takes the first free det above the
+            # threshold
+            for gtNum in np.nonzero(~gtDontCare)[0]:
+                matches = detFree & (iouMat[gtNum] > self.iou_constraint)
+                if matches.any():
+                    detFree[np.argmax(matches)] = False
+                    detMatched += 1
+
+        numGtCare = numGt - int(gtDontCare.sum())
+        numDetCare = numDet - int(detDontCare.sum())
         perSampleMetrics = {
             "gtCare": numGtCare,
             "detCare": numDetCare,
@@ -196,6 +142,10 @@ class DetectionIoUEvaluator(object):
         }
         return perSampleMetrics
 
+    def evaluate_images(self, gts, preds):
+        """evaluate_image over lists of images, the unit of work of a worker process"""
+        return [self.evaluate_image(gt, pred) for gt, pred in zip(gts, preds)]
+
     def combine_results(self, results):
         numGlobalCareGt = 0
         numGlobalCareDet = 0
@@ -77,16 +77,27 @@ class TableMetric(object):
         compute_bbox_metric=False,
         box_format="xyxy",
         del_thead_tbody=False,
+        compute_teds=False,
+        teds_n_jobs=1,
         **kwargs,
     ):
         """
 
         @param sub_metrics: configs of sub_metric
         @param main_matric: main_matric for save best_model
+        @param compute_teds: also report the structure TEDS, the parsed
+            ground truth trees are kept across evaluations
+        @param teds_n_jobs: number of processes used to compute TEDS, they are
+            spawned for every evaluation, see TEDS
         @param kwargs:
         """
         self.structure_metric = TableStructureMetric(del_thead_tbody=del_thead_tbody)
         self.bbox_metric = DetMetric() if compute_bbox_metric else None
+        self.teds = None
+        if compute_teds:
+            from ppstructure.table.table_metric import TEDS
+
+            self.teds = TEDS(structure_only=True, n_jobs=teds_n_jobs)
         self.main_indicator = main_indicator
         self.box_format = box_format
         self.reset()
@@ -95,6 +106,16 @@ class TableMetric(object):
         self.structure_metric(pred_label)
         if self.bbox_metric is not None:
             self.bbox_metric(*self.prepare_bbox_metric_input(pred_label))
+        if self.teds is not None:
+            preds, labels = pred_label
+            for (pred, _), target in zip(
+                preds["structure_batch_list"], labels["structure_batch_list"]
+            ):
+                self.pred_htmls.append(self.structure_to_html(pred))
+                self.gt_htmls.append(self.structure_to_html(target))
+
+    def structure_to_html(self, structure):
+        return "<html><body><table>{}</table></body></html>".format("".join(structure))
 
     def prepare_bbox_metric_input(self, pred_label):
         pred_bbox_batch_list = []
@@ -127,6 +148,10 @@ class TableMetric(object):
 
     def get_metric(self):
         structure_metric = self.structure_metric.get_metric()
+        if self.teds is not None:
+            scores = self.teds.batch_evaluate_html(self.pred_htmls, self.gt_htmls)
+            structure_metric["teds"] = sum(scores) / max(len(scores), 1)
+            self.pred_htmls, self.gt_htmls = [], []
         if self.bbox_metric is None:
             return structure_metric
         bbox_metric = self.bbox_metric.get_metric()
@@ -146,6 +171,8 @@ class TableMetric(object):
         self.structure_metric.reset()
         if self.bbox_metric is not None:
             self.bbox_metric.reset()
+        self.pred_htmls = []
+        self.gt_htmls = []
 
     def format_box(self, box):
         if self.box_format == "xyxy":
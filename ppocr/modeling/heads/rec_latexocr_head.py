@@ -151,8 +151,8 @@ class AbsolutePositionalEmbedding(nn.Layer):
 
         normal_(self.emb.weight)
 
-    def forward(self, x):
-        n = paddle.arange(x.shape[1])
+    def forward(self, x, offset=0):
+        n = paddle.arange(offset, offset + x.shape[1])
         return self.emb(n)[None, :, :]
 
 
@@ -341,7 +341,15 @@ class Attention(nn.Layer):
         prev_attn=None,
         mem=None,
         seq_len=0,
+        cache=None,
     ):
+        """
+        cache: optional dict kept across the steps of incremental decoding.
+        Self attention appends the keys, values and key mask of x to it, cross
+        attention computes the keys and values of context once and reuses
+        them. A cached call may only hold more than one query on its first
+        step, when the cache is still empty.
+        """
         if not self.training:
             self.is_export = True
         b, n, _, h, talking_heads, collab_heads, has_context = (
@@ -361,14 +369,15 @@ class Attention(nn.Layer):
             k_input = paddle.concat((mem, k_input), axis=-2)
             v_input = paddle.concat((mem, v_input), axis=-2)
 
+        cached_len = 0
+        if exists(cache) and not has_context and "k" in cache:
+            cached_len = cache["k"].shape[-2]
+
         if exists(sinusoidal_emb):
             # in shortformer, the query would start at a position offset depending on the past cached memory
             offset = k_input.shape[-2] - q_input.shape[-2]
-            q_input = q_input + sinusoidal_emb(q_input, offset=offset)
-            k_input = k_input + sinusoidal_emb(k_input)
-        q = self.to_q(q_input)
-        k = self.to_k(k_input)
-        v = self.to_v(v_input)
+            q_input = q_input + sinusoidal_emb(q_input, offset=offset + cached_len)
+            k_input = k_input + sinusoidal_emb(k_input, offset=cached_len)
 
         def rearrange_q_k_v(x, h, is_export):
             if is_export:
@@ -378,9 +387,19 @@ class Attention(nn.Layer):
             d = h_d // h
             return x.reshape([b, n, h, d]).transpose([0, 2, 1, 3])
 
-        q, k, v = map(
-            lambda t: rearrange_q_k_v(t, h, is_export=self.is_export), (q, k, v)
-        )
+        q = rearrange_q_k_v(self.to_q(q_input), h, is_export=self.is_export)
+        if exists(cache) and has_context and "k" in cache:
+            k, v = cache["k"], cache["v"]
+        else:
+            k, v = map(
+                lambda t: rearrange_q_k_v(t, h, is_export=self.is_export),
+                (self.to_k(k_input), self.to_v(v_input)),
+            )
+            if exists(cache):
+                if cached_len > 0:
+                    k = paddle.concat((cache["k"], k), axis=-2)
+                    v = paddle.concat((cache["v"], v), axis=-2)
+                cache["k"], cache["v"] = k, v
 
         input_mask = None
         if any(map(exists, (mask, context_mask))):
@@ -391,6 +410,10 @@ class Attention(nn.Layer):
                 ).cast(paddle.bool),
             )
             k_mask = q_mask if not exists(context) else context_mask
+            if exists(cache) and not has_context:
+                if cached_len > 0:
+                    k_mask = paddle.concat((cache["mask"], k_mask), axis=-1)
+                cache["mask"] = k_mask
             k_mask = default(
                 k_mask, lambda: paddle.ones((b, k.shape[-2])).cast(paddle.bool)
             )
@@ -424,7 +447,8 @@ class Attention(nn.Layer):
             dots.masked_fill_(~input_mask, mask_value)
             del input_mask
 
-        if self.causal:
+        # a single cached query comes after all keys and needs no causal mask
+        if self.causal and not (exists(cache) and n == 1):
             i, j = dots.shape[-2:]
             r = paddle.arange(i)
             r_shape = r.shape[0]
@@ -607,10 +631,17 @@ class AttentionLayers(nn.Layer):
         mems=None,
         seq_len=0,
         return_hiddens=False,
+        cache=None,
     ):
+        """
+        cache: optional list with one dict per layer, see Attention.forward
+        """
         assert not (
             self.cross_attend ^ exists(context)
         ), "context must be passed in if cross_attend is set to True"
+        assert not (
+            exists(cache) and exists(mems)
+        ), "cache and mems can not be used together"
 
         hiddens = []
         intermediates = []
@@ -643,6 +674,7 @@ class AttentionLayers(nn.Layer):
                     rotary_pos_emb=rotary_pos_emb,
                     prev_attn=prev_attn,
                     mem=layer_mem,
+                    cache=cache[ind] if exists(cache) else None,
                 )
             elif layer_type == "c":
                 out, inter = block(
@@ -651,6 +683,7 @@ class AttentionLayers(nn.Layer):
                     mask=mask,
                     context_mask=context_mask,
                     prev_attn=prev_cross_attn,
+                    cache=cache[ind] if exists(cache) else None,
                 )
             elif layer_type == "f":
                 out = block(x)
@@ -773,17 +806,30 @@ class TransformerDecoder(nn.Layer):
         return_attn=False,
         seq_len=0,
         mems=None,
+        cache=None,
+        offset=0,
         **kwargs,
     ):
+        """
+        cache(list): per layer dicts of incremental decoding, see
+            AttentionLayers.forward, x then only holds the new tokens
+        offset(int): position of the first token of x
+        """
         b, n, num_mem = *x.shape, self.num_memory_tokens
         x = self.token_emb(x)
-        x = x + self.pos_emb(x)
+        x = x + self.pos_emb(x, offset=offset)
 
         x = self.emb_dropout(x)
         x = self.project_emb(x)
 
         x, intermediates = self.attn_layers(
-            x, mask=mask, mems=mems, return_hiddens=True, seq_len=seq_len, **kwargs
+            x,
+            mask=mask,
+            mems=mems,
+            return_hiddens=True,
+            seq_len=seq_len,
+            cache=cache,
+            **kwargs,
         )
         x = self.norm(x)
         if paddle.device.get_device().startswith("npu"):
@@ -843,6 +889,7 @@ class LaTeXOCRHead(nn.Layer):
       tgt_seq: LaTeX-OCR labels with shape [N, L] , L is the max sequence length
       xi: The first N-1 LaTeX-OCR sequences in tgt_seq with shape [N, L-1]
       mask: The first N-1 LaTeX-OCR attention mask with shape [N, L-1]  , L is the max sequence length
+      greedy: Pick the most likely token at every step instead of sampling, which makes the prediction deterministic
 
     Returns:
       The predicted LaTeX sequences with shape [N, L-1, C], C is the number of LaTeX classes
@@ -856,6 +903,7 @@ class LaTeXOCRHead(nn.Layer):
         pad_value=0,
         decoder_args=None,
         is_export=False,
+        greedy=False,
     ):
         super().__init__()
         decoder = Decoder(
@@ -872,11 +920,23 @@ class LaTeXOCRHead(nn.Layer):
         self.eos_token = 2
         self.max_length = 512
         self.pad_value = pad_value
+        self.greedy = greedy
 
         self.net = transformer_decoder
         self.max_seq_len = self.net.max_seq_len
         self.is_export = is_export
 
+    def _next_tokens(self, logits, temperature, filter_logits_fn, filter_thres):
+        if self.greedy:
+            return paddle.argmax(logits, axis=-1, keepdim=True)
+        if filter_logits_fn in {top_k, top_p}:
+            filtered_logits = filter_logits_fn(logits, thres=filter_thres)
+
+            probs = F.softmax(filtered_logits / temperature, axis=-1)
+        else:
+            raise NotImplementedError("The filter_logits_fn is not supported ")
+        return paddle.multinomial(probs, 1)
+
     @paddle.no_grad()
     def generate(
         self,
@@ -888,7 +948,13 @@ class LaTeXOCRHead(nn.Layer):
         filter_thres=0.9,
         **kwargs,
     ):
-        was_training = self.net.training
+        """
+        Incremental decoding: the attention layers keep the keys and values
+        of the earlier tokens in a cache, so every step only runs the newest
+        token. Sequences that emitted eos_token are compacted out of the
+        batch together with their cache, and are padded with pad_value up to
+        the length of the longest sequence.
+        """
         num_dims = len(start_tokens.shape)
 
         if num_dims == 1:
@@ -897,35 +963,57 @@ class LaTeXOCRHead(nn.Layer):
         b, t = start_tokens.shape
 
         self.net.eval()
-        out = start_tokens
         mask = kwargs.pop("mask", None)
+        context = kwargs.pop("context", None)
 
         if mask is None:
-            mask = paddle.full_like(out, True, dtype=paddle.bool)
-
-        for _ in range(seq_len):
-            x = out[:, -self.max_seq_len :]
-            mask = mask[:, -self.max_seq_len :]
-            logits = self.net(x, mask=mask, **kwargs)[:, -1, :]
-            if filter_logits_fn in {top_k, top_p}:
-                filtered_logits = filter_logits_fn(logits, thres=filter_thres)
-
-                probs = F.softmax(filtered_logits / temperature, axis=-1)
-            else:
-                raise NotImplementedError("The filter_logits_fn is not supported ")
-
-            sample = paddle.multinomial(probs, 1)
-            out = paddle.concat((out, sample), axis=-1)
-            pad_mask = paddle.full(shape=[mask.shape[0], 1], fill_value=1, dtype="bool")
-            mask = paddle.concat((mask, pad_mask), axis=1)
-            if (
-                eos_token is not None
-                and (
-                    paddle.cumsum((out == eos_token).cast(paddle.int64), 1)[:, -1] >= 1
-                ).all()
-            ):
-                break
-        out = out[:, t:]
+            mask = paddle.full_like(start_tokens, True, dtype=paddle.bool)
+
+        cache = [{} for _ in range(len(self.net.attn_layers.layers))]
+        # the positional embedding has no room for longer sequences
+        seq_len = min(seq_len, self.max_seq_len - t + 1)
+        active = paddle.arange(b)
+        x = start_tokens
+        samples = []
+        for step in range(seq_len):
+            logits = self.net(
+                x,
+                mask=mask,
+                context=context,
+                cache=cache,
+                offset=t + step - x.shape[1],
+                **kwargs,
+            )[:, -1, :]
+            sample = self._next_tokens(
+                logits, temperature, filter_logits_fn, filter_thres
+            ).squeeze(-1)
+            samples.append(
+                paddle.scatter(
+                    paddle.full([b], self.pad_value, dtype=sample.dtype),
+                    active,
+                    sample,
+                )
+            )
+            if eos_token is not None:
+                running = sample != eos_token
+                if not running.any():
+                    break
+                if not running.all():
+                    keep = paddle.nonzero(running).flatten()
+                    active = paddle.gather(active, keep)
+                    sample = paddle.gather(sample, keep)
+                    if context is not None:
+                        context = paddle.gather(context, keep)
+                    cache = [
+                        {key: paddle.gather(val, keep) for key, val in c.items()}
+                        for c in cache
+                    ]
+            x = sample[:, None]
+            mask = paddle.full(shape=[x.shape[0], 1], fill_value=1, dtype="bool")
+        if len(samples) > 0:
+            out = paddle.stack(samples, axis=1)
+        else:
+            out = paddle.zeros([b, 0], dtype=start_tokens.dtype)
         if num_dims == 1:
             out = out.squeeze(0)
         return out
@@ -942,6 +1030,19 @@ class LaTeXOCRHead(nn.Layer):
         filter_thres=0.9,
         **kwargs,
     ):
+        # static graphs can not carry the cache and the shrinking batch
+        # through the loop, only they decode the whole sequence every step
+        if paddle.in_dynamic_mode():
+            return self.generate(
+                start_tokens,
+                seq_len,
+                eos_token=eos_token,
+                context=context,
+                temperature=temperature,
+                filter_logits_fn=filter_logits_fn,
+                filter_thres=filter_thres,
+                **kwargs,
+            )
         was_training = self.net.training
         num_dims = len(start_tokens.shape)
 
@@ -966,12 +1067,9 @@ class LaTeXOCRHead(nn.Layer):
             logits = self.net(x, mask=mask, context=context, seq_len=i_idx, **kwargs)[
                 :, -1, :
             ]
-            if filter_logits_fn in {top_k, top_p}:
-                filtered_logits = filter_logits_fn(logits, thres=filter_thres)
-
-                probs = F.softmax(filtered_logits / temperature, axis=-1)
-
-            sample = paddle.multinomial(probs, 1)
+            sample = self._next_tokens(
+                logits, temperature, filter_logits_fn, filter_thres
+            )
             out = paddle.concat((out, sample), axis=-1)
 
             pad_mask = paddle.full(shape=[mask.shape[0], 1], fill_value=1, dtype="bool")
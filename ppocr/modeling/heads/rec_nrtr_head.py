@@ -170,15 +170,14 @@ class Transformer(nn.Layer):
             memory = src
         dec_seq = paddle.full((bs, 1), 2, dtype=paddle.int64)
         dec_prob = paddle.full((bs, 1), 1.0, dtype=paddle.float32)
+        # incremental decoding keeps the keys and values of the earlier tokens
+        # and of the memory in one cache per decoder layer. Static graphs do
+        # not carry the cache dicts through the loop and rerun the prefix.
+        caches = None
+        if paddle.in_dynamic_mode():
+            caches = [{"self": {}, "cross": {}} for _ in range(len(self.decoder))]
         for len_dec_seq in range(1, paddle.to_tensor(self.max_len)):
-            dec_seq_embed = self.embedding(dec_seq)
-            dec_seq_embed = self.positional_encoding(dec_seq_embed)
-            tgt_mask = self.generate_square_subsequent_mask(dec_seq_embed.shape[1])
-            tgt = dec_seq_embed
-            for decoder_layer in self.decoder:
-                tgt = decoder_layer(tgt, memory, self_mask=tgt_mask)
-            dec_output = tgt
-            dec_output = dec_output[:, -1, :]
+            dec_output = self.decode_last(dec_seq, memory, caches)
             word_prob = F.softmax(self.tgt_word_prj(dec_output), axis=-1)
             preds_idx = paddle.argmax(word_prob, axis=-1)
             if paddle.equal_all(
@@ -194,6 +193,25 @@ class Transformer(nn.Layer):
             )
         return [dec_seq, dec_prob]
 
+    def decode_last(self, dec_seq, memory, caches=None):
+        """
+        Decoder output of the last token of dec_seq. Without caches the whole
+        sequence is decoded under a causal mask. With the per layer caches of
+        the earlier steps only the last token is embedded and decoded, which
+        gives the same output in O(L) instead of O(L^2) per sequence.
+        """
+        if caches is None:
+            tgt = self.positional_encoding(self.embedding(dec_seq))
+            tgt_mask = self.generate_square_subsequent_mask(tgt.shape[1])
+            for decoder_layer in self.decoder:
+                tgt = decoder_layer(tgt, memory, self_mask=tgt_mask)
+        else:
+            tgt = self.embedding(dec_seq[:, -1:])
+            tgt = self.positional_encoding(tgt, offset=dec_seq.shape[1] - 1)
+            for decoder_layer, cache in zip(self.decoder, caches):
+                tgt = decoder_layer(tgt, memory, cache=cache)
+        return tgt[:, -1, :]
+
     def forward_beam(self, images):
         """Translation work in one batch"""
 
@@ -396,7 +414,13 @@ class MultiheadAttention(nn.Layer):
         self.attn_drop = nn.Dropout(dropout)
         self.out_proj = nn.Linear(embed_dim, embed_dim)
 
-    def forward(self, query, key=None, attn_mask=None):
+    def forward(self, query, key=None, attn_mask=None, cache=None):
+        """
+        cache: optional dict kept across the steps of incremental decoding.
+        Self attention appends the keys and values of the query tokens to
+        it, so that query only holds the new tokens; cross attention projects
+        key on the first step and reuses the projection afterwards.
+        """
         qN = query.shape[1]
 
         if self.self_attn:
@@ -406,19 +430,29 @@ class MultiheadAttention(nn.Layer):
                 .transpose((2, 0, 3, 1, 4))
             )
             q, k, v = qkv[0], qkv[1], qkv[2]
+            if cache is not None:
+                if "k" in cache:
+                    k = paddle.concat([cache["k"], k], axis=2)
+                    v = paddle.concat([cache["v"], v], axis=2)
+                cache["k"], cache["v"] = k, v
         else:
-            kN = key.shape[1]
             q = (
                 self.q(query)
                 .reshape([0, qN, self.num_heads, self.head_dim])
                 .transpose([0, 2, 1, 3])
             )
-            kv = (
-                self.kv(key)
-                .reshape((0, kN, 2, self.num_heads, self.head_dim))
-                .transpose((2, 0, 3, 1, 4))
-            )
-            k, v = kv[0], kv[1]
+            if cache is not None and "k" in cache:
+                k, v = cache["k"], cache["v"]
+            else:
+                kN = key.shape[1]
+                kv = (
+                    self.kv(key)
+                    .reshape((0, kN, 2, self.num_heads, self.head_dim))
+                    .transpose((2, 0, 3, 1, 4))
+                )
+                k, v = kv[0], kv[1]
+                if cache is not None:
+                    cache["k"], cache["v"] = k, v
 
         attn = (q.matmul(k.transpose((0, 1, 3, 2)))) * self.scale
 
@@ -475,13 +509,24 @@ class TransformerBlock(nn.Layer):
 
         self.dropout3 = Dropout(residual_dropout_rate)
 
-    def forward(self, tgt, memory=None, self_mask=None, cross_mask=None):
+    def forward(self, tgt, memory=None, self_mask=None, cross_mask=None, cache=None):
+        """
+        cache: optional {"self": {}, "cross": {}} of this layer for
+        incremental decoding, see MultiheadAttention.forward
+        """
         if self.with_self_attn:
-            tgt1 = self.self_attn(tgt, attn_mask=self_mask)
+            tgt1 = self.self_attn(
+                tgt, attn_mask=self_mask, cache=None if cache is None else cache["self"]
+            )
             tgt = self.norm1(tgt + self.dropout1(tgt1))
 
         if self.with_cross_attn:
-            tgt2 = self.cross_attn(tgt, key=memory, attn_mask=cross_mask)
+            tgt2 = self.cross_attn(
+                tgt,
+                key=memory,
+                attn_mask=cross_mask,
+                cache=None if cache is None else cache["cross"],
+            )
             tgt = self.norm2(tgt + self.dropout2(tgt2))
         tgt = self.norm3(tgt + self.dropout3(self.mlp(tgt)))
         return tgt
@@ -519,10 +564,11 @@ class PositionalEncoding(nn.Layer):
         pe = paddle.transpose(pe, [1, 0, 2])
         self.register_buffer("pe", pe)
 
-    def forward(self, x):
+    def forward(self, x, offset=0):
         """Inputs of forward function
         Args:
             x: the sequence fed to the positional encoder model (required).
+            offset: position of the first element of x (default=0).
         Shape:
             x: [sequence length, batch size, embed dim]
             output: [sequence length, batch size, embed dim]
@@ -530,7 +576,7 @@ class PositionalEncoding(nn.Layer):
             >>> output = pos_encoder(x)
         """
         x = x.transpose([1, 0, 2])
-        x = x + self.pe[: x.shape[0], :]
+        x = x + self.pe[offset : offset + x.shape[0], :]
         return self.dropout(x).transpose([1, 0, 2])
 
 
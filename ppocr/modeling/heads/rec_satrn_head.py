@@ -217,19 +217,28 @@ class MultiHeadAttention(nn.Layer):
         self.fc = nn.Linear(self.dim_v, d_model, bias_attr=qkv_bias)
         self.proj_drop = nn.Dropout(dropout)
 
-    def forward(self, q, k, v, mask=None):
+    def forward(self, q, k, v, mask=None, cache=None, static_kv=False):
+        """
+        cache: optional dict kept across the steps of incremental decoding.
+        The projected keys and values of k and v are appended to it, or,
+        with static_kv, computed on the first step and reused afterwards.
+        """
         batch_size, len_q, _ = q.shape
-        _, len_k, _ = k.shape
 
         q = self.linear_q(q).reshape([batch_size, len_q, self.n_head, self.d_k])
-        k = self.linear_k(k).reshape([batch_size, len_k, self.n_head, self.d_k])
-        v = self.linear_v(v).reshape([batch_size, len_k, self.n_head, self.d_v])
-
-        q, k, v = (
-            q.transpose([0, 2, 1, 3]),
-            k.transpose([0, 2, 1, 3]),
-            v.transpose([0, 2, 1, 3]),
-        )
+        q = q.transpose([0, 2, 1, 3])
+        if cache is not None and static_kv and "k" in cache:
+            k, v = cache["k"], cache["v"]
+        else:
+            _, len_k, _ = k.shape
+            k = self.linear_k(k).reshape([batch_size, len_k, self.n_head, self.d_k])
+            v = self.linear_v(v).reshape([batch_size, len_k, self.n_head, self.d_v])
+            k, v = k.transpose([0, 2, 1, 3]), v.transpose([0, 2, 1, 3])
+            if cache is not None:
+                if not static_kv and "k" in cache:
+                    k = paddle.concat([cache["k"], k], axis=2)
+                    v = paddle.concat([cache["v"], v], axis=2)
+                cache["k"], cache["v"] = k, v
 
         if mask is not None:
             if mask.dim() == 3:
@@ -348,8 +357,8 @@ class PositionalEncoding(nn.Layer):
 
         return sinusoid_table.unsqueeze(0)
 
-    def forward(self, x):
-        x = x + self.position_table[:, : x.shape[1]].clone().detach()
+    def forward(self, x, offset=0):
+        x = x + self.position_table[:, offset : offset + x.shape[1]].clone().detach()
         return self.dropout(x)
 
 
@@ -397,8 +406,19 @@ class TFDecoderLayer(nn.Layer):
         ]
 
     def forward(
-        self, dec_input, enc_output, self_attn_mask=None, dec_enc_attn_mask=None
+        self,
+        dec_input,
+        enc_output,
+        self_attn_mask=None,
+        dec_enc_attn_mask=None,
+        cache=None,
     ):
+        """
+        cache: optional {"self": {}, "enc": {}} of this layer for incremental
+        decoding, see MultiHeadAttention.forward
+        """
+        self_cache = None if cache is None else cache["self"]
+        enc_cache = None if cache is None else cache["enc"]
         if self.operation_order == (
             "self_attn",
             "norm",
@@ -408,13 +428,18 @@ class TFDecoderLayer(nn.Layer):
             "norm",
         ):
             dec_attn_out = self.self_attn(
-                dec_input, dec_input, dec_input, self_attn_mask
+                dec_input, dec_input, dec_input, self_attn_mask, cache=self_cache
             )
             dec_attn_out += dec_input
             dec_attn_out = self.norm1(dec_attn_out)
 
             enc_dec_attn_out = self.enc_attn(
-                dec_attn_out, enc_output, enc_output, dec_enc_attn_mask
+                dec_attn_out,
+                enc_output,
+                enc_output,
+                dec_enc_attn_mask,
+                cache=enc_cache,
+                static_kv=True,
             )
             enc_dec_attn_out += dec_attn_out
             enc_dec_attn_out = self.norm2(enc_dec_attn_out)
@@ -432,13 +457,22 @@ class TFDecoderLayer(nn.Layer):
         ):
             dec_input_norm = self.norm1(dec_input)
             dec_attn_out = self.self_attn(
-                dec_input_norm, dec_input_norm, dec_input_norm, self_attn_mask
+                dec_input_norm,
+                dec_input_norm,
+                dec_input_norm,
+                self_attn_mask,
+                cache=self_cache,
             )
             dec_attn_out += dec_input
 
             enc_dec_attn_in = self.norm2(dec_attn_out)
             enc_dec_attn_out = self.enc_attn(
-                enc_dec_attn_in, enc_output, enc_output, dec_enc_attn_mask
+                enc_dec_attn_in,
+                enc_output,
+                enc_output,
+                dec_enc_attn_mask,
+                cache=enc_cache,
+                static_kv=True,
             )
             enc_dec_attn_out += dec_attn_out
 
@@ -519,6 +553,30 @@ class SATRNDecoder(nn.Layer):
 
         return output
 
+    def _attention_step(self, trg_seq, src, caches, src_mask=None):
+        """
+        Decoder output of the last token of trg_seq, given the per layer
+        caches of the earlier tokens; the same as the row of _attention.
+        """
+        step = trg_seq.shape[1] - 1
+        trg_embedding = self.trg_word_emb(trg_seq[:, -1:])
+        tgt = self.dropout(self.position_enc(trg_embedding, offset=step))
+
+        # the causal mask is implied, only padding among the keys is masked
+        trg_mask = self.get_pad_mask(trg_seq, pad_idx=self.padding_idx)
+        output = tgt
+        for dec_layer, cache in zip(self.layer_stack, caches):
+            output = dec_layer(
+                output,
+                src,
+                self_attn_mask=trg_mask,
+                dec_enc_attn_mask=src_mask,
+                cache=cache,
+            )
+        output = self.layer_norm(output)
+
+        return output[:, -1, :]
+
     def _get_mask(self, logit, valid_ratios):
         N, T, _ = logit.shape
         mask = None
@@ -546,15 +604,25 @@ class SATRNDecoder(nn.Layer):
         # bsz * seq_len
         init_target_seq[:, 0] = self.start_idx
 
+        # incremental decoding keeps the keys and values of the earlier tokens
+        # and of out_enc in one cache per layer. Static graphs do not carry the
+        # cache dicts through the loop and rerun the whole sequence.
+        caches = None
+        if paddle.in_dynamic_mode():
+            caches = [{"self": {}, "enc": {}} for _ in range(len(self.layer_stack))]
         outputs = []
         for step in range(0, paddle.to_tensor(self.max_seq_len)):
-            decoder_output = self._attention(
-                init_target_seq, out_enc, src_mask=src_mask
-            )
-            # bsz * seq_len * C
-            step_result = F.softmax(
-                self.classifier(decoder_output[:, step, :]), axis=-1
-            )
+            if caches is None:
+                decoder_output = self._attention(
+                    init_target_seq, out_enc, src_mask=src_mask
+                )
+                # bsz * seq_len * C
+                decoder_output = decoder_output[:, step, :]
+            else:
+                decoder_output = self._attention_step(
+                    init_target_seq[:, : step + 1], out_enc, caches, src_mask=src_mask
+                )
+            step_result = F.softmax(self.classifier(decoder_output), axis=-1)
             # bsz * num_classes
             outputs.append(step_result)
             step_max_index = paddle.argmax(step_result, axis=-1)
@@ -2572,6 +2572,241 @@ class UniMERNetHead(nn.Layer):
             i_idx += 1
         return input_ids
 
+    def _stream_encoder_states(self, encoder_outputs):
+        if not isinstance(encoder_outputs, paddle.Tensor):
+            encoder_outputs = encoder_outputs[0]
+        if self.config_decoder.hidden_size != self.encoder_hidden_size:
+            encoder_outputs = self.enc_to_dec_proj(encoder_outputs)
+        return encoder_outputs
+
+    def _stream_context(self, encoder_hidden_states):
+        """Cross attention keys and values and counting context of new images."""
+        decoder = self.decoder.model.decoder
+        batch_size = encoder_hidden_states.shape[0]
+        cross_cache = []
+        for layer in decoder.layers:
+            attn = layer.encoder_attn
+            cross_cache.append(
+                (
+                    attn._shape(attn.k_proj(encoder_hidden_states), -1, batch_size),
+                    attn._shape(attn.v_proj(encoder_hidden_states), -1, batch_size),
+                )
+            )
+        count_context = None
+        if getattr(self.decoder, "length_aware", False):
+            # the attention of the counting decoder is sequence first and mixes
+            # the images of a batch, so every image is counted on its own
+            count_pred = paddle.concat(
+                [
+                    self.decoder.counting_decoder(encoder_hidden_states[i : i + 1])
+                    for i in range(batch_size)
+                ]
+            )
+            count_context = decoder.counting_context_weight(count_pred)
+        return cross_cache, count_context
+
+    def _stream_step(
+        self,
+        input_ids,
+        positions,
+        attention_mask,
+        self_cache,
+        cross_cache,
+        encoder_hidden_states,
+        count_context,
+    ):
+        """
+        One decoder step of the rows of generate_stream, each at its own
+        position. The self attention caches are right aligned, the keys that
+        do not belong to a row are removed by attention_mask.
+        """
+        decoder = self.decoder.model.decoder
+        hidden_states = decoder.embed_tokens(input_ids) * decoder.embed_scale
+        hidden_states = hidden_states + nn.Embedding.forward(
+            decoder.embed_positions, positions + decoder.embed_positions.offset
+        )
+        if count_context is not None:
+            hidden_states = hidden_states + 0.5 * count_context.unsqueeze(1)
+        hidden_states = decoder.layernorm_embedding(hidden_states)
+        next_cache = []
+        for layer, past_self, past_cross in zip(
+            decoder.layers, self_cache, cross_cache
+        ):
+            layer_outputs = layer(
+                hidden_states,
+                attention_mask=attention_mask,
+                encoder_hidden_states=encoder_hidden_states,
+                past_key_value=past_self + past_cross,
+                use_cache=True,
+            )
+            hidden_states = layer_outputs[0]
+            next_cache.append(layer_outputs[-1][:2])
+        hidden_states = decoder.layer_norm(hidden_states)
+        return self.decoder.lm_head(hidden_states), next_cache
+
+    @paddle.no_grad()
+    def generate_stream(self, encoder_outputs, num_slots=8):
+        """
+        Continuous batching greedy decoding over many formula images.
+
+        Up to num_slots images are decoded together. As soon as one of them
+        emits eos_token_id its slot and key/value cache are freed and the
+        next queued image is admitted in its place, so short formulas do not
+        wait for the longest one of a fixed batch. Every image is decoded
+        exactly as by generate on its own.
+
+        Args:
+            encoder_outputs: iterable of encoder outputs, each one the
+                backbone output of a batch of images or its last_hidden_state.
+                It is consumed lazily, only when slots are free.
+            num_slots (int): Largest number of images decoded together.
+
+        Yields:
+            (index, token_ids): the position of the image in the stream and
+            its int64 token ids, from the start tokens up to and including
+            the first eos_token_id, in the order in which the images finish.
+        """
+        decoder = self.decoder.model.decoder
+        use_parallel = self.config_decoder.use_parallel
+        step = self.config_decoder.parallel_step if use_parallel else 1
+        max_steps = self.max_seq_len // step
+        forced_eos = [
+            (processor.max_length - 1, processor.eos_token_id)
+            for processor in self.logits_processor
+            if isinstance(processor, ForcedEOSTokenLogitsProcessor)
+        ]
+        start_tokens = [self.decoder_start_token_id] * step
+        mask_value = paddle.finfo(paddle.float32).min
+
+        batches = iter(encoder_outputs)
+        queued, queued_offset, next_index = None, 0, 0
+        # per row: its index in the stream, its tokens and its decoder steps
+        rows = []
+        encoder_hidden_states = count_context = None
+        self_cache = cross_cache = None
+        cache_len = 0
+        while True:
+            new_states = []
+            while len(rows) < num_slots:
+                if queued is None or queued_offset == queued.shape[0]:
+                    queued = next(batches, None)
+                    if queued is None:
+                        break
+                    queued = self._stream_encoder_states(queued)
+                    queued_offset = 0
+                take = min(num_slots - len(rows), queued.shape[0] - queued_offset)
+                new_states.append(queued[queued_offset : queued_offset + take])
+                queued_offset += take
+                for _ in range(take):
+                    rows.append([next_index, list(start_tokens), 0])
+                    next_index += 1
+            if len(rows) == 0:
+                return
+            if len(new_states) > 0:
+                new_states = paddle.concat(new_states, axis=0)
+                new_cross, new_count = self._stream_context(new_states)
+                num_new = new_states.shape[0]
+                empty = [
+                    (
+                        paddle.zeros(list(k.shape[:2]) + [cache_len, k.shape[3]]),
+                        paddle.zeros(list(k.shape[:2]) + [cache_len, k.shape[3]]),
+                    )
+                    for k, _ in new_cross
+                ]
+                if encoder_hidden_states is None or num_new == len(rows):
+                    encoder_hidden_states = new_states
+                    cross_cache, count_context, self_cache = new_cross, new_count, empty
+                else:
+                    encoder_hidden_states = paddle.concat(
+                        [encoder_hidden_states, new_states], axis=0
+                    )
+                    cross_cache = [
+                        (paddle.concat([k, nk]), paddle.concat([v, nv]))
+                        for (k, v), (nk, nv) in zip(cross_cache, new_cross)
+                    ]
+                    self_cache = [
+                        (paddle.concat([k, nk]), paddle.concat([v, nv]))
+                        for (k, v), (nk, nv) in zip(self_cache, empty)
+                    ]
+                    if count_context is not None:
+                        count_context = paddle.concat([count_context, new_count])
+
+            # the cache of a row holds all but its last `step` tokens
+            lengths = np.array([len(tokens) - step for _, tokens, _ in rows])
+            input_ids = paddle.to_tensor(
+                [tokens[-step:] for _, tokens, _ in rows], dtype="int64"
+            )
+            positions = paddle.to_tensor(
+                lengths[:, None] + np.arange(step)[None, :], dtype="int64"
+            )
+            key_valid = np.arange(cache_len + step)[None, :] >= (
+                cache_len - lengths[:, None]
+            )
+            attention_mask = paddle.to_tensor(
+                np.where(key_valid, 0.0, mask_value)[:, None, None, :],
+                dtype="float32",
+            )
+            logits, self_cache = self._stream_step(
+                input_ids,
+                positions,
+                attention_mask,
+                self_cache,
+                cross_cache,
+                encoder_hidden_states,
+                count_context,
+            )
+            cache_len += step
+            if use_parallel:
+                next_tokens = paddle.argmax(logits, axis=-1).numpy()
+            else:
+                scores = logits[:, -1, :]
+                # ForcedEOSTokenLogitsProcessor, for the rows of that length
+                for forced_len, eos_token_id in forced_eos:
+                    forced = lengths + step == forced_len
+                    if forced.any():
+                        forced_scores = paddle.full_like(scores, -math.inf)
+                        forced_scores[:, eos_token_id] = 0
+                        scores = paddle.where(
+                            paddle.to_tensor(forced[:, None]), forced_scores, scores
+                        )
+                next_tokens = paddle.argmax(scores, axis=-1).numpy()[:, None]
+
+            keep = []
+            for row_id, row in enumerate(rows):
+                row[1].extend(next_tokens[row_id].tolist())
+                row[2] += 1
+                if self.eos_token_id in row[1][-step:]:
+                    end = len(row[1]) - step + row[1][-step:].index(self.eos_token_id)
+                    yield row[0], np.array(row[1][: end + 1], dtype="int64")
+                elif row[2] == max_steps:
+                    yield row[0], np.array(row[1], dtype="int64")
+                else:
+                    keep.append(row_id)
+            if len(keep) == len(rows):
+                continue
+            rows = [rows[row_id] for row_id in keep]
+            if len(rows) == 0:
+                encoder_hidden_states = count_context = None
+                cache_len = 0
+                continue
+            # drop the finished rows and the cache columns no row needs anymore
+            keep = paddle.to_tensor(keep, dtype="int64")
+            trim = cache_len - max(len(tokens) - step for _, tokens, _ in rows)
+            encoder_hidden_states = paddle.gather(encoder_hidden_states, keep)
+            if count_context is not None:
+                count_context = paddle.gather(count_context, keep)
+            cross_cache = [
+                (paddle.gather(k, keep), paddle.gather(v, keep)) for k, v in cross_cache
+            ]
+            self_cache = [
+                (
+                    paddle.gather(k, keep)[:, :, trim:],
+                    paddle.gather(v, keep)[:, :, trim:],
+                )
+                for k, v in self_cache
+            ]
+            cache_len -= trim
+
     def forwad_train(
         self,
         encoder_outputs,
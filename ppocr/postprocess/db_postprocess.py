@@ -25,6 +25,8 @@ import paddle
 from shapely.geometry import Polygon
 import pyclipper
 
+from .poly_score import polygon_mean_scores
+
 
 class DBPostProcess(object):
     """
@@ -40,6 +42,7 @@ class DBPostProcess(object):
         use_dilation=False,
         score_mode="fast",
         box_type="quad",
+        vectorized=False,
         **kwargs,
     ):
         self.thresh = thresh
@@ -49,6 +52,7 @@ class DBPostProcess(object):
         self.min_size = 3
         self.score_mode = score_mode
         self.box_type = box_type
+        self.vectorized = vectorized
         assert score_mode in [
             "slow",
             "fast",
@@ -124,6 +128,7 @@ class DBPostProcess(object):
             contours, _ = outs[0], outs[1]
 
         num_contours = min(len(contours), self.max_candidates)
+        integral = self.score_integral(pred) if num_contours > 0 else None
 
         boxes = []
         scores = []
@@ -134,7 +139,7 @@ class DBPostProcess(object):
                 continue
             points = np.array(points)
             if self.score_mode == "fast":
-                score = self.box_score_fast(pred, points.reshape(-1, 2))
+                score = self.box_score_fast(pred, points.reshape(-1, 2), integral)
             else:
                 score = self.box_score_slow(pred, contour)
             if self.box_thresh > score:
@@ -157,6 +162,115 @@ class DBPostProcess(object):
             scores.append(score)
         return np.array(boxes, dtype="int32"), scores
 
+    def boxes_from_bitmap_vectorized(self, pred, _bitmap, dest_width, dest_height):
+        """
+        Vectorized variant of boxes_from_bitmap with the same output. The
+        minimum area rectangles and the unclip are still computed per box,
+        the point ordering, scoring and rescaling are done on all candidates
+        at once, and the "fast" scores of all boxes that are axis aligned
+        after integer rounding are read from one summed-area table of pred.
+        _bitmap: single map with shape (H, W),
+                whose values are binarized as {0, 1}
+        """
+        bitmap = _bitmap
+        height, width = bitmap.shape
+
+        outs = cv2.findContours(
+            (bitmap * 255).astype(np.uint8), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE
+        )
+        contours = outs[1] if len(outs) == 3 else outs[0]
+        contours = contours[: self.max_candidates]
+        if len(contours) == 0:
+            return np.zeros((0, 4, 2), dtype="int32"), []
+
+        min_rects = [cv2.minAreaRect(contour) for contour in contours]
+        keep = [
+            index
+            for index, (_, size, _) in enumerate(min_rects)
+            if min(size) >= self.min_size
+        ]
+        if len(keep) == 0:
+            return np.zeros((0, 4, 2), dtype="int32"), []
+        # cv2.boxPoints keeps the candidate points bit-exact with get_mini_boxes
+        points = self._order_mini_boxes(
+            np.array([cv2.boxPoints(min_rects[index]) for index in keep])
+        )
+
+        if self.score_mode == "fast":
+            scores = self.box_score_fast_batch(pred, points, self.score_integral(pred))
+        else:
+            scores = np.array(
+                [self.box_score_slow(pred, contours[index]) for index in keep]
+            )
+        keep = scores >= self.box_thresh
+        points, scores = points[keep], scores[keep]
+
+        # the unclip is the one of boxes_from_bitmap, for the same rounding
+        expanded_rects = []
+        keep = np.zeros(len(points), dtype=bool)
+        for index, box in enumerate(points):
+            box = self.unclip(box, self.unclip_ratio)
+            if len(box) > 1:
+                continue
+            rect = cv2.minAreaRect(np.array(box).reshape(-1, 1, 2))
+            if min(rect[1]) < self.min_size + 2:
+                continue
+            expanded_rects.append(rect)
+            keep[index] = True
+        if len(expanded_rects) == 0:
+            return np.zeros((0, 4, 2), dtype="int32"), []
+        scores = scores[keep]
+
+        boxes = self._order_mini_boxes(
+            np.array([cv2.boxPoints(rect) for rect in expanded_rects])
+        )
+        boxes[..., 0] = np.clip(
+            np.round(boxes[..., 0] / width * dest_width), 0, dest_width
+        )
+        boxes[..., 1] = np.clip(
+            np.round(boxes[..., 1] / height * dest_height), 0, dest_height
+        )
+        return boxes.astype("int32"), scores.tolist()
+
+    @staticmethod
+    def _order_mini_boxes(pts):
+        """
+        The point ordering of get_mini_boxes for an (N, 4, 2) array
+        """
+        order = np.argsort(pts[..., 0], axis=1, kind="stable")
+        pts = np.take_along_axis(pts, order[..., None], axis=1)
+        rows = np.arange(len(pts))
+        left_down = pts[:, 1, 1] > pts[:, 0, 1]
+        right_down = pts[:, 3, 1] > pts[:, 2, 1]
+        index_1 = np.where(left_down, 0, 1)
+        index_4 = 1 - index_1
+        index_2 = np.where(right_down, 2, 3)
+        index_3 = 5 - index_2
+        return np.stack(
+            [
+                pts[rows, index_1],
+                pts[rows, index_2],
+                pts[rows, index_3],
+                pts[rows, index_4],
+            ],
+            axis=1,
+        )
+
+    def box_score_fast_batch(self, bitmap, boxes, integral=None):
+        """
+        box_score_fast for an (N, 4, 2) array of boxes, see polygon_mean_scores
+        """
+        return polygon_mean_scores(bitmap, boxes, integral)
+
+    def score_integral(self, bitmap):
+        """
+        Summed-area table of the whole map, shared by the scores of all boxes
+        of one map, so that both box paths give the same scores
+        """
+        if self.score_mode != "fast":
+            return None
+        return cv2.integral(bitmap.astype(np.float64))
+
     def unclip(self, box, unclip_ratio):
         poly = Polygon(box)
         distance = poly.area * unclip_ratio / poly.length
@@ -186,43 +300,18 @@ class DBPostProcess(object):
         box = [points[index_1], points[index_2], points[index_3], points[index_4]]
         return box, min(bounding_box[1])
 
-    def box_score_fast(self, bitmap, _box):
+    def box_score_fast(self, bitmap, _box, integral=None):
         """
         box_score_fast: use bbox mean score as the mean score
         """
-        h, w = bitmap.shape[:2]
-        box = _box.copy()
-        xmin = np.clip(np.floor(box[:, 0].min()).astype("int32"), 0, w - 1)
-        xmax = np.clip(np.ceil(box[:, 0].max()).astype("int32"), 0, w - 1)
-        ymin = np.clip(np.floor(box[:, 1].min()).astype("int32"), 0, h - 1)
-        ymax = np.clip(np.ceil(box[:, 1].max()).astype("int32"), 0, h - 1)
-
-        mask = np.zeros((ymax - ymin + 1, xmax - xmin + 1), dtype=np.uint8)
-        box[:, 0] = box[:, 0] - xmin
-        box[:, 1] = box[:, 1] - ymin
-        cv2.fillPoly(mask, box.reshape(1, -1, 2).astype("int32"), 1)
-        return cv2.mean(bitmap[ymin : ymax + 1, xmin : xmax + 1], mask)[0]
+        box = np.asarray(_box).reshape(1, -1, 2)
+        return polygon_mean_scores(bitmap, box, integral)[0]
 
     def box_score_slow(self, bitmap, contour):
         """
         box_score_slow: use polyon mean score as the mean score
         """
-        h, w = bitmap.shape[:2]
-        contour = contour.copy()
-        contour = np.reshape(contour, (-1, 2))
-
-        xmin = np.clip(np.min(contour[:, 0]), 0, w - 1)
-        xmax = np.clip(np.max(contour[:, 0]), 0, w - 1)
-        ymin = np.clip(np.min(contour[:, 1]), 0, h - 1)
-        ymax = np.clip(np.max(contour[:, 1]), 0, h - 1)
-
-        mask = np.zeros((ymax - ymin + 1, xmax - xmin + 1), dtype=np.uint8)
-
-        contour[:, 0] = contour[:, 0] - xmin
-        contour[:, 1] = contour[:, 1] - ymin
-
-        cv2.fillPoly(mask, contour.reshape(1, -1, 2).astype("int32"), 1)
-        return cv2.mean(bitmap[ymin : ymax + 1, xmin : xmax + 1], mask)[0]
+        return polygon_mean_scores(bitmap, [np.reshape(contour, (-1, 2))])[0]
 
     def __call__(self, outs_dict, shape_list):
         pred = outs_dict["maps"]
@@ -245,6 +334,10 @@ class DBPostProcess(object):
                 boxes, scores = self.polygons_from_bitmap(
                     pred[batch_index], mask, src_w, src_h
                 )
+            elif self.box_type == "quad" and self.vectorized:
+                boxes, scores = self.boxes_from_bitmap_vectorized(
+                    pred[batch_index], mask, src_w, src_h
+                )
             elif self.box_type == "quad":
                 boxes, scores = self.boxes_from_bitmap(
                     pred[batch_index], mask, src_w, src_h
@@ -268,6 +361,7 @@ class DistillationDBPostProcess(object):
         use_dilation=False,
         score_mode="fast",
         box_type="quad",
+        vectorized=False,
         **kwargs,
     ):
         self.model_name = model_name
@@ -280,6 +374,7 @@ class DistillationDBPostProcess(object):
             use_dilation=use_dilation,
             score_mode=score_mode,
             box_type=box_type,
+            vectorized=vectorized,
         )
 
     def __call__(self, predicts, shape_list):
@@ -18,13 +18,9 @@ from __future__ import print_function
 
 import numpy as np
 from .locality_aware_nms import nms_locality
-import cv2
+from .poly_score import polygon_mean_scores
 import paddle
 
-import os
-from ppocr.utils.utility import check_install
-import sys
-
 
 class EASTPostProcess(object):
     """
@@ -72,24 +68,13 @@ class EASTPostProcess(object):
         boxes[:, :8] = text_box_restored.reshape((-1, 8))
         boxes[:, 8] = score_map[xy_text[:, 0], xy_text[:, 1]]
 
-        try:
-            check_install("lanms", "lanms-nova")
-            import lanms
-
-            boxes = lanms.merge_quadrangle_n9(boxes, nms_thresh)
-        except:
-            print(
-                "You should install lanms by pip3 install lanms-nova to speed up nms_locality"
-            )
-            boxes = nms_locality(boxes.astype(np.float64), nms_thresh)
+        boxes = nms_locality(boxes.astype(np.float64), nms_thresh)
         if boxes.shape[0] == 0:
             return []
         # Here we filter some low score boxes by the average score map,
         #   this is different from the original paper.
-        for i, box in enumerate(boxes):
-            mask = np.zeros_like(score_map, dtype=np.uint8)
-            cv2.fillPoly(mask, box[:8].reshape((-1, 4, 2)).astype(np.int32) // 4, 1)
-            boxes[i, 8] = cv2.mean(score_map, mask)[0]
+        quads = boxes[:, :8].reshape((-1, 4, 2)).astype(np.int32) // 4
+        boxes[:, 8] = polygon_mean_scores(score_map, quads)
         boxes = boxes[boxes[:, 8] > cover_thresh]
         return boxes
 
@@ -6,6 +6,8 @@ This code is referred from: https://github.com/songdejia/EAST/blob/master/locali
 import numpy as np
 from shapely.geometry import Polygon
 
+from ppocr.utils.poly_nms import locality_aware_nms, nms_polygons
+
 
 def intersection(g, p):
     """
@@ -56,16 +58,7 @@ def standard_nms(S, thres):
     """
     Standard nms.
     """
-    order = np.argsort(S[:, 8])[::-1]
-    keep = []
-    while order.size > 0:
-        i = order[0]
-        keep.append(i)
-        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
-
-        inds = np.where(ovr <= thres)[0]
-        order = order[inds + 1]
-
+    keep = nms_polygons(S[:, :8].reshape((-1, 4, 2)), S[:, 8], thres)
     return S[keep]
 
 
@@ -73,34 +66,14 @@ def standard_nms_inds(S, thres):
     """
     Standard nms, return inds.
     """
-    order = np.argsort(S[:, 8])[::-1]
-    keep = []
-    while order.size > 0:
-        i = order[0]
-        keep.append(i)
-        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
-
-        inds = np.where(ovr <= thres)[0]
-        order = order[inds + 1]
-
-    return keep
+    return nms_polygons(S[:, :8].reshape((-1, 4, 2)), S[:, 8], thres).tolist()
 
 
 def nms(S, thres):
     """
     nms.
     """
-    order = np.argsort(S[:, 8])[::-1]
-    keep = []
-    while order.size > 0:
-        i = order[0]
-        keep.append(i)
-        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
-
-        inds = np.where(ovr <= thres)[0]
-        order = order[inds + 1]
-
-    return keep
+    return nms_polygons(S[:, :8].reshape((-1, 4, 2)), S[:, 8], thres).tolist()
 
 
 def soft_nms(boxes_in, Nt_thres=0.3, threshold=0.8, sigma=0.5, method=2):
@@ -176,21 +149,7 @@ def nms_locality(polys, thres=0.3):
     :param polys: a N*9 numpy array. first 8 coordinates, then prob
     :return: boxes after nms
     """
-    S = []
-    p = None
-    for g in polys:
-        if p is not None and intersection(g, p) > thres:
-            p = weighted_merge(g, p)
-        else:
-            if p is not None:
-                S.append(p)
-            p = g
-    if p is not None:
-        S.append(p)
-
-    if len(S) == 0:
-        return np.array([])
-    return standard_nms(np.array(S), thres)
+    return locality_aware_nms(polys, thres)
 
 
 if __name__ == "__main__":
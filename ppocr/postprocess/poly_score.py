@@ -0,0 +1,129 @@
+# copyright (c) 2025 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Mean score of a map inside many polygons, shared by the DB and EAST post
+processes. The result is the one of filling every polygon into a mask of the
+whole map with cv2.fillPoly and taking cv2.mean, but no full size mask is
+ever allocated:
+- polygons that are axis aligned rectangles after integer rounding are
+  scored in O(1) each from one summed-area table of the map;
+- the other polygons are filled into a mask of their clipped bounding box
+  only, so the work is proportional to their area, not to the map size.
+"""
+
+import cv2
+import numpy as np
+
+__all__ = ["polygon_mean_scores"]
+
+
+def _rect_mask(local):
+    """Flag integer quads that are axis aligned rectangles, in either winding."""
+    x, y = local[..., 0], local[..., 1]
+    clockwise = (
+        (y[:, 0] == y[:, 1])
+        & (y[:, 2] == y[:, 3])
+        & (x[:, 0] == x[:, 3])
+        & (x[:, 1] == x[:, 2])
+    )
+    counter_clockwise = (
+        (x[:, 0] == x[:, 1])
+        & (x[:, 2] == x[:, 3])
+        & (y[:, 0] == y[:, 3])
+        & (y[:, 1] == y[:, 2])
+    )
+    return clockwise | counter_clockwise
+
+
+def _polygon_mean_score(score_map, poly, xmin, xmax, ymin, ymax):
+    mask = np.zeros((ymax - ymin + 1, xmax - xmin + 1), dtype=np.uint8)
+    local = (poly - np.array([xmin, ymin], dtype=poly.dtype)).astype(np.int32)
+    cv2.fillPoly(mask, local.reshape(1, -1, 2), 1)
+    return cv2.mean(score_map[ymin : ymax + 1, xmin : xmax + 1], mask)[0]
+
+
+def polygon_mean_scores(score_map, polys, integral=None):
+    """
+    Mean of `score_map` over the pixels cv2.fillPoly sets for each polygon.
+    Float coordinates are truncated relative to the floor of the polygon's
+    bounding box, like DBPostProcess.box_score_fast always did, which leaves
+    integer polygons unchanged. Polygons outside the map score 0.
+    args:
+        score_map(ndarray): (H, W) map
+        polys: (N, K, 2) array, or a list of (K_i, 2) arrays
+        integral(ndarray): float64 cv2.integral of the whole score_map, to
+            share it between calls on one map. Without it only the part of
+            the map under the rectangles is summed.
+    return:
+        (N,) float64 array of mean scores
+    """
+    h, w = score_map.shape[:2]
+    num = len(polys)
+    scores = np.zeros(num, dtype=np.float64)
+    if num == 0:
+        return scores
+    if isinstance(polys, np.ndarray) and polys.ndim == 3:
+        extents = np.concatenate([polys.min(axis=1), polys.max(axis=1)], axis=1)
+    else:
+        polys = [np.asarray(poly).reshape(-1, 2) for poly in polys]
+        extents = [np.concatenate([p.min(axis=0), p.max(axis=0)]) for p in polys]
+    extents = np.asarray(extents, dtype=np.float64)
+    xmin = np.clip(np.floor(extents[:, 0]), 0, w - 1).astype(np.int64)
+    ymin = np.clip(np.floor(extents[:, 1]), 0, h - 1).astype(np.int64)
+    xmax = np.clip(np.ceil(extents[:, 2]), 0, w - 1).astype(np.int64)
+    ymax = np.clip(np.ceil(extents[:, 3]), 0, h - 1).astype(np.int64)
+
+    is_rect = np.zeros(num, dtype=bool)
+    if isinstance(polys, np.ndarray) and polys.shape[1] == 4:
+        origin = np.stack([xmin, ymin], axis=1)[:, np.newaxis, :]
+        local = (polys - origin.astype(polys.dtype)).astype(np.int32)
+        is_rect = _rect_mask(local)
+    if is_rect.any():
+        rows = np.nonzero(is_rect)[0]
+        local = local[rows]
+        # the filled rectangle includes its border and is clipped to the
+        # bounding box mask, it may miss the mask entirely
+        width, height = xmax[rows] - xmin[rows], ymax[rows] - ymin[rows]
+        x0, x1 = local[..., 0].min(axis=1), local[..., 0].max(axis=1)
+        y0, y1 = local[..., 1].min(axis=1), local[..., 1].max(axis=1)
+        inside = (x1 >= 0) & (x0 <= width) & (y1 >= 0) & (y0 <= height)
+        rows = rows[inside]
+        x0 = xmin[rows] + np.clip(x0[inside], 0, width[inside])
+        x1 = xmin[rows] + np.clip(x1[inside], 0, width[inside])
+        y0 = ymin[rows] + np.clip(y0[inside], 0, height[inside])
+        y1 = ymin[rows] + np.clip(y1[inside], 0, height[inside])
+    if is_rect.any() and len(rows) > 0:
+        if integral is None:
+            top, left = y0.min(), x0.min()
+            integral = cv2.integral(
+                score_map[top : y1.max() + 1, left : x1.max() + 1].astype(np.float64)
+            )
+            x0, x1, y0, y1 = x0 - left, x1 - left, y0 - top, y1 - top
+        rect_sum = (
+            integral[y1 + 1, x1 + 1]
+            - integral[y0, x1 + 1]
+            - integral[y1 + 1, x0]
+            + integral[y0, x0]
+        )
+        scores[rows] = rect_sum / ((x1 - x0 + 1) * (y1 - y0 + 1))
+    for index in np.nonzero(~is_rect)[0]:
+        scores[index] = _polygon_mean_score(
+            score_map,
+            polys[index],
+            xmin[index],
+            xmax[index],
+            ymin[index],
+            ymax[index],
+        )
+    return scores
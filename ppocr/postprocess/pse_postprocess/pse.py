@@ -0,0 +1,90 @@
+# copyright (c) 2025 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Progressive scale expansion in NumPy and OpenCV, a port of the Cython
+implementation of:
+https://github.com/whai362/PSENet/blob/python3/models/post_processing/pse
+
+The breadth first search over each kernel runs one BFS layer at a time on
+flat pixel indices and reproduces the order of the original FIFO queue, so
+the label maps are identical to the compiled version.
+"""
+
+import cv2
+import numpy as np
+
+__all__ = ["pse"]
+
+
+def _expand(kernel, pred, queue, height, width):
+    """
+    Grow the labels of `pred` into the pixels set in `kernel`, starting from
+    the flat pixel indices in `queue`. Within a BFS layer, pixels claim their
+    free neighbours (up, down, left, right) in queue order and the first
+    claim wins, exactly like popping a FIFO queue.
+    return:
+        the pixels that did not claim any neighbour, in the order they were
+        processed, which seed the expansion into the next kernel
+    """
+    remaining = []
+    frontier = queue
+    while len(frontier) > 0:
+        rows, cols = np.divmod(frontier, width)
+        neighbours = np.stack(
+            [frontier - width, frontier + width, frontier - 1, frontier + 1], axis=1
+        )
+        valid = np.stack(
+            [rows > 0, rows < height - 1, cols > 0, cols < width - 1], axis=1
+        )
+        neighbours[~valid] = 0
+        valid &= (kernel[neighbours] != 0) & (pred[neighbours] == 0)
+        # candidates ordered by frontier position, then by direction
+        owners = np.nonzero(valid)[0]
+        candidates = neighbours[valid]
+        _, first = np.unique(candidates, return_index=True)
+        first.sort()
+        claimed, claimers = candidates[first], owners[first]
+        pred[claimed] = pred[frontier[claimers]]
+
+        expanded = np.zeros(len(frontier), dtype=bool)
+        expanded[claimers] = True
+        remaining.append(frontier[~expanded])
+        frontier = claimed
+    if len(remaining) == 0:
+        return queue
+    return np.concatenate(remaining)
+
+
+def pse(kernels, min_area):
+    """
+    args:
+        kernels(ndarray): uint8 of shape (K, H, W), the text kernels from the
+            largest to the smallest one
+        min_area(float): seeds in the smallest kernel below this area are
+            dropped
+    return:
+        int32 label map of shape (H, W), 0 is background
+    """
+    kernel_num, height, width = kernels.shape
+    label_num, label = cv2.connectedComponents(kernels[-1], connectivity=4)
+    # drop small seeds, with the areas of all labels from a single pass
+    area = np.bincount(label.ravel(), minlength=label_num)
+    label[(area < min_area)[label]] = 0
+
+    pred = label.astype(np.int32).ravel()
+    queue = np.flatnonzero(pred)
+    flat_kernels = kernels.reshape(kernel_num, -1)
+    for kernel_idx in range(kernel_num - 2, -1, -1):
+        queue = _expand(flat_kernels[kernel_idx], pred, queue, height, width)
+    return pred.reshape(height, width)
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import os
+import math
 import numpy as np
 import paddle
 from paddle.nn import functional as F
@@ -143,6 +144,13 @@ class BaseRecLabelDecode(object):
         return_word_box=False,
     ):
         """convert text-index into text-label."""
+        if (
+            not return_word_box
+            and isinstance(text_index, np.ndarray)
+            and text_index.ndim == 2
+            and (text_prob is None or isinstance(text_prob, np.ndarray))
+        ):
+            return self.decode_batch(text_index, text_prob, is_remove_duplicate)
         result_list = []
         ignored_tokens = self.get_ignored_tokens()
         batch_size = len(text_index)
@@ -188,21 +196,100 @@ class BaseRecLabelDecode(object):
                 result_list.append((text, np.mean(conf_list).tolist()))
         return result_list
 
+    def decode_batch(self, text_index, text_prob=None, is_remove_duplicate=False):
+        """
+        Vectorized `decode` for a [B, T] index matrix without word boxes.
+        The duplicate and ignored-token masks, the text lengths and the mean
+        confidences are computed for the whole batch at once, and characters
+        are looked up through a precomputed table, so the only per-row work
+        left is joining the characters into a string.
+        """
+        selection = np.ones(text_index.shape, dtype=bool)
+        if is_remove_duplicate:
+            selection[:, 1:] = text_index[:, 1:] != text_index[:, :-1]
+        selection &= ~np.isin(text_index, self.get_ignored_tokens())
+        lengths = selection.sum(axis=1)
+
+        if text_prob is not None:
+            conf_sum = np.where(selection, text_prob, 0).sum(axis=1, dtype=np.float64)
+            confs = np.where(lengths > 0, conf_sum / np.maximum(lengths, 1), 0)
+            confs = confs.astype(text_prob.dtype)
+        else:
+            confs = np.ones(len(text_index))
+
+        if getattr(self, "character_table", None) is None or len(
+            self.character_table
+        ) != len(self.character):
+            self.character_table = np.array(self.character, dtype=object)
+        chars = self.character_table[text_index[selection]]
+        char_lists = np.split(chars, np.cumsum(lengths)[:-1])
+
+        result_list = []
+        for char_list, conf in zip(char_lists, confs.tolist()):
+            text = "".join(char_list)
+            if self.reverse:  # for arabic rec
+                text = self.pred_reverse(text)
+            result_list.append((text, conf))
+        return result_list
+
     def get_ignored_tokens(self):
         return [0]  # for ctc blank
 
 
 class CTCLabelDecode(BaseRecLabelDecode):
-    """Convert between text-label and text-index"""
+    """Convert between text-label and text-index
+
+    decode_mode: "greedy" (argmax) or "beam_search" (CTC prefix beam search).
+    The beam search keeps `beam_width` prefixes, only expands the `beam_topk`
+    most likely characters of each frame whose probability is at least
+    `beam_prune_thresh`, and can be biased by a character n-gram model and a
+    lexicon loaded from `lm_path` (see ppocr/utils/ctc_lm.py), weighted by
+    `lm_weight` and `lexicon_weight`. Word boxes always use greedy decoding.
+    """
 
-    def __init__(self, character_dict_path=None, use_space_char=False, **kwargs):
+    def __init__(
+        self,
+        character_dict_path=None,
+        use_space_char=False,
+        decode_mode="greedy",
+        beam_width=10,
+        beam_topk=10,
+        beam_prune_thresh=1e-3,
+        lm_path=None,
+        lm_weight=0.5,
+        lexicon_weight=1.0,
+        **kwargs,
+    ):
         super(CTCLabelDecode, self).__init__(character_dict_path, use_space_char)
+        assert decode_mode in [
+            "greedy",
+            "beam_search",
+        ], "decode_mode must be in [greedy, beam_search] but got: {}".format(
+            decode_mode
+        )
+        self.decode_mode = decode_mode
+        self.beam_width = beam_width
+        self.beam_topk = beam_topk
+        self.beam_prune_thresh = beam_prune_thresh
+        self.lm_weight = lm_weight
+        self.lexicon_weight = lexicon_weight
+        self.lm = None
+        if lm_path is not None:
+            from ppocr.utils.ctc_lm import CharNgramLM
+
+            self.lm = CharNgramLM(lm_path)
 
     def __call__(self, preds, label=None, return_word_box=False, *args, **kwargs):
         if isinstance(preds, tuple) or isinstance(preds, list):
             preds = preds[-1]
         if isinstance(preds, paddle.Tensor):
             preds = preds.numpy()
+        if self.decode_mode == "beam_search" and not return_word_box:
+            text = self.beam_search_decode(preds)
+            if label is None:
+                return text
+            label = self.decode(label)
+            return text, label
         preds_idx = preds.argmax(axis=2)
         preds_prob = preds.max(axis=2)
         text = self.decode(
@@ -225,6 +312,95 @@ class CTCLabelDecode(BaseRecLabelDecode):
         dict_character = ["blank"] + dict_character
         return dict_character
 
+    def beam_search_decode(self, preds):
+        """
+        CTC prefix beam search over [B, T, C] probabilities.
+        The n-gram and lexicon scores only rank the beams. The confidence of a
+        result is the CTC probability of its text, summed over its alignments,
+        taken as the geometric mean over the T frames so that it is on the
+        scale of the greedy confidence.
+        """
+        topk = min(self.beam_topk, preds.shape[2])
+        # candidate characters of every frame, computed for the whole batch
+        cand_idx = np.argpartition(-preds, topk - 1, axis=2)[:, :, :topk]
+        cand_prob = np.take_along_axis(preds, cand_idx, axis=2)
+        log_preds = np.log(np.maximum(preds, 1e-30))
+        result_list = []
+        for batch_idx in range(preds.shape[0]):
+            text, conf = self._prefix_beam_search(
+                log_preds[batch_idx],
+                cand_idx[batch_idx],
+                cand_prob[batch_idx],
+            )
+            if self.reverse:  # for arabic rec
+                text = self.pred_reverse(text)
+            result_list.append((text, conf))
+        return result_list
+
+    def _prefix_beam_search(self, log_prob, cand_idx, cand_prob):
+        neg_inf = -float("inf")
+
+        def log_add(a, b):
+            if a == neg_inf:
+                return b
+            if b == neg_inf:
+                return a
+            return max(a, b) + math.log1p(math.exp(-abs(a - b)))
+
+        def rank(item):
+            pb, pnb, lm_score, _ = item[1]
+            return log_add(pb, pnb) + lm_score
+
+        blank = 0
+        # log p ending in blank, log p ending in non-blank, weighted n-gram and
+        # lexicon score of the prefix, text
+        beams = {(): [0.0, neg_inf, 0.0, ""]}
+        for t in range(log_prob.shape[0]):
+            cands = [
+                int(c)
+                for c, p in zip(cand_idx[t], cand_prob[t])
+                if c != blank and p >= self.beam_prune_thresh
+            ]
+            next_beams = {}
+            for prefix, (pb, pnb, lm_score, text) in beams.items():
+                total = log_add(pb, pnb)
+                entry = next_beams.setdefault(
+                    prefix, [neg_inf, neg_inf, lm_score, text]
+                )
+                entry[0] = log_add(entry[0], total + log_prob[t, blank])
+                last = prefix[-1] if prefix else None
+                for c in cands:
+                    p = log_prob[t, c]
+                    if c == last:
+                        # a repeat without blank in between collapses
+                        entry[1] = log_add(entry[1], pnb + p)
+                        score = pb + p
+                    else:
+                        score = total + p
+                    if score == neg_inf:
+                        continue
+                    new_prefix = prefix + (c,)
+                    new = next_beams.get(new_prefix)
+                    if new is None:
+                        char = self.character[c]
+                        new_lm_score = lm_score
+                        if self.lm is not None:
+                            word = text.rsplit(" ", 1)[-1]
+                            new_lm_score += self.lm_weight * self.lm.score(text, char)
+                            new_lm_score += self.lexicon_weight * self.lm.lexicon_bonus(
+                                word, char
+                            )
+                        new = [neg_inf, neg_inf, new_lm_score, text + char]
+                        next_beams[new_prefix] = new
+                    new[1] = log_add(new[1], score)
+            beams = dict(
+                sorted(next_beams.items(), key=rank, reverse=True)[: self.beam_width]
+            )
+        prefix, (pb, pnb, _, text) = max(beams.items(), key=rank)
+        if len(prefix) == 0:
+            return text, 0.0
+        return text, math.exp(log_add(pb, pnb) / log_prob.shape[0])
+
 
 class DistillationCTCLabelDecode(CTCLabelDecode):
     """
@@ -242,7 +418,7 @@ class DistillationCTCLabelDecode(CTCLabelDecode):
         **kwargs,
     ):
         super(DistillationCTCLabelDecode, self).__init__(
-            character_dict_path, use_space_char
+            character_dict_path, use_space_char, **kwargs
         )
         if not isinstance(model_name, list):
             model_name = [model_name]
@@ -52,11 +52,6 @@ class SASTPostProcess(object):
         self.expand_scale = expand_scale
         self.tcl_map_thresh = tcl_map_thresh
 
-        # c++ la-nms is faster, but only support python 3.5
-        self.is_python35 = False
-        if sys.version_info.major == 3 and sys.version_info.minor == 5:
-            self.is_python35 = True
-
     def point_pair2poly(self, point_pair_list):
         """
         Transfer vertical point_pairs into poly point in clockwise.
@@ -144,16 +139,7 @@ class SASTPostProcess(object):
         return np.sum(edge) / 2.0
 
     def nms(self, dets):
-        if self.is_python35:
-            from ppocr.utils.utility import check_install
-
-            check_install("lanms", "lanms-nova")
-            import lanms
-
-            dets = lanms.merge_quadrangle_n9(dets, self.nms_thresh)
-        else:
-            dets = nms_locality(dets, self.nms_thresh)
-        return dets
+        return nms_locality(dets, self.nms_thresh)
 
     def cluster_by_quads_tco(self, tcl_map, tcl_map_thresh, quads, tco_map):
         """
@@ -248,10 +234,24 @@ class SASTPostProcess(object):
             tcl_map, tcl_map_thresh, quads, tco_map
         )
 
+        # group the tcl pixels by instance in one pass, in the row-major order
+        # np.argwhere gives, and sum their scores per instance. The background
+        # is not a tcl pixel, so instance i spans instance_ends[i - 1:i + 1]
+        ys, xs = np.nonzero(instance_label_map)
+        labels = instance_label_map[ys, xs]
+        order = np.argsort(labels, kind="stable")
+        instance_xy = np.stack([xs, ys], axis=1)[order]
+        instance_ends = np.cumsum(np.bincount(labels, minlength=instance_count))
+        instance_scores = np.bincount(
+            labels, weights=tcl_map[ys, xs, 0], minlength=instance_count
+        )
+
         # restore single poly with tcl instance.
         poly_list = []
         for instance_idx in range(1, instance_count):
-            xy_text = np.argwhere(instance_label_map == instance_idx)[:, ::-1]
+            xy_text = instance_xy[
+                instance_ends[instance_idx - 1] : instance_ends[instance_idx]
+            ]
             quad = quads[instance_idx - 1]
             q_area = quad_areas[instance_idx - 1]
             if q_area < 5:
@@ -269,8 +269,7 @@ class SASTPostProcess(object):
                 continue
 
             # filter low confidence instance
-            xy_text_scores = tcl_map[xy_text[:, 1], xy_text[:, 0], 0]
-            if np.sum(xy_text_scores) / quad_areas[instance_idx - 1] < 0.1:
+            if instance_scores[instance_idx] / quad_areas[instance_idx - 1] < 0.1:
                 # if np.sum(xy_text_scores) / quad_areas[instance_idx - 1] < 0.05:
                 continue
 
@@ -0,0 +1,162 @@
+# copyright (c) 2025 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Character n-gram language model and lexicon used to rescore CTC beam search.
+
+Both are stored in one compact .npz file:
+    order      int, n-gram order
+    ngrams     uint8, UTF-8 bytes of all 1..order-grams joined by "\\n"
+    logprobs   float32, natural log probability of each n-gram given its prefix
+    unk        float32, log probability of an unseen character
+    backoff    float32, log penalty paid for each backoff step
+    lexicon    uint8, UTF-8 bytes of lexicon words joined by "\\n"
+
+Build it from a text corpus (one sample per line) and/or a word list:
+    python ppocr/utils/ctc_lm.py --corpus train_text.txt --order 4 \\
+        --lexicon vocab.txt --output ctc_lm.npz
+"""
+
+import argparse
+import math
+from collections import Counter
+
+import numpy as np
+
+__all__ = ["CharNgramLM", "build_char_lm"]
+
+
+def _pack(strings):
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack(blob):
+    text = blob.tobytes().decode("utf-8")
+    return text.split("\n") if text else []
+
+
+class CharNgramLM(object):
+    """
+    Stupid-backoff character n-gram model with an optional lexicon.
+    `score(context, char)` returns the log probability of `char` following the
+    string `context`; `lexicon_bonus(word, char)` is 1 when `word + char` is
+    still a prefix of a lexicon word and 0 otherwise.
+    """
+
+    def __init__(self, lm_path):
+        data = np.load(lm_path)
+        self.order = int(data["order"])
+        self.unk = float(data["unk"])
+        self.backoff = float(data["backoff"])
+        self.logprobs = dict(zip(_unpack(data["ngrams"]), data["logprobs"].tolist()))
+        words = _unpack(data["lexicon"]) if "lexicon" in data else []
+        self.prefixes = set()
+        for word in words:
+            for end in range(1, len(word) + 1):
+                self.prefixes.add(word[:end])
+        self.use_ngram = len(self.logprobs) > 0
+        self.use_lexicon = len(self.prefixes) > 0
+
+    def score(self, context, char):
+        if not self.use_ngram:
+            return 0.0
+        context = context[len(context) - self.order + 1 :] if self.order > 1 else ""
+        penalty = 0.0
+        for start in range(len(context) + 1):
+            logprob = self.logprobs.get(context[start:] + char)
+            if logprob is not None:
+                return penalty + logprob
+            penalty += self.backoff
+        return self.unk
+
+    def lexicon_bonus(self, word, char):
+        if not self.use_lexicon:
+            return 0.0
+        return 1.0 if word + char in self.prefixes else 0.0
+
+
+def build_char_lm(
+    output_path, corpus_path=None, lexicon_path=None, order=3, backoff=0.4
+):
+    """
+    Count character n-grams of `corpus_path` (one text per line) and store
+    them, together with the words of `lexicon_path`, in `output_path`.
+    """
+    counts = Counter()
+    context_counts = Counter()
+    total = 0
+    if corpus_path is not None:
+        with open(corpus_path, "r", encoding="utf-8") as f:
+            for line in f:
+                text = line.rstrip("\r\n")
+                for end in range(1, len(text) + 1):
+                    total += 1
+                    for n in range(1, order + 1):
+                        if end - n < 0:
+                            break
+                        counts[text[end - n : end]] += 1
+                        if n > 1:
+                            context_counts[text[end - n : end - 1]] += 1
+    ngrams, logprobs = [], []
+    for ngram, count in counts.items():
+        if len(ngram) == 1:
+            denominator = total
+        else:
+            denominator = context_counts[ngram[:-1]]
+        ngrams.append(ngram)
+        logprobs.append(math.log(count / denominator))
+    unk = math.log(1.0 / (total + 1)) if total > 0 else 0.0
+
+    words = []
+    if lexicon_path is not None:
+        with open(lexicon_path, "r", encoding="utf-8") as f:
+            words = [line.strip() for line in f if line.strip()]
+    np.savez_compressed(
+        output_path,
+        order=np.int64(order),
+        ngrams=_pack(ngrams),
+        logprobs=np.array(logprobs, dtype=np.float32),
+        unk=np.float32(unk),
+        backoff=np.float32(math.log(backoff)),
+        lexicon=_pack(words),
+    )
+    return len(ngrams), len(words)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--corpus", type=str, default=None, help="Text corpus, one sample per line"
+    )
+    parser.add_argument(
+        "--lexicon", type=str, default=None, help="Word list, one word per line"
+    )
+    parser.add_argument("--order", type=int, default=3, help="Order of the n-grams")
+    parser.add_argument(
+        "--backoff", type=float, default=0.4, help="Stupid backoff factor"
+    )
+    parser.add_argument(
+        "--output", type=str, default="ctc_lm.npz", help="Output file name"
+    )
+    args = parser.parse_args()
+    assert (
+        args.corpus is not None or args.lexicon is not None
+    ), "at least one of --corpus and --lexicon should be given"
+    ngram_num, word_num = build_char_lm(
+        args.output, args.corpus, args.lexicon, args.order, args.backoff
+    )
+    print(
+        "Saved {} n-grams and {} lexicon words to {}".format(
+            ngram_num, word_num, args.output
+        )
+    )
@@ -12,10 +12,295 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""
+Polygon NMS shared by the EAST, SAST and FCE post processing.
+
+IoUs are computed for all candidate pairs at once: pairs whose bounding
+boxes do not overlap are skipped, convex polygons (every box and quad) are
+intersected exactly by clipping in NumPy, and only the remaining non-convex
+or invalid polygons go through shapely. The locality merge of EAST compares
+each proposal with the box merged so far, one pair at a time, so it clips
+plain Python tuples instead.
+"""
+
+import math
+
 import numpy as np
 from shapely.geometry import Polygon
 
 
+def _cross(a, b):
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+def signed_area(polys):
+    """Shoelace area of (..., K, 2) polygons, positive when counter-clockwise."""
+    return 0.5 * _cross(polys, np.roll(polys, -1, axis=-2)).sum(axis=-1)
+
+
+def orient_convex(polys):
+    """
+    Orient (N, K, 2) polygons counter-clockwise and flag the strictly convex,
+    simple ones, i.e. those turning left at every vertex exactly once around.
+    return:
+        polys(ndarray): float64 counter-clockwise copies of the polygons
+        convex(ndarray): bool mask of the convex polygons
+    """
+    polys = np.array(polys, dtype=np.float64)
+    if polys.size == 0:
+        return polys, np.zeros(len(polys), dtype=bool)
+    clockwise = signed_area(polys) < 0
+    polys[clockwise] = polys[clockwise, ::-1]
+    edges = np.roll(polys, -1, axis=1) - polys
+    next_edges = np.roll(edges, -1, axis=1)
+    turns = _cross(edges, next_edges)
+    convex = np.all(turns > 0, axis=1)
+    if polys.shape[1] > 4:
+        # with more than 4 vertices left turns may still wind around twice
+        angles = np.arctan2(turns, (edges * next_edges).sum(axis=-1))
+        convex &= np.abs(angles.sum(axis=1) - 2 * np.pi) < 1e-6
+    return polys, convex
+
+
+def _clipped_edges_area(sub, clip, keep_collinear):
+    """
+    Sum of the shoelace terms of the parts of the edges of `sub` that lie
+    inside `clip`, pairwise over two (M, K, 2) arrays of convex polygons.
+    Edges lying on an edge of `clip` are kept only for `keep_collinear` and
+    when both run in the same direction, so that a shared boundary is counted
+    exactly once.
+    """
+    start = sub[:, :, np.newaxis, :]
+    direction = (np.roll(sub, -1, axis=1) - sub)[:, :, np.newaxis, :]
+    clip_start = clip[:, np.newaxis, :, :]
+    clip_edge = (np.roll(clip, -1, axis=1) - clip)[:, np.newaxis, :, :]
+    # signed distance to every clip edge along the edge: f(t) = f0 + t * slope
+    f0 = _cross(clip_edge, start - clip_start)
+    slope = _cross(clip_edge, direction)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = -f0 / slope
+    t0 = np.maximum(np.where(slope > 0, t, -np.inf).max(axis=2), 0.0)
+    t1 = np.minimum(np.where(slope < 0, t, np.inf).min(axis=2), 1.0)
+    parallel = slope == 0
+    on_line = parallel & (f0 == 0)
+    if keep_collinear:
+        on_line &= (direction * clip_edge).sum(axis=-1) <= 0
+    outside = (parallel & (f0 < 0)) | on_line
+    inside = (t1 > t0) & ~outside.any(axis=2)
+
+    start, direction = start[:, :, 0], direction[:, :, 0]
+    p0 = start + t0[..., np.newaxis] * direction
+    p1 = start + t1[..., np.newaxis] * direction
+    return 0.5 * np.where(inside, _cross(p0, p1), 0.0).sum(axis=1)
+
+
+def convex_intersection_area(polys_a, polys_b):
+    """
+    Intersection areas of the pairs (polys_a[m], polys_b[m]) of convex,
+    counter-clockwise polygons: by Green's theorem the area is the boundary
+    integral over the edges of each polygon that lie inside the other one.
+    """
+    # work relative to one vertex of each pair to limit cancellation
+    origin = polys_a[:, :1, :]
+    polys_a, polys_b = polys_a - origin, polys_b - origin
+    area = _clipped_edges_area(polys_a, polys_b, True) + _clipped_edges_area(
+        polys_b, polys_a, False
+    )
+    return np.clip(area, 0.0, None)
+
+
+def _bounds(polys):
+    return np.concatenate([polys.min(axis=1), polys.max(axis=1)], axis=1)
+
+
+def shapely_iou(poly_a, poly_b):
+    """IoU of two polygons given as (K, 2) arrays, invalid ones count as empty."""
+    poly_a = Polygon(poly_a).buffer(0)
+    poly_b = Polygon(poly_b).buffer(0)
+    if not poly_a.is_valid or not poly_b.is_valid:
+        return 0.0
+    inter = poly_a.intersection(poly_b).area
+    union = poly_a.area + poly_b.area - inter
+    if union == 0:
+        return 0.0
+    return inter / union
+
+
+class _Polygons(object):
+    """(N, K, 2) polygons with everything the IoU computations need."""
+
+    def __init__(self, polys, fallback_iou):
+        self.polys = np.asarray(polys, dtype=np.float64)
+        self.ccw, self.convex = orient_convex(self.polys)
+        self.areas = signed_area(self.ccw)
+        self.bounds = _bounds(self.polys)
+        self.fallback_iou = fallback_iou
+
+    def iou(self, rows, cols):
+        """IoUs of the pairs (rows[m], cols[m])."""
+        iou = np.zeros(len(rows))
+        overlap = np.nonzero(
+            (
+                np.minimum(self.bounds[rows, 2], self.bounds[cols, 2])
+                > np.maximum(self.bounds[rows, 0], self.bounds[cols, 0])
+            )
+            & (
+                np.minimum(self.bounds[rows, 3], self.bounds[cols, 3])
+                > np.maximum(self.bounds[rows, 1], self.bounds[cols, 1])
+            )
+        )[0]
+        fast = self.convex[rows[overlap]] & self.convex[cols[overlap]]
+        pairs = overlap[fast]
+        if len(pairs) > 0:
+            row, col = rows[pairs], cols[pairs]
+            inter = convex_intersection_area(self.ccw[row], self.ccw[col])
+            iou[pairs] = inter / (self.areas[row] + self.areas[col] - inter)
+        for pair in overlap[~fast]:
+            iou[pair] = self.fallback_iou(
+                self.polys[rows[pair]], self.polys[cols[pair]]
+            )
+        return iou
+
+
+def nms_polygons(polys, scores, threshold, fallback_iou=shapely_iou):
+    """
+    Greedy NMS of polygons: the highest scoring polygon is kept and all
+    remaining ones with an IoU above `threshold` with it are dropped, until
+    none is left. Ties keep the later polygon first.
+    args:
+        polys(ndarray): (N, K, 2) polygons
+        scores(ndarray): (N,) scores
+        fallback_iou(callable): IoU of two (K, 2) polygons that are not both
+            convex
+    return:
+        indices of the kept polygons, by descending score
+    """
+    polygons = _Polygons(polys, fallback_iou)
+    order = np.argsort(np.asarray(scores), kind="stable")[::-1]
+    keep = []
+    while order.size > 0:
+        keep.append(order[0])
+        rest = order[1:]
+        iou = polygons.iou(np.full(len(rest), order[0]), rest)
+        order = rest[iou <= threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def _shoelace(points):
+    return 0.5 * sum(
+        x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1])
+    )
+
+
+def _convex_ccw(points):
+    """
+    Counter-clockwise copy of a polygon given as a list of (x, y) tuples, or
+    None unless it is strictly convex and simple.
+    """
+    if _shoelace(points) < 0:
+        points = points[::-1]
+    num = len(points)
+    winding = 0.0
+    for i in range(num):
+        (x0, y0), (x1, y1), (x2, y2) = points[i - 2], points[i - 1], points[i]
+        ex, ey, nx, ny = x1 - x0, y1 - y0, x2 - x1, y2 - y1
+        turn = ex * ny - ey * nx
+        if turn <= 0:
+            return None
+        winding += math.atan2(turn, ex * nx + ey * ny)
+    if num > 4 and abs(winding - 2 * math.pi) > 1e-6:
+        return None
+    return points
+
+
+def polygon_iou(poly_a, poly_b, fallback_iou=shapely_iou):
+    """
+    IoU of two (K, 2) polygons. Convex ones are clipped against each other,
+    anything else goes to `fallback_iou`. This is the scalar counterpart of
+    `_Polygons.iou` for loops where every pair depends on the previous one.
+    """
+    # work relative to one vertex to limit cancellation
+    x, y = float(poly_a[0][0]), float(poly_a[0][1])
+    a = _convex_ccw([(float(px) - x, float(py) - y) for px, py in poly_a])
+    b = _convex_ccw([(float(px) - x, float(py) - y) for px, py in poly_b])
+    if a is None or b is None:
+        return fallback_iou(poly_a, poly_b)
+    if (
+        min(max(p[0] for p in a), max(p[0] for p in b))
+        <= max(min(p[0] for p in a), min(p[0] for p in b))
+    ) or (
+        min(max(p[1] for p in a), max(p[1] for p in b))
+        <= max(min(p[1] for p in a), min(p[1] for p in b))
+    ):
+        return 0.0
+    # Sutherland-Hodgman clipping of a by every edge of b
+    inter = a
+    for (cx0, cy0), (cx1, cy1) in zip(b, b[1:] + b[:1]):
+        if len(inter) == 0:
+            break
+        ex, ey = cx1 - cx0, cy1 - cy0
+        sides = [ex * (py - cy0) - ey * (px - cx0) for px, py in inter]
+        clipped = []
+        for i in range(len(inter)):
+            (px0, py0), s0 = inter[i - 1], sides[i - 1]
+            (px1, py1), s1 = inter[i], sides[i]
+            if (s0 >= 0) != (s1 >= 0):
+                t = s0 / (s0 - s1)
+                clipped.append((px0 + t * (px1 - px0), py0 + t * (py1 - py0)))
+            if s1 >= 0:
+                clipped.append((px1, py1))
+        inter = clipped
+    inter = max(_shoelace(inter), 0.0) if len(inter) > 2 else 0.0
+    return inter / (_shoelace(a) + _shoelace(b) - inter)
+
+
+def locality_aware_nms(dets, threshold, fallback_iou=shapely_iou):
+    """
+    Locality aware NMS of EAST style detections.
+    Rows come sorted by position, so neighbouring rows predict nearly the
+    same box. Each row is merged into the running merged box while their IoU
+    is above `threshold`, as the score weighted mean with the summed score,
+    otherwise it starts a new merged box. Standard NMS then runs on the
+    merged boxes.
+    args:
+        dets(ndarray): (N, 2K + 1) rows of K points followed by the score
+    return:
+        (M, 2K + 1) array of the kept rows, with the dtype of `dets`
+    """
+    dets = np.asarray(dets)
+    if len(dets) == 0:
+        return dets
+    num_points = (dets.shape[1] - 1) // 2
+    merged = []
+    p = None
+    for g in dets:
+        if (
+            p is not None
+            and polygon_iou(
+                g[:-1].reshape(num_points, 2),
+                p[:-1].reshape(num_points, 2),
+                fallback_iou,
+            )
+            > threshold
+        ):
+            g = g.copy()
+            g[:-1] = (g[-1] * g[:-1] + p[-1] * p[:-1]) / (g[-1] + p[-1])
+            g[-1] = g[-1] + p[-1]
+        elif p is not None:
+            merged.append(p)
+        p = g
+    merged.append(p)
+    merged = np.array(merged)
+
+    keep = nms_polygons(
+        merged[:, :-1].reshape(len(merged), -1, 2),
+        merged[:, -1],
+        threshold,
+        fallback_iou,
+    )
+    return merged[keep]
+
+
 def points2polygon(points):
     """Convert k points to 1 polygon.
 
@@ -125,22 +410,21 @@ def poly_iou(poly_det, poly_gt):
 
 
 def poly_nms(polygons, threshold):
+    """
+    NMS of FCE boundaries, given as a list of [x1, y1, ..., xk, yk, score].
+    Returns the kept boundaries as lists, by descending score.
+    """
     assert isinstance(polygons, list)
-
-    polygons = np.array(sorted(polygons, key=lambda x: x[-1]))
-
-    keep_poly = []
-    index = [i for i in range(polygons.shape[0])]
-
-    while len(index) > 0:
-        keep_poly.append(polygons[index[-1]].tolist())
-        A = polygons[index[-1]][:-1]
-        index = np.delete(index, -1)
-        iou_list = np.zeros((len(index),))
-        for i in range(len(index)):
-            B = polygons[index[i]][:-1]
-            iou_list[i] = boundary_iou(A, B)
-        remove_index = np.where(iou_list > threshold)
-        index = np.delete(index, remove_index)
-
-    return keep_poly
+    if len(polygons) == 0:
+        return []
+
+    polygons = np.array(polygons)
+    keep = nms_polygons(
+        polygons[:, :-1].reshape(len(polygons), -1, 2),
+        polygons[:, -1],
+        threshold,
+        fallback_iou=lambda src, target: boundary_iou(
+            src.reshape(-1), target.reshape(-1)
+        ),
+    )
+    return polygons[keep].tolist()
@@ -0,0 +1,81 @@
+# copyright (c) 2025 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Reading order of text boxes: boxes are grouped into text lines, lines are
+read from top to bottom and the boxes of a line from left to right.
+"""
+
+import numpy as np
+
+__all__ = ["box_extents", "reading_order"]
+
+
+def box_extents(boxes):
+    """
+    Axis aligned extents (x0, y0, x1, y1) of boxes given either as bboxes of
+    shape (N, 4) or as polygons of shape (N, K, 2), arrays or lists of them.
+    """
+    if len(boxes) == 0:
+        return np.zeros((0, 4), dtype=np.float64)
+    if isinstance(boxes, np.ndarray) and boxes.ndim == 3:
+        return np.concatenate([boxes.min(axis=1), boxes.max(axis=1)], axis=1)
+    if isinstance(boxes, np.ndarray) and boxes.ndim == 2 and boxes.shape[1] == 4:
+        return boxes.astype(np.float64)
+    extents = []
+    for box in boxes:
+        box = np.asarray(box, dtype=np.float64)
+        if box.ndim == 1:
+            extents.append(box[:4])
+        else:
+            extents.append(np.concatenate([box.min(axis=0), box.max(axis=0)]))
+    return np.array(extents, dtype=np.float64)
+
+
+def reading_order(boxes, line_thresh=0.5, use_center=True):
+    """
+    Group boxes into text lines and sort them in reading order.
+
+    Boxes are swept by the y coordinate of their centers and a new line starts
+    wherever the step to the next center exceeds `line_thresh` times the
+    height of the smaller of the two boxes. Following centers rather than top
+    edges keeps slightly skewed lines together. Sorting dominates, so this
+    runs in O(n log n).
+    args:
+        boxes: (N, 4) bboxes or (N, K, 2) polygons, see `box_extents`
+        line_thresh(float): largest center step within a line, in box heights
+        use_center(bool): sweep box centers, or top edges for blocks of very
+            different heights such as layout regions
+    return:
+        order(ndarray): box indices in reading order
+        line_ids(ndarray): line number of every box, counted from the top
+    """
+    extents = box_extents(boxes)
+    num = len(extents)
+    if num == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    if use_center:
+        anchor_y = (extents[:, 1] + extents[:, 3]) / 2
+    else:
+        anchor_y = extents[:, 1]
+    heights = np.maximum(extents[:, 3] - extents[:, 1], 1.0)
+
+    by_y = np.argsort(anchor_y, kind="stable")
+    step = np.diff(anchor_y[by_y])
+    limit = line_thresh * np.minimum(heights[by_y][1:], heights[by_y][:-1])
+    sorted_line_ids = np.concatenate([[0], np.cumsum(step > limit)])
+    line_ids = np.empty(num, dtype=np.int64)
+    line_ids[by_y] = sorted_line_ids
+
+    order = np.lexsort((extents[:, 0], line_ids))
+    return order, line_ids
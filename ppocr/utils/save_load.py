@@ -16,10 +16,17 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import atexit
+import copy
 import errno
+import io
 import os
 import pickle
 import json
+import queue
+import re
+import shutil
+import threading
 from packaging import version
 
 import paddle
@@ -35,7 +42,7 @@ except ImportError:
     print("Skipping import of the encryption module.")
     encrypted = False  # Encryption is not needed if the module cannot be imported
 
-__all__ = ["load_model"]
+__all__ = ["load_model", "CheckpointWriter"]
 
 
 # just to determine the inference model file format
@@ -211,6 +218,146 @@ def load_pretrained_params(model, path):
     return is_float16
 
 
+def _snapshot(obj):
+    """Copy the tensors of a (nested) state dict to host memory."""
+    if isinstance(obj, paddle.Tensor):
+        # the copy keeps the tensor name, so the saved file is unchanged
+        return obj._copy_to(paddle.CPUPlace(), True)
+    if isinstance(obj, dict):
+        return type(obj)((key, _snapshot(value)) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_snapshot(value) for value in obj)
+    return obj
+
+
+def _save(obj, path):
+    tmp_path = "{}.tmp{}".format(path, os.getpid())
+    paddle.save(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_bytes(data, path):
+    tmp_path = "{}.tmp{}".format(path, os.getpid())
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _link_or_copy(src, dst):
+    """
+    Put the file `src` also at `dst`, as a hard link where the file system
+    allows it. `src` is only ever replaced by a rename, which leaves the
+    content seen through `dst` untouched.
+    """
+    tmp_path = "{}.tmp{}".format(dst, os.getpid())
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def prune_checkpoints(model_path, max_checkpoints):
+    """
+    Remove the files and directories of all but the newest `max_checkpoints`
+    iter_epoch_* checkpoints in `model_path`. The last_N models of
+    train_result.json that point into a removed checkpoint are emptied.
+    """
+    entries = {}
+    for name in os.listdir(model_path):
+        match = re.match(r"iter_epoch_(\d+)(\.|$)", name)
+        if match is not None:
+            entries.setdefault(int(match.group(1)), []).append(name)
+    removed = set()
+    for epoch in sorted(entries)[:-max_checkpoints]:
+        for name in entries[epoch]:
+            path = os.path.join(model_path, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+            removed.add(name)
+
+    train_results_path = os.path.join(model_path, "train_result.json")
+    if len(removed) == 0 or not os.path.exists(train_results_path):
+        return
+    with open(train_results_path, "r") as fp:
+        train_results = json.load(fp)
+    models = train_results.get("models", {})
+    changed = False
+    for key, model in models.items():
+        if not key.startswith("last_"):
+            continue
+        paths = [path for path in model.values() if isinstance(path, str)]
+        if any(os.path.normpath(path).split(os.sep)[0] in removed for path in paths):
+            models[key] = {}
+            changed = True
+    if changed:
+        _write_bytes(json.dumps(train_results).encode("utf-8"), train_results_path)
+
+
+class CheckpointWriter(object):
+    """
+    Write checkpoints without blocking training. `save_model` copies the
+    state dicts to host memory on the calling thread and hands the copies to
+    `submit`, a worker thread then saves them to disk in submission order.
+    Every file is written under a temporary name and renamed into place, so
+    no checkpoint is ever left half written. At most `max_pending`
+    checkpoints wait in memory, `submit` blocks beyond that. With
+    use_thread=False the files are written by `submit` itself.
+    """
+
+    def __init__(self, use_thread=True, max_pending=2):
+        self._queue = queue.Queue(maxsize=max_pending) if use_thread else None
+        self._thread = None
+        self._error = None
+
+    def submit(self, tasks):
+        """
+        Run the list of (func, args) `tasks`. Raises the error of a failed
+        earlier write, if any.
+        """
+        self._raise_error()
+        if self._queue is None:
+            self._run_tasks(tasks)
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self._thread.start()
+            # finish the pending writes when the interpreter exits early
+            atexit.register(self._queue.join)
+        self._queue.put(tasks)
+
+    def wait(self):
+        """Block until every submitted checkpoint is on disk."""
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_error()
+
+    @staticmethod
+    def _run_tasks(tasks):
+        for func, args in tasks:
+            func(*args)
+
+    def _worker(self):
+        while True:
+            tasks = self._queue.get()
+            try:
+                if self._error is None:
+                    self._run_tasks(tasks)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Failed to write checkpoint: {}".format(error))
+
+
 def save_model(
     model,
     optimizer,
@@ -219,11 +366,15 @@ def save_model(
     config,
     is_best=False,
     prefix="ppocr",
+    writer=None,
     **kwargs,
 ):
     """
-    save model to the target path
+    save model to the target path, the files are written by `writer`
+    (a CheckpointWriter) or right away if it is None
     """
+    if writer is None:
+        writer = CheckpointWriter(use_thread=False)
     _mkdir_if_not_exist(model_path, logger)
     model_prefix = os.path.join(model_path, prefix)
 
@@ -231,22 +382,33 @@ def save_model(
         best_model_path = os.path.join(model_path, "best_model")
         _mkdir_if_not_exist(best_model_path, logger)
 
-    paddle.save(optimizer.state_dict(), model_prefix + ".pdopt")
+    tasks = [(_save, (_snapshot(optimizer.state_dict()), model_prefix + ".pdopt"))]
     if prefix == "best_accuracy":
-        paddle.save(
-            optimizer.state_dict(), os.path.join(best_model_path, "model.pdopt")
+        tasks.append(
+            (
+                _link_or_copy,
+                (model_prefix + ".pdopt", os.path.join(best_model_path, "model.pdopt")),
+            )
         )
 
     is_nlp_model = config["Architecture"]["model_type"] == "kie" and config[
         "Architecture"
     ]["algorithm"] not in ["SDMGR"]
     if is_nlp_model is not True:
-        paddle.save(model.state_dict(), model_prefix + ".pdparams")
+        tasks.append(
+            (_save, (_snapshot(model.state_dict()), model_prefix + ".pdparams"))
+        )
         metric_prefix = model_prefix
 
         if prefix == "best_accuracy":
-            paddle.save(
-                model.state_dict(), os.path.join(best_model_path, "model.pdparams")
+            tasks.append(
+                (
+                    _link_or_copy,
+                    (
+                        model_prefix + ".pdparams",
+                        os.path.join(best_model_path, "model.pdparams"),
+                    ),
+                )
             )
 
     else:  # for kie system, we follow the save/load rules in NLP
@@ -269,11 +431,20 @@ def save_model(
         logger.info("Already save model info in {}".format(model_path))
         if prefix != "latest":
             done_flag = kwargs.pop("done_flag", False)
-            update_train_results(config, prefix, save_model_info, done_flag=done_flag)
+            # train_result.json is only ever rewritten by the writer, in order
+            # with the checkpoints and with prune_checkpoints
+            tasks.append(
+                (
+                    update_train_results,
+                    (config, prefix, copy.deepcopy(save_model_info), done_flag),
+                )
+            )
 
     # save metric and config
-    with open(metric_prefix + ".states", "wb") as f:
-        pickle.dump(kwargs, f, protocol=2)
+    tasks.append(
+        (_write_bytes, (pickle.dumps(kwargs, protocol=2), metric_prefix + ".states"))
+    )
+    writer.submit(tasks)
     if is_best:
         logger.info("save best model is to {}".format(model_prefix))
     else:
@@ -386,5 +557,4 @@ def update_train_results(config, prefix, metric_info, done_flag=False, last_num=
                 prefix, "inference", save_inference_files[key]
             )
 
-    with open(train_results_path, "w") as fp:
-        json.dump(train_results, fp)
+    _write_bytes(json.dumps(train_results).encode("utf-8"), train_results_path)
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import copy
 import logging
 import os
 import cv2
@@ -21,6 +23,9 @@ import paddle
 import importlib.util
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from paddle.utils import try_import
 
 
 def print_dict(d, logger, delimiter=0):
@@ -116,39 +121,129 @@ def alpha_to_color(img, alpha_color=(255, 255, 255)):
     return img
 
 
-def check_and_read(img_path):
+def _render_pdf_page(pdf, page_index, zoom):
+    """Render one page to a BGR array, converting the pixmap samples once."""
+    fitz = try_import("fitz")
+    pm = pdf[page_index].get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    rgb = np.frombuffer(pm.samples_mv, dtype=np.uint8)
+    rgb = rgb.reshape(pm.height, pm.stride)[:, : pm.width * 3]
+    return cv2.cvtColor(rgb.reshape(pm.height, pm.width, 3), cv2.COLOR_RGB2BGR)
+
+
+class PDFPages(object):
+    """
+    The pages of a PDF as BGR images, rendered only when they are used.
+    Supports len(), indexing, slicing (which gives another lazy PDFPages)
+    and iteration; iterating renders the pages in a background thread,
+    `read_ahead` pages ahead of the consumer, so at most that many pages
+    are held in memory at once.
+    args:
+        pdf_path(str): path of the PDF
+        dpi: None renders at 144 dpi, or 72 dpi for pages that would exceed
+            2000 pixels; a number renders every page at that dpi; a callable
+            dpi(page_index, width, height), sizes in points, picks it per page
+        num_workers(int): 0 renders in the caller, any other value in one
+            background thread
+        read_ahead(int): number of pages rendered ahead while iterating
+    """
+
+    def __init__(self, pdf_path, dpi=None, num_workers=1, read_ahead=4):
+        fitz = try_import("fitz")
+        self.pdf_path = pdf_path
+        self.num_workers = num_workers
+        self.read_ahead = max(read_ahead, 1)
+        self.zooms = []
+        with fitz.open(pdf_path) as pdf:
+            for page in pdf:
+                rect = page.rect
+                if dpi is None:
+                    # if width or height > 2000 pixels, don't enlarge the image
+                    size = (rect * fitz.Matrix(2, 2)).irect
+                    zoom = 1 if size.width > 2000 or size.height > 2000 else 2
+                elif callable(dpi):
+                    zoom = dpi(page.number, rect.width, rect.height) / 72.0
+                else:
+                    zoom = dpi / 72.0
+                self.zooms.append(zoom)
+        self.page_indices = list(range(len(self.zooms)))
+
+    def __len__(self):
+        return len(self.page_indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            pages = copy.copy(self)
+            pages.page_indices = self.page_indices[index]
+            return pages
+        fitz = try_import("fitz")
+        page_index = self.page_indices[index]
+        with fitz.open(self.pdf_path) as pdf:
+            return _render_pdf_page(pdf, page_index, self.zooms[page_index])
+
+    def __iter__(self):
+        if self.num_workers <= 0 or len(self) <= 1:
+            fitz = try_import("fitz")
+            with fitz.open(self.pdf_path) as pdf:
+                for page_index in self.page_indices:
+                    yield _render_pdf_page(pdf, page_index, self.zooms[page_index])
+            return
+
+        # MuPDF is not thread safe and keeps the GIL while rendering, so a
+        # single thread renders, ahead of the consumer which is mostly in
+        # inference that releases the GIL
+        fitz = try_import("fitz")
+        pdf = fitz.open(self.pdf_path)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf_render")
+        pending = collections.deque()
+        todo = iter(self.page_indices)
+        try:
+            for page_index in todo:
+                pending.append(
+                    executor.submit(
+                        _render_pdf_page, pdf, page_index, self.zooms[page_index]
+                    )
+                )
+                if len(pending) >= self.read_ahead:
+                    break
+            while pending:
+                img = pending.popleft().result()
+                page_index = next(todo, None)
+                if page_index is not None:
+                    pending.append(
+                        executor.submit(
+                            _render_pdf_page, pdf, page_index, self.zooms[page_index]
+                        )
+                    )
+                yield img
+        finally:
+            # the consumer may stop early, drop the pages rendered ahead
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            pdf.close()
+
+
+def check_and_read(img_path, dpi=None, num_workers=1):
+    """
+    Read a gif or pdf. Returns (img, flag_gif, flag_pdf): the first frame of
+    a gif as an array, the pages of a pdf as a lazy PDFPages (see there for
+    `dpi` and `num_workers`), or None for other files.
+    """
     if os.path.basename(img_path)[-3:].lower() == "gif":
         gif = cv2.VideoCapture(img_path)
         ret, frame = gif.read()
         if not ret:
             logger = logging.getLogger("ppocr")
-            logger.info("Cannot read {}. This gif image maybe corrupted.")
-            return None, False
+            logger.info(
+                "Cannot read {}. This gif image maybe corrupted.".format(img_path)
+            )
+            return None, True, False
         if len(frame.shape) == 2 or frame.shape[-1] == 1:
             frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
         imgvalue = frame[:, :, ::-1]
         return imgvalue, True, False
     elif os.path.basename(img_path)[-3:].lower() == "pdf":
-        from paddle.utils import try_import
-
-        fitz = try_import("fitz")
-        from PIL import Image
-
-        imgs = []
-        with fitz.open(img_path) as pdf:
-            for pg in range(0, pdf.page_count):
-                page = pdf[pg]
-                mat = fitz.Matrix(2, 2)
-                pm = page.get_pixmap(matrix=mat, alpha=False)
-
-                # if width or height > 2000 pixels, don't enlarge the image
-                if pm.width > 2000 or pm.height > 2000:
-                    pm = page.get_pixmap(matrix=fitz.Matrix(1, 1), alpha=False)
-
-                img = Image.frombytes("RGB", [pm.width, pm.height], pm.samples)
-                img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-                imgs.append(img)
-            return imgs, False, True
+        return PDFPages(img_path, dpi=dpi, num_workers=num_workers), False, True
     return None, False, False
 
 
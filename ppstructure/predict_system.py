@@ -314,7 +314,11 @@ def main(args):
 
     for i, image_file in enumerate(image_file_list):
         logger.info("[{}/{}] {}".format(i, img_num, image_file))
-        img, flag_gif, flag_pdf = check_and_read(image_file)
+        img, flag_gif, flag_pdf = check_and_read(
+            image_file,
+            dpi=getattr(args, "pdf_dpi", None),
+            num_workers=getattr(args, "pdf_render_workers", 1),
+        )
         img_name = os.path.basename(image_file).split(".")[0]
 
         if args.recovery and args.use_pdf2docx_api and flag_pdf:
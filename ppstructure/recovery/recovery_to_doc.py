@@ -25,6 +25,7 @@ from docx.enum.table import WD_TABLE_ALIGNMENT
 from ppstructure.recovery.table_process import HtmlToDocx
 
 from ppocr.utils.logging import get_logger
+from ppocr.utils.reading_order import reading_order
 
 logger = get_logger()
 
@@ -97,8 +98,8 @@ def sorted_layout_boxes(res, w):
         res[0]["layout"] = "single"
         return res
 
-    sorted_boxes = sorted(res, key=lambda x: (x["bbox"][1], x["bbox"][0]))
-    _boxes = list(sorted_boxes)
+    order, _ = reading_order([region["bbox"] for region in res], use_center=False)
+    _boxes = [res[i] for i in order]
 
     new_res = []
     res_left = []
@@ -16,11 +16,65 @@ import os
 import re
 
 from ppocr.utils.logging import get_logger
+from ppocr.utils.reading_order import reading_order
 
 logger = get_logger()
 
+# scripts written without spaces between words
+CJK_CHAR = re.compile(
+    "[\u2e80-\u2fff\u3000-\u30ff\u3100-\u31ff\u3400-\u4dbf"
+    "\u4e00-\u9fff\uf900-\ufaff\ufe30-\ufe4f\uff00-\uffef]"
+)
 
-def check_merge_method(in_region):
+
+def join_line_text(left, right):
+    """Join two pieces of one text line, with a space only between words of
+    scripts that separate them, so that CJK text is joined directly."""
+    if not left or not right or left[-1].isspace() or right[0].isspace():
+        return left + right
+    if CJK_CHAR.match(left[-1]) or CJK_CHAR.match(right[0]):
+        return left + right
+    return left + " " + right
+
+
+def group_text_lines(in_region):
+    """Join the OCR results of a region that lie on the same text line.
+
+    Args:
+        in_region: Elements with text type in the layout result.
+
+    Returns:
+        A list of results in reading order, one per text line, with the text
+        of the line and the rectangle around it as text_region.
+    """
+    results = in_region["res"]
+    order, line_ids = reading_order([res["text_region"] for res in results])
+    lines = []
+    pre_line_id = None
+    for idx in order:
+        res = results[idx]
+        x0, y0 = [min(p[k] for p in res["text_region"]) for k in (0, 1)]
+        x1, y1 = [max(p[k] for p in res["text_region"]) for k in (0, 1)]
+        if line_ids[idx] != pre_line_id:
+            lines.append({"text": res["text"], "box": [x0, y0, x1, y1]})
+        else:
+            line = lines[-1]
+            line["text"] = join_line_text(line["text"], res["text"])
+            box = line["box"]
+            line["box"] = [
+                min(box[0], x0),
+                min(box[1], y0),
+                max(box[2], x1),
+                max(box[3], y1),
+            ]
+        pre_line_id = line_ids[idx]
+    for line in lines:
+        x0, y0, x1, y1 = line.pop("box")
+        line["text_region"] = [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+    return lines
+
+
+def check_merge_method(in_region, lines=None):
     """Select the function to merge paragraph.
 
     Determine the paragraph merging method based on the positional
@@ -28,13 +82,16 @@ def check_merge_method(in_region):
 
     Args:
         in_region: Elements with text type in the layout result.
+        lines: The result of group_text_lines(in_region), computed if None.
 
     Returns:
         Merge the functions of paragraph, convert_text_space_head or convert_text_space_tail.
     """
     text_bbox = in_region["bbox"]
     text_x1 = text_bbox[0]
-    frist_line_box = in_region["res"][0]["text_region"]
+    if lines is None:
+        lines = group_text_lines(in_region)
+    frist_line_box = lines[0]["text_region"]
     point_1 = frist_line_box[0]
     point_2 = frist_line_box[2]
     frist_line_x1 = point_1[0]
@@ -47,13 +104,14 @@ def check_merge_method(in_region):
     )
 
 
-def convert_text_space_head(in_region):
+def convert_text_space_head(in_region, lines=None):
     """The function to merge paragraph.
 
     The sign of dividing paragraph is that there are two spaces at the beginning.
 
     Args:
         in_region: Elements with text type in the layout result.
+        lines: The result of group_text_lines(in_region), computed if None.
 
     Returns:
         The text content of the current text box.
@@ -61,7 +119,9 @@ def convert_text_space_head(in_region):
     text = ""
     pre_x = None
     frist_line = True
-    for i, res in enumerate(in_region["res"]):
+    if lines is None:
+        lines = group_text_lines(in_region)
+    for i, res in enumerate(lines):
         point1 = res["text_region"][0]
         point2 = res["text_region"][2]
         h = point2[1] - point1[1]
@@ -93,13 +153,14 @@ def convert_text_space_head(in_region):
     return text
 
 
-def convert_text_space_tail(in_region):
+def convert_text_space_tail(in_region, lines=None):
     """The function to merge paragraph.
 
     The symbol for dividing paragraph is a space at the end.
 
     Args:
         in_region: Elements with text type in the layout result.
+        lines: The result of group_text_lines(in_region), computed if None.
 
     Returns:
         The text content of the current text box.
@@ -108,7 +169,9 @@ def convert_text_space_tail(in_region):
     frist_line = True
     text_bbox = in_region["bbox"]
     width = text_bbox[2] - text_bbox[0]
-    for i, res in enumerate(in_region["res"]):
+    if lines is None:
+        lines = group_text_lines(in_region)
+    for i, res in enumerate(lines):
         point1 = res["text_region"][0]
         point2 = res["text_region"][2]
         row_width = point2[0] - point1[0]
@@ -170,9 +233,10 @@ def convert_info_markdown(res, save_folder, img_name):
         elif region["type"].lower() == "equation" and "latex" in region["res"]:
             markdown_string.append(f"""$${region["res"]["latex"]}$$""")
         elif region["type"].lower() == "text":
-            merge_func = check_merge_method(region)
+            lines = group_text_lines(region)
+            merge_func = check_merge_method(region, lines)
             # logger.warning(f"use merge method:{merge_func.__name__}")
-            markdown_string.append(replace_special_char(merge_func(region)))
+            markdown_string.append(replace_special_char(merge_func(region, lines)))
         else:
             string = ""
             for line in region["res"]:
@@ -98,7 +98,7 @@ def main(gt_path, img_root, args):
 
     # compute teds
     teds = TEDS(n_jobs=16)
-    scores = teds.batch_evaluate_html(gt_htmls, pred_htmls)
+    scores = teds.batch_evaluate_html(pred_htmls, gt_htmls)
     logger.info("teds: {}".format(sum(scores) / len(scores)))
 
 
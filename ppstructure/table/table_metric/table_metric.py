@@ -12,8 +12,10 @@
 from rapidfuzz.distance import Levenshtein
 from apted import APTED, Config
 from apted.helpers import Tree
+import math
+import multiprocessing
 from collections import deque
-from .parallel import parallel_process
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 from paddle.utils import try_import
 
@@ -106,8 +108,35 @@ class CustomConfig_del_block(Config):
         return 0.0
 
 
+_worker_teds = None
+_worker_true_htmls = None
+
+
+def _init_worker(teds, true_htmls):
+    # teds comes with the ground truth trees already parsed by the parent
+    global _worker_teds, _worker_true_htmls
+    _worker_teds = teds
+    _worker_true_htmls = true_htmls
+
+
+def _evaluate_chunk(chunk):
+    return [_worker_teds.evaluate(pred, _worker_true_htmls[idx]) for idx, pred in chunk]
+
+
 class TEDS(object):
-    """Tree Edit Distance basead Similarity"""
+    """Tree Edit Distance basead Similarity
+
+    Parsed ground truth trees are cached by their html, so evaluating the
+    same ground truth again, e.g. in every evaluation epoch, only parses the
+    predictions. Pairs whose trees are identical score 1.0 without running
+    APTED, and with n_jobs > 1 the samples are evaluated in chunks by a
+    process pool that receives the cached trees.
+
+    The pool uses the spawn start method: TableMetric evaluates TEDS inside
+    the trainer, and a forked copy of it would inherit its paddle runtime and
+    threads. Spawned workers take a moment to start, so n_jobs > 1 pays off
+    for large evaluation sets such as the offline eval_table.py.
+    """
 
     def __init__(self, structure_only=False, n_jobs=1, ignore_nodes=None):
         assert isinstance(n_jobs, int) and (
@@ -117,6 +146,7 @@ class TEDS(object):
         self.n_jobs = n_jobs
         self.ignore_nodes = ignore_nodes
         self.__tokens__ = []
+        self.true_cache = {}
 
     def tokenize(self, node):
         """Tokenizes table cells"""
@@ -157,35 +187,75 @@ class TEDS(object):
         if parent is None:
             return new_node
 
-    def evaluate(self, pred, true):
-        """Computes TEDS score between the prediction and the ground truth of a
-        given sample
+    def parse(self, html_str):
+        """Parses an html string into (apted tree, number of nodes, bracket
+        notation of the tree), or None if it does not contain a table
         """
         try_import("lxml")
         from lxml import etree, html
 
+        if not html_str:
+            return None
+        parser = html.HTMLParser(remove_comments=True, encoding="utf-8")
+        root = html.fromstring(html_str, parser=parser)
+        if not root.xpath("body/table"):
+            return None
+        table = root.xpath("body/table")[0]
+        if self.ignore_nodes:
+            etree.strip_tags(table, *self.ignore_nodes)
+        n_nodes = len(table.xpath(".//*"))
+        tree = self.load_html_tree(table)
+        return tree, n_nodes, tree.bracket()
+
+    def parse_true(self, html_str):
+        """parse with a cache, for ground truth that is evaluated repeatedly"""
+        if html_str not in self.true_cache:
+            self.true_cache[html_str] = self.parse(html_str)
+        return self.true_cache[html_str]
+
+    def evaluate(self, pred, true):
+        """Computes TEDS score between the prediction and the ground truth of a
+        given sample
+        """
         if (not pred) or (not true):
             return 0.0
-        parser = html.HTMLParser(remove_comments=True, encoding="utf-8")
-        pred = html.fromstring(pred, parser=parser)
-        true = html.fromstring(true, parser=parser)
-        if pred.xpath("body/table") and true.xpath("body/table"):
-            pred = pred.xpath("body/table")[0]
-            true = true.xpath("body/table")[0]
-            if self.ignore_nodes:
-                etree.strip_tags(pred, *self.ignore_nodes)
-                etree.strip_tags(true, *self.ignore_nodes)
-            n_nodes_pred = len(pred.xpath(".//*"))
-            n_nodes_true = len(true.xpath(".//*"))
-            n_nodes = max(n_nodes_pred, n_nodes_true)
-            tree_pred = self.load_html_tree(pred)
-            tree_true = self.load_html_tree(true)
-            distance = APTED(
-                tree_pred, tree_true, CustomConfig()
-            ).compute_edit_distance()
-            return 1.0 - (float(distance) / n_nodes)
-        else:
+        parsed_true = self.parse_true(true)
+        if parsed_true is None:
             return 0.0
+        parsed_pred = self.parse(pred)
+        if parsed_pred is None:
+            return 0.0
+        tree_pred, n_nodes_pred, bracket_pred = parsed_pred
+        tree_true, n_nodes_true, bracket_true = parsed_true
+        # identical trees are at distance 0
+        if bracket_pred == bracket_true:
+            return 1.0
+        n_nodes = max(n_nodes_pred, n_nodes_true)
+        distance = APTED(tree_pred, tree_true, CustomConfig()).compute_edit_distance()
+        return 1.0 - (float(distance) / n_nodes)
+
+    def _evaluate_parallel(self, pred_htmls, true_htmls):
+        # parse the ground truth once in the parent, the workers get the trees
+        # of this evaluation instead of parsing them again
+        worker_teds = TEDS(self.structure_only, 1, self.ignore_nodes)
+        for true_html in true_htmls:
+            if true_html:
+                worker_teds.true_cache[true_html] = self.parse_true(true_html)
+        chunk = list(enumerate(pred_htmls))
+        chunk_size = max(1, int(math.ceil(len(chunk) / (self.n_jobs * 4))))
+        chunks = [chunk[i : i + chunk_size] for i in range(0, len(chunk), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=self.n_jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(worker_teds, list(true_htmls)),
+        ) as pool:
+            scores = []
+            for chunk_scores in tqdm(
+                pool.map(_evaluate_chunk, chunks), total=len(chunks), unit="chunk"
+            ):
+                scores.extend(chunk_scores)
+        return scores
 
     def batch_evaluate(self, pred_json, true_json):
         """Computes TEDS score between the prediction and the ground truth of
@@ -194,23 +264,18 @@ class TEDS(object):
         @params true_json: {'FILENAME': {'html': 'HTML CODE'}, ...}
         @output: {'FILENAME': 'TEDS SCORE', ...}
         """
-        samples = true_json.keys()
+        samples = list(true_json.keys())
+        pred_htmls = [pred_json.get(filename, "") for filename in samples]
+        true_htmls = [true_json[filename]["html"] for filename in samples]
         if self.n_jobs == 1:
             scores = [
-                self.evaluate(pred_json.get(filename, ""), true_json[filename]["html"])
-                for filename in tqdm(samples)
+                self.evaluate(pred_html, true_html)
+                for pred_html, true_html in tqdm(
+                    zip(pred_htmls, true_htmls), total=len(samples)
+                )
             ]
         else:
-            inputs = [
-                {
-                    "pred": pred_json.get(filename, ""),
-                    "true": true_json[filename]["html"],
-                }
-                for filename in samples
-            ]
-            scores = parallel_process(
-                inputs, self.evaluate, use_kwargs=True, n_jobs=self.n_jobs, front_num=1
-            )
+            scores = self._evaluate_parallel(pred_htmls, true_htmls)
         scores = dict(zip(samples, scores))
         return scores
 
@@ -224,14 +289,7 @@ class TEDS(object):
                 for (pred_html, true_html) in zip(pred_htmls, true_htmls)
             ]
         else:
-            inputs = [
-                {"pred": pred_html, "true": true_html}
-                for (pred_html, true_html) in zip(pred_htmls, true_htmls)
-            ]
-
-            scores = parallel_process(
-                inputs, self.evaluate, use_kwargs=True, n_jobs=self.n_jobs, front_num=1
-            )
+            scores = self._evaluate_parallel(pred_htmls, true_htmls)
         return scores
 
 
@@ -147,6 +147,19 @@ def init_args():
         default=(255, 255, 255),
         help="Replacement color for the alpha channel, if the latter is present; R,G,B integers",
     )
+    # params for pdf input
+    parser.add_argument(
+        "--pdf_dpi",
+        type=int,
+        default=None,
+        help="Dpi of the rendered pdf pages, 144 by default or 72 for large pages",
+    )
+    parser.add_argument(
+        "--pdf_render_workers",
+        type=int,
+        default=1,
+        help="Render pdf pages ahead in a background thread, 0 renders in the caller",
+    )
 
     return parser
 
@@ -0,0 +1,128 @@
+import json
+import os
+import sys
+
+import numpy as np
+import paddle
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.utils.logging import get_logger
+from ppocr.utils.save_load import CheckpointWriter, prune_checkpoints, save_model
+
+CONFIG = {"Architecture": {"model_type": "rec", "algorithm": "SVTR"}}
+
+
+def test_best_model_is_written_in_background(tmp_path):
+    model = paddle.nn.Linear(4, 3)
+    optimizer = paddle.optimizer.Adam(parameters=model.parameters())
+    weight = model.weight.numpy()
+    writer = CheckpointWriter()
+    save_model(
+        model,
+        optimizer,
+        str(tmp_path),
+        get_logger(),
+        CONFIG,
+        is_best=True,
+        prefix="best_accuracy",
+        writer=writer,
+        epoch=3,
+    )
+    # the checkpoint holds the parameters at the time of the call
+    model.weight.set_value(paddle.zeros_like(model.weight))
+    writer.wait()
+
+    params = paddle.load(str(tmp_path / "best_accuracy.pdparams"))
+    np.testing.assert_array_equal(params["weight"].numpy(), weight)
+    best_params = tmp_path / "best_model" / "model.pdparams"
+    assert os.path.samefile(best_params, tmp_path / "best_accuracy.pdparams")
+    assert (tmp_path / "best_model" / "model.pdopt").exists()
+    states = paddle.load(str(tmp_path / "best_accuracy.states"))
+    assert states == {"epoch": 3}
+    assert not any(".tmp" in name for name in os.listdir(tmp_path))
+
+
+def test_prune_checkpoints(tmp_path):
+    for epoch in (1, 2, 10):
+        for suffix in (".pdparams", ".pdopt", ".states"):
+            (tmp_path / "iter_epoch_{}{}".format(epoch, suffix)).write_bytes(b"")
+        (tmp_path / "iter_epoch_{}".format(epoch)).mkdir()
+    (tmp_path / "latest.pdparams").write_bytes(b"")
+    prune_checkpoints(str(tmp_path), 2)
+    names = sorted(os.listdir(tmp_path))
+    assert "latest.pdparams" in names
+    assert not any(name.startswith("iter_epoch_1.") for name in names)
+    assert "iter_epoch_1" not in names
+    assert "iter_epoch_2" in names and "iter_epoch_10.pdparams" in names
+
+
+def test_prune_checkpoints_updates_train_results(tmp_path):
+    models = {"best": {"pdparams": "best_accuracy/best_accuracy.pdparams"}}
+    for i, epoch in enumerate((10, 8, 6, 4, 2), 1):
+        prefix = "iter_epoch_{}".format(epoch)
+        (tmp_path / prefix).mkdir()
+        (tmp_path / prefix / (prefix + ".pdparams")).write_bytes(b"")
+        models["last_{}".format(i)] = {
+            "score": 0.5,
+            "pdparams": os.path.join(prefix, prefix + ".pdparams"),
+            "pdmodel": os.path.join(prefix, "inference", "inference.json"),
+        }
+    results_path = tmp_path / "train_result.json"
+    results_path.write_text(json.dumps({"model_name": "m", "models": models}))
+    prune_checkpoints(str(tmp_path), 2)
+
+    results = json.loads(results_path.read_text())
+    assert sorted(name for name in os.listdir(tmp_path) if "iter" in name) == [
+        "iter_epoch_10",
+        "iter_epoch_8",
+    ]
+    for key in ("last_1", "last_2", "best"):
+        assert results["models"][key] == models[key]
+        path = tmp_path / results["models"][key]["pdparams"]
+        assert key == "best" or path.exists()
+    assert [results["models"]["last_{}".format(i)] for i in (3, 4, 5)] == [{}] * 3
+    assert results["model_name"] == "m"
+
+
+def test_train_results_with_pruning(tmp_path):
+    # the iter_epoch saving of tools/program.py with uniform output
+    config = {
+        "Global": {"save_model_dir": str(tmp_path), "model_name": "m"},
+        "Architecture": CONFIG["Architecture"],
+    }
+    model = paddle.nn.Linear(4, 3)
+    optimizer = paddle.optimizer.Adam(parameters=model.parameters())
+    best_model_dict = {"acc": 0.0}
+    writer = CheckpointWriter()
+    for epoch in range(1, 8):
+        prefix = "iter_epoch_{}".format(epoch)
+        best_model_dict["acc"] = epoch / 10
+        save_model(
+            model,
+            optimizer,
+            str(tmp_path / prefix),
+            get_logger(),
+            config,
+            prefix=prefix,
+            save_model_info={"epoch": epoch, "metric": best_model_dict},
+            done_flag=epoch == 7,
+            writer=writer,
+            epoch=epoch,
+        )
+        writer.submit([(prune_checkpoints, (str(tmp_path), 2))])
+    writer.wait()
+
+    results = json.loads((tmp_path / "train_result.json").read_text())
+    assert results["done_flag"]
+    models = results["models"]
+    # the score is the metric at the time of each save
+    assert [models["last_{}".format(i)]["score"] for i in (1, 2)] == [0.7, 0.6]
+    for i in (1, 2):
+        assert (tmp_path / models["last_{}".format(i)]["pdparams"]).exists()
+    assert [models["last_{}".format(i)] for i in (3, 4, 5)] == [{}] * 3
+    assert sorted(name for name in os.listdir(tmp_path) if "iter" in name) == [
+        "iter_epoch_6",
+        "iter_epoch_7",
+    ]
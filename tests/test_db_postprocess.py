@@ -0,0 +1,64 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.db_postprocess import DBPostProcess
+
+
+def synthetic_prob_map(seed, size=480, num_boxes=150, rotated_ratio=0.3):
+    rng = np.random.RandomState(seed)
+    prob_map = np.zeros((size, size), dtype=np.float32)
+    for _ in range(num_boxes):
+        center = rng.uniform(0, size, 2)
+        box_size = (rng.uniform(8, size / 8), rng.uniform(4, 16))
+        angle = rng.uniform(-10, 10) if rng.rand() < rotated_ratio else 0
+        points = cv2.boxPoints((tuple(center), box_size, angle)).astype(np.int32)
+        cv2.fillPoly(prob_map, [points], float(rng.uniform(0.5, 1.0)))
+    return cv2.GaussianBlur(prob_map, (5, 5), 0)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("score_mode", ["fast", "slow"])
+def test_vectorized_boxes_match_reference(seed, score_mode):
+    post_process = DBPostProcess(
+        thresh=0.3, box_thresh=0.6, unclip_ratio=1.5, score_mode=score_mode
+    )
+    prob_map = synthetic_prob_map(seed)
+    bitmap = prob_map > post_process.thresh
+    ref_boxes, ref_scores = post_process.boxes_from_bitmap(prob_map, bitmap, 480, 480)
+    vec_boxes, vec_scores = post_process.boxes_from_bitmap_vectorized(
+        prob_map, bitmap, 480, 480
+    )
+    assert len(ref_boxes) > 0
+    assert vec_boxes.dtype == ref_boxes.dtype
+    np.testing.assert_array_equal(vec_boxes, ref_boxes)
+    assert vec_scores == ref_scores
+
+
+def test_vectorized_score_matches_box_score_fast():
+    post_process = DBPostProcess()
+    prob_map = synthetic_prob_map(3)
+    rng = np.random.RandomState(0)
+    boxes = []
+    for _ in range(50):
+        rect = ((rng.uniform(-5, 485), rng.uniform(-5, 485)), (30, 10), 0)
+        boxes.append(cv2.boxPoints(rect))
+    boxes = np.array(boxes, dtype=np.float32)
+    expected = [post_process.box_score_fast(prob_map, box) for box in boxes]
+    np.testing.assert_allclose(
+        post_process.box_score_fast_batch(prob_map, boxes), expected, rtol=1e-6
+    )
+
+
+def test_vectorized_call_with_empty_map():
+    post_process = DBPostProcess(vectorized=True)
+    outs = {"maps": np.zeros((2, 1, 64, 64), dtype=np.float32)}
+    shape_list = np.array([[64, 64, 1.0, 1.0], [64, 64, 1.0, 1.0]])
+    result = post_process(outs, shape_list)
+    assert [len(r["points"]) for r in result] == [0, 0]
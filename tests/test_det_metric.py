@@ -0,0 +1,93 @@
+import os
+import sys
+
+import numpy as np
+from shapely.geometry import Polygon
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.metrics.det_metric import DetMetric
+from ppocr.metrics.eval_det_iou import DetectionIoUEvaluator, valid_polygons
+from ppocr.utils.poly_nms import convex_intersection_area
+
+
+def rotated_rect(cx, cy, w, h, angle):
+    c, s = np.cos(angle), np.sin(angle)
+    pts = np.array([[-w, -h], [w, -h], [w, h], [-w, h]]) / 2
+    return pts @ np.array([[c, s], [-s, c]]) + [cx, cy]
+
+
+def box(x0, y0, x1, y1):
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float64)
+
+
+def test_quad_intersection_matches_shapely():
+    rng = np.random.RandomState(0)
+    quads_a, quads_b = [], []
+    for _ in range(500):
+        quads_a.append(rotated_rect(*rng.uniform(0, 20, 2), *rng.uniform(1, 20, 3)))
+        quads_b.append(rotated_rect(*rng.uniform(0, 20, 2), *rng.uniform(1, 20, 3)))
+    # shared edges, identical boxes and boxes touching along an edge
+    quads_a += [box(0, 0, 10, 10), box(0, 0, 10, 10), box(0, 0, 10, 10)]
+    quads_b += [box(0, 0, 10, 10), box(5, 0, 10, 10), box(10, 0, 20, 10)]
+    _, polygons_a = valid_polygons(quads_a)
+    _, polygons_b = valid_polygons(quads_b)
+    assert polygons_a.is_quad.all() and polygons_b.is_quad.all()
+    inter = convex_intersection_area(polygons_a.quads, polygons_b.quads)
+    expected = [
+        Polygon(a).intersection(Polygon(b)).area for a, b in zip(quads_a, quads_b)
+    ]
+    np.testing.assert_allclose(inter, expected, atol=1e-8)
+
+
+def test_invalid_and_non_quad_polygons():
+    bowtie = np.array([[0, 0], [10, 10], [10, 0], [0, 10]])
+    concave = np.array([[0, 0], [10, 0], [2, 2], [0, 10]])
+    pentagon = np.array([[0, 0], [10, 0], [12, 5], [10, 10], [0, 10]])
+    keep, polygons = valid_polygons([bowtie, concave, box(0, 0, 5, 5), pentagon])
+    assert list(keep) == [1, 2, 3]
+    assert list(polygons.is_quad) == [False, True, False]
+    np.testing.assert_allclose(polygons.areas, [20, 25, 110])
+
+
+def test_evaluate_image():
+    evaluator = DetectionIoUEvaluator()
+    gt = [
+        {"points": box(0, 0, 10, 10), "ignore": False},
+        {"points": box(20, 0, 30, 10), "ignore": False},
+        {"points": box(40, 0, 50, 10), "ignore": True},
+    ]
+    pred = [
+        {"points": box(1, 0, 10, 10)},
+        # a second det on the first gt is not matched again
+        {"points": box(0, 0, 10, 9)},
+        {"points": box(41, 1, 50, 10)},
+        {"points": box(100, 100, 110, 110)},
+    ]
+    result = evaluator.evaluate_image(gt, pred)
+    assert result == {"gtCare": 2, "detCare": 3, "detMatched": 1}
+
+
+def run_det_metric(num_workers):
+    rng = np.random.RandomState(0)
+    metric = DetMetric(num_workers=num_workers, chunk_size=3)
+    for _ in range(4):
+        gt_polygons, ignore_tags, preds = [], [], []
+        for _ in range(2):
+            gts = [rotated_rect(*rng.uniform(0, 100, 2), 20, 8, 0.1) for _ in range(5)]
+            dets = [g + rng.uniform(-3, 3, 2) for g in gts[:4]]
+            gt_polygons.append(np.array(gts))
+            ignore_tags.append(np.array([False] * 4 + [True]))
+            preds.append({"points": np.array(dets)})
+        metric(preds, [None, None, gt_polygons, ignore_tags])
+    metrics = metric.get_metric()
+    # the worker processes do not outlive the evaluation
+    assert metric.executor is None
+    return metrics
+
+
+def test_det_metric_workers():
+    metrics = run_det_metric(0)
+    assert metrics["precision"] > 0.5 and metrics["recall"] > 0.5
+    assert run_det_metric(2) == metrics
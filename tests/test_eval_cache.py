@@ -0,0 +1,113 @@
+import logging
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.data.simple_dataset import SimpleDataSet
+
+
+class CountingOp(object):
+    def __init__(self, op):
+        self.op = op
+        self.calls = 0
+
+    def __call__(self, data):
+        self.calls += 1
+        return self.op(data)
+
+
+@pytest.fixture
+def eval_data(tmp_path):
+    rng = np.random.RandomState(0)
+    lines = []
+    for i in range(6):
+        image = rng.randint(0, 255, (32, 60 + 20 * i, 3)).astype(np.uint8)
+        cv2.imwrite(str(tmp_path / "{}.png".format(i)), image)
+        lines.append("{}.png\tlabel{}".format(i, i))
+    label_file = tmp_path / "val.txt"
+    label_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(tmp_path), str(label_file)
+
+
+def make_dataset(data_dir, label_file, cache_op_idx):
+    config = {
+        "Global": {"save_model_dir": os.path.join(data_dir, "output")},
+        "Eval": {
+            "dataset": {
+                "name": "SimpleDataSet",
+                "data_dir": data_dir,
+                "label_file_list": [label_file],
+                "cache_op_idx": cache_op_idx,
+                "transforms": [
+                    {"DecodeImage": {"img_mode": "BGR"}},
+                    {"RecResizeImg": {"image_shape": [3, 48, 320]}},
+                    {"KeepKeys": {"keep_keys": ["image", "label", "valid_ratio"]}},
+                ],
+            },
+            "loader": {"shuffle": False},
+        },
+    }
+    return SimpleDataSet(config, "Eval", logging.getLogger(__name__))
+
+
+def test_cached_eval_data_matches_uncached(eval_data):
+    data_dir, label_file = eval_data
+    expected = [sample for sample in make_dataset(data_dir, label_file, 0)]
+
+    dataset = make_dataset(data_dir, label_file, 2)
+    decode = dataset.ops[0] = CountingOp(dataset.ops[0])
+    first = [dataset[i] for i in range(len(dataset))]
+    assert decode.calls == len(dataset)
+
+    # a new dataset, like the one of the next training run, reuses the cache
+    dataset = make_dataset(data_dir, label_file, 2)
+    decode = dataset.ops[0] = CountingOp(dataset.ops[0])
+    second = [dataset[i] for i in range(len(dataset))]
+    assert decode.calls == 0
+
+    for outs in (first, second):
+        for sample, ref in zip(outs, expected):
+            np.testing.assert_array_equal(sample[0], ref[0])
+            assert sample[1:] == ref[1:]
+
+
+def test_modified_image_misses_cache(eval_data):
+    data_dir, label_file = eval_data
+    dataset = make_dataset(data_dir, label_file, 2)
+    [dataset[i] for i in range(len(dataset))]
+
+    image_path = os.path.join(data_dir, "0.png")
+    cv2.imwrite(image_path, np.zeros((32, 100, 3), dtype=np.uint8))
+    os.utime(image_path, ns=(0, 123456789))
+    dataset = make_dataset(data_dir, label_file, 2)
+    decode = dataset.ops[0] = CountingOp(dataset.ops[0])
+    [dataset[i] for i in range(len(dataset))]
+    assert decode.calls == 1
+
+
+def test_same_label_line_under_two_data_dirs(tmp_path):
+    # same label line, image size and mtime, different content and data_dir
+    label_file = tmp_path / "val.txt"
+    label_file.write_text("0.bmp\tlabel\n", encoding="utf-8")
+    outputs = []
+    for value in (0, 255):
+        data_dir = tmp_path / "data{}".format(value)
+        data_dir.mkdir()
+        image_path = str(data_dir / "0.bmp")
+        cv2.imwrite(image_path, np.full((32, 64, 3), value, dtype=np.uint8))
+        os.utime(image_path, ns=(0, 123456789))
+        dataset = make_dataset(str(data_dir), str(label_file), 2)
+        # both datasets share one cache directory
+        dataset.eval_cache.cache_dir = str(tmp_path / "cache")
+        os.makedirs(dataset.eval_cache.cache_dir, exist_ok=True)
+        outputs.append(dataset[0][0])
+    assert os.path.getsize(str(tmp_path / "data0" / "0.bmp")) == os.path.getsize(
+        str(tmp_path / "data255" / "0.bmp")
+    )
+    assert not np.array_equal(outputs[0], outputs[1])
@@ -0,0 +1,119 @@
+import os
+import sys
+
+import numpy as np
+import paddle
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.modeling.backbones.rec_donut_swin import DonutSwinModelOutput
+from ppocr.modeling.heads.rec_ppformulanet_head import PPFormulaNet_Head
+from ppocr.modeling.heads.rec_unimernet_head import UniMERNetHead
+
+
+def generate_one(head, encoder_hidden_states):
+    encoder_outputs = DonutSwinModelOutput(
+        last_hidden_state=encoder_hidden_states,
+        pooler_output=None,
+        hidden_states=None,
+        attentions=None,
+        reshaped_hidden_states=None,
+    )
+    model_kwargs = {
+        "output_attentions": False,
+        "output_hidden_states": False,
+        "use_cache": True,
+    }
+    if isinstance(head, PPFormulaNet_Head):
+        return head.generate(encoder_outputs, model_kwargs).numpy()[0]
+    model_kwargs["encoder_outputs"] = encoder_outputs
+    return head.generate(model_kwargs).numpy()[0]
+
+
+def check_stream(head, enc, expected):
+    for num_slots in (1, 2, 8):
+        stream = head.generate_stream([enc[:4], enc[4:5], enc[5:]], num_slots)
+        results = dict(stream)
+        assert sorted(results) == list(range(len(expected)))
+        for index, tokens in results.items():
+            np.testing.assert_array_equal(tokens, expected[index])
+
+
+def set_early_eos(head, reference, num_start):
+    """
+    Pick an eos that ends some formulas early, so slots are freed and
+    refilled, and return the outputs of generate cut at that eos.
+    """
+    tokens, counts = np.unique(
+        [tok for tokens in reference for tok in set(tokens[num_start:])],
+        return_counts=True,
+    )
+    head.eos_token_id = int(tokens[np.argmax((counts > 1) & (counts < 6))])
+    expected = []
+    for tokens in reference:
+        ends = np.nonzero(tokens[num_start:] == head.eos_token_id)[0]
+        expected.append(tokens[: ends[0] + num_start + 1] if len(ends) > 0 else tokens)
+    return expected
+
+
+def test_stream_matches_generate_of_every_image():
+    paddle.seed(1)
+    head = UniMERNetHead(
+        max_new_tokens=12,
+        encoder_hidden_size=48,
+        decoder_hidden_size=32,
+        decoder_ffn_dim=64,
+        decoder_layers=2,
+    )
+    head.eval()
+    enc = 5 * paddle.randn([6, 10, 48])
+    reference = [generate_one(head, enc[i : i + 1]) for i in range(6)]
+    assert all(len(tokens) == 13 for tokens in reference)
+    check_stream(head, enc, reference)
+
+    expected = set_early_eos(head, reference, 1)
+    assert 1 < sum(len(tokens) < 13 for tokens in expected) < 6
+    check_stream(head, enc, expected)
+
+
+def test_stream_forces_eos_at_max_length():
+    paddle.seed(1)
+    head = UniMERNetHead(
+        max_new_tokens=12,
+        encoder_hidden_size=32,
+        decoder_hidden_size=32,
+        decoder_ffn_dim=64,
+        decoder_layers=1,
+        length_aware=False,
+    )
+    head.eval()
+    head.logits_processor[0].max_length = 8
+    enc = paddle.randn([6, 10, 32])
+    reference = [generate_one(head, enc[i : i + 1]) for i in range(6)]
+    assert all(len(tokens) == 8 and tokens[-1] == 2 for tokens in reference)
+    check_stream(head, enc, reference)
+
+
+def test_formulanet_stream_matches_generate():
+    for use_parallel in (False, True):
+        paddle.seed(1)
+        head = PPFormulaNet_Head(
+            max_new_tokens=12,
+            encoder_hidden_size=48,
+            decoder_hidden_size=32,
+            decoder_ffn_dim=64,
+            decoder_layers=2,
+            use_parallel=use_parallel,
+            parallel_step=3,
+        )
+        head.eval()
+        num_start = 3 if use_parallel else 1
+        enc = 5 * paddle.randn([6, 10, 48])
+        reference = [generate_one(head, enc[i : i + 1]) for i in range(6)]
+        assert all(len(tokens) == num_start + 12 for tokens in reference)
+        check_stream(head, enc, reference)
+
+        expected = set_early_eos(head, reference, num_start)
+        assert 1 < sum(len(tokens) < num_start + 12 for tokens in expected) < 6
+        check_stream(head, enc, expected)
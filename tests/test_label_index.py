@@ -0,0 +1,97 @@
+import logging
+import os
+import pickle
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.data.label_index import LabelIndex, build_label_index, index_prefix
+from ppocr.data.ratio_sampler import RatioBatchSampler
+from ppocr.data.simple_dataset import SimpleDataSet
+
+
+@pytest.fixture
+def rec_data(tmp_path):
+    image = np.full((32, 100, 3), 255, dtype=np.uint8)
+    names = []
+    for i in range(20):
+        name = "img_{}.jpg".format(i)
+        cv2.imwrite(str(tmp_path / name), image)
+        names.append(name)
+    label_file = tmp_path / "train.txt"
+    lines = ["{}\tlabel{}".format(name, i) for i, name in enumerate(names)]
+    # a blank line and a CRLF line break, both common in real label files
+    label_file.write_bytes(
+        ("\n".join(lines[:10]) + "\n\n" + "\r\n".join(lines[10:]) + "\n").encode()
+    )
+    return str(tmp_path), str(label_file), lines
+
+
+def make_config(data_dir, label_file, mode, use_label_index, ratio=1.0):
+    return {
+        "Global": {},
+        mode: {
+            "dataset": {
+                "name": "SimpleDataSet",
+                "data_dir": data_dir,
+                "label_file_list": [label_file],
+                "ratio_list": [ratio],
+                "use_label_index": use_label_index,
+                "transforms": [{"DecodeImage": {"img_mode": "BGR"}}],
+            },
+            "loader": {"shuffle": mode == "Train"},
+        },
+    }
+
+
+def test_build_and_read_label_index(rec_data):
+    _, label_file, lines = rec_data
+    assert build_label_index(label_file) == len(lines)
+    label_index = LabelIndex(index_prefix(label_file))
+    assert [label_index[i].decode() for i in range(len(label_index))] == lines
+    # memory maps are reopened after pickling, e.g. in DataLoader workers
+    restored = pickle.loads(pickle.dumps(label_index))
+    assert restored[19].decode() == lines[19]
+
+
+def test_missing_label_index(rec_data):
+    _, label_file, _ = rec_data
+    with pytest.raises(FileNotFoundError):
+        LabelIndex(index_prefix(label_file))
+
+
+@pytest.mark.parametrize("mode", ["Train", "Eval"])
+def test_simple_dataset_with_label_index(rec_data, mode):
+    data_dir, label_file, lines = rec_data
+    build_label_index(label_file)
+    logger = logging.getLogger(__name__)
+    plain = SimpleDataSet(
+        make_config(data_dir, label_file, mode, False), mode, logger, seed=0
+    )
+    indexed = SimpleDataSet(
+        make_config(data_dir, label_file, mode, True), mode, logger, seed=0
+    )
+    assert len(indexed) == len(lines)
+    labels = [indexed[i]["label"] for i in range(len(indexed))]
+    assert sorted(labels) == sorted(line.split("\t")[1] for line in lines)
+    if mode == "Eval":
+        assert labels == [line.split("\t")[1] for line in lines]
+    # the plain dataset keeps the blank line
+    assert len(plain) == len(lines) + 1
+
+
+def test_ratio_list_with_label_index(rec_data):
+    data_dir, label_file, _ = rec_data
+    build_label_index(label_file)
+    config = make_config(data_dir, label_file, "Train", True, ratio=0.5)
+    dataset = SimpleDataSet(config, "Train", logging.getLogger(__name__), seed=0)
+    # all lines are kept, the sampler draws half of them every epoch
+    assert len(dataset) == 20
+    sampler = RatioBatchSampler(dataset, batch_size=4, shuffle=True)
+    indices = [idx for batch in sampler for idx in batch]
+    assert len(set(dataset.data_lines.line_ids[indices].tolist())) == 10
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+import paddle
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.modeling.heads.rec_latexocr_head import LaTeXOCRHead
+
+
+def full_greedy(head, context, steps):
+    # the reference decodes the whole sequence at every step
+    out = paddle.full([context.shape[0], 1], head.bos_token, dtype="int64")
+    for _ in range(steps):
+        mask = paddle.full_like(out, True, dtype=paddle.bool)
+        logits = head.net(out, mask=mask, context=context)[:, -1, :]
+        out = paddle.concat([out, logits.argmax(-1, keepdim=True)], axis=-1)
+    return out[:, 1:].numpy()
+
+
+def test_cached_greedy_matches_full_decode():
+    paddle.seed(0)
+    head = LaTeXOCRHead(
+        decoder_args={"attn_on_attn": True, "cross_attend": True, "ff_glu": True},
+        greedy=True,
+    )
+    head.eval()
+    context = paddle.randn([3, 40, 256])
+    expected = full_greedy(head, context, 12)
+
+    bos = paddle.full([3, 1], head.bos_token, dtype="int64")
+    pred = head.generate(bos, 12, context=context)
+    np.testing.assert_array_equal(pred.numpy(), expected)
+
+    # finished sequences leave the batch and are padded after their eos
+    eos = int(expected[0, 3])
+    pred = head.generate(bos, 12, eos_token=eos, context=context).numpy()
+    ends = [list(row).index(eos) + 1 if eos in row else len(row) for row in expected]
+    assert pred.shape == (3, max(ends))
+    for row, end in zip(range(3), ends):
+        np.testing.assert_array_equal(pred[row, :end], expected[row, :end])
+        assert (pred[row, end:] == head.pad_value).all()
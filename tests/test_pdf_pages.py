@@ -0,0 +1,65 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.utils.utility import PDFPages, check_and_read
+
+fitz = pytest.importorskip("fitz")
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    doc = fitz.open()
+    for i in range(7):
+        # every third page is large enough to be rendered at 72 dpi
+        width, height = (1200, 900) if i % 3 == 0 else (595, 842)
+        page = doc.new_page(width=width, height=height)
+        page.insert_text((72, 72 + 20 * i), "page {}".format(i), fontsize=24)
+    path = str(tmp_path / "doc.pdf")
+    doc.save(path)
+    return path
+
+
+def reference_pages(path):
+    imgs = []
+    with fitz.open(path) as pdf:
+        for page in pdf:
+            pm = page.get_pixmap(matrix=fitz.Matrix(2, 2), alpha=False)
+            if pm.width > 2000 or pm.height > 2000:
+                pm = page.get_pixmap(matrix=fitz.Matrix(1, 1), alpha=False)
+            rgb = np.frombuffer(pm.samples, dtype=np.uint8)
+            imgs.append(rgb.reshape(pm.height, pm.width, 3)[:, :, ::-1])
+    return imgs
+
+
+def test_lazy_pages_match_eager_rendering(pdf_path):
+    expected = reference_pages(pdf_path)
+    pages, flag_gif, flag_pdf = check_and_read(pdf_path)
+    assert flag_pdf and not flag_gif and len(pages) == len(expected)
+    for num_workers in (0, 2):
+        pages = PDFPages(pdf_path, num_workers=num_workers, read_ahead=2)
+        for img, ref in zip(pages, expected):
+            np.testing.assert_array_equal(img, ref)
+    first = pages[:3]
+    assert isinstance(first, PDFPages) and len(first) == 3
+    for img, ref in zip(first, expected):
+        np.testing.assert_array_equal(img, ref)
+    np.testing.assert_array_equal(pages[4], expected[4])
+
+
+def test_dpi_per_page_and_early_stop(pdf_path):
+    pages = PDFPages(pdf_path, dpi=lambda index, width, height: 36 * (index + 1))
+    shapes = []
+    for img in pages:
+        shapes.append(img.shape[:2])
+        if len(shapes) == 3:
+            break
+    assert shapes == [(450, 600), (842, 595), (1263, 893)]
+    # the rendering thread stops with the iteration
+    assert not any(t.name.startswith("pdf_render") for t in threading.enumerate())
@@ -0,0 +1,93 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from tools.infer.pipeline import StagePipeline
+
+
+def pipeline_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+
+
+def jittered(func, seed):
+    rng = np.random.RandomState(seed)
+    delays = rng.uniform(0, 0.002, 1000)
+
+    def stage(item):
+        time.sleep(delays[item % len(delays)])
+        return func(item)
+
+    return stage
+
+
+def test_items_keep_their_order():
+    stages = [
+        ("double", jittered(lambda x: 2 * x, 0)),
+        ("inc", jittered(lambda x: x + 1, 1)),
+        ("neg", jittered(lambda x: -x, 2)),
+    ]
+    outputs = list(StagePipeline(stages, queue_size=2).run(iter(range(200))))
+    assert outputs == [-(2 * x + 1) for x in range(200)]
+    assert pipeline_threads() == []
+    assert list(StagePipeline(stages).run([])) == []
+
+
+def test_stage_error_is_raised_in_caller():
+    def check(x):
+        if x == 7:
+            raise ValueError("bad item")
+        return x
+
+    outputs = []
+    with pytest.raises(RuntimeError, match="stage 'check'") as info:
+        for item in StagePipeline([("id", lambda x: x), ("check", check)]).run(
+            range(100)
+        ):
+            outputs.append(item)
+    assert isinstance(info.value.__cause__, ValueError)
+    # everything before the failing item is delivered
+    assert outputs == list(range(7))
+    assert pipeline_threads() == []
+
+
+def test_input_error_is_raised_in_caller():
+    def images():
+        yield 1
+        raise IOError("unreadable")
+
+    with pytest.raises(RuntimeError, match="stage 'input'") as info:
+        list(StagePipeline([("id", lambda x: x)]).run(images()))
+    assert isinstance(info.value.__cause__, IOError)
+    assert pipeline_threads() == []
+
+
+def test_early_stop_drains_and_bounds_in_flight_items():
+    fed = []
+
+    def endless():
+        i = 0
+        while True:
+            fed.append(i)
+            yield i
+            i += 1
+
+    queue_size, num_stages = 2, 3
+    stages = [("s{}".format(sno), lambda x: x) for sno in range(num_stages)]
+    outputs = StagePipeline(stages, queue_size=queue_size).run(endless())
+    in_flight = []
+    for item in outputs:
+        time.sleep(0.01)
+        in_flight.append(len(fed) - item - 1)
+        if item == 20:
+            break
+    outputs.close()
+    # queued items, plus one held by the feeder and by every stage
+    assert max(in_flight) <= (num_stages + 1) * queue_size + num_stages + 1
+    assert pipeline_threads() == []
@@ -0,0 +1,187 @@
+import os
+import sys
+
+import numpy as np
+from shapely.geometry import Polygon
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.east_postprocess import EASTPostProcess
+from ppocr.postprocess.locality_aware_nms import nms_locality, standard_nms
+from ppocr.utils.poly_nms import (
+    convex_intersection_area,
+    locality_aware_nms,
+    nms_polygons,
+    orient_convex,
+    poly_nms,
+)
+
+
+def rotated_rect(cx, cy, w, h, angle):
+    c, s = np.cos(angle), np.sin(angle)
+    pts = np.array([[-w, -h], [w, -h], [w, h], [-w, h]]) / 2
+    return pts @ np.array([[c, s], [-s, c]]) + [cx, cy]
+
+
+def greedy_nms(polys, scores, threshold):
+    polys = [Polygon(p).buffer(0) for p in polys]
+    keep = []
+    for i in np.argsort(scores, kind="stable")[::-1]:
+        ious = [
+            polys[i].intersection(polys[j]).area / polys[i].union(polys[j]).area
+            for j in keep
+        ]
+        if all(iou <= threshold for iou in ious):
+            keep.append(i)
+    return keep
+
+
+def test_nms_matches_greedy_reference():
+    rng = np.random.RandomState(0)
+    for _ in range(20):
+        num = rng.randint(1, 40)
+        polys = np.array(
+            [
+                rotated_rect(
+                    *rng.uniform(0, 100, 2), *rng.uniform(5, 40, 2), rng.rand()
+                )
+                for _ in range(num)
+            ]
+        )
+        # a few self-intersecting quads go through the shapely fallback
+        polys[::7, [0, 1]] = polys[::7, [1, 0]]
+        scores = rng.rand(num)
+        keep = nms_polygons(polys, scores, 0.3)
+        assert list(keep) == greedy_nms(polys, scores, 0.3)
+        rows = np.concatenate([polys.reshape(num, -1), scores[:, None]], axis=1)
+        np.testing.assert_allclose(standard_nms(rows, 0.3), rows[keep])
+
+
+def test_locality_merges_runs_of_neighbours():
+    base = np.array([0, 0, 100, 0, 100, 20, 0, 20], dtype=np.float64)
+    dets = []
+    for shift, score in ((0, 0.9), (1, 0.8), (2, 0.7)):
+        dets.append(np.r_[base + shift, score])
+    dets.append(np.r_[base + [0, 200] * 4, 0.95])
+    dets = np.array(dets, dtype=np.float32)
+    kept = locality_aware_nms(dets, 0.2)
+    assert kept.dtype == np.float32 and len(kept) == 2
+    # the far box has the highest single score, the merged one the summed score
+    np.testing.assert_allclose(kept[0, -1], 2.4, rtol=1e-6)
+    expected = (base * 0.9 + (base + 1) * 0.8 + (base + 2) * 0.7) / 2.4
+    np.testing.assert_allclose(kept[0, :8], expected, rtol=1e-5)
+    np.testing.assert_allclose(kept[1], dets[3])
+    assert len(nms_locality(np.zeros((0, 9)), 0.2)) == 0
+
+
+def shapely_nms_locality(polys, thres):
+    """The shapely implementation nms_locality had before vectorizing."""
+
+    def intersection(g, p):
+        g = Polygon(g[:8].reshape((4, 2))).buffer(0)
+        p = Polygon(p[:8].reshape((4, 2))).buffer(0)
+        if not g.is_valid or not p.is_valid:
+            return 0
+        inter = g.intersection(p).area
+        union = g.area + p.area - inter
+        return 0 if union == 0 else inter / union
+
+    def weighted_merge(g, p):
+        g[:8] = (g[8] * g[:8] + p[8] * p[:8]) / (g[8] + p[8])
+        g[8] = g[8] + p[8]
+        return g
+
+    S = []
+    p = None
+    for g in polys:
+        if p is not None and intersection(g, p) > thres:
+            p = weighted_merge(g, p)
+        else:
+            if p is not None:
+                S.append(p)
+            p = g
+    if p is not None:
+        S.append(p)
+    if len(S) == 0:
+        return np.array([])
+    S = np.array(S)
+    order = np.argsort(S[:, 8])[::-1]
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
+        order = order[np.where(ovr <= thres)[0] + 1]
+    return S[keep]
+
+
+def east_proposals(rng, size=128):
+    """Proposals of EASTPostProcess.detect for noisy maps of a few quads."""
+    score_map = rng.uniform(0, 0.5, (1, size, size)).astype(np.float32)
+    geo_map = np.zeros((8, size, size), dtype=np.float32)
+    ys, xs = np.mgrid[:size, :size]
+    for _ in range(4):
+        cx, cy = rng.uniform(80, 4 * size - 80, 2)
+        w, h, angle = rng.uniform(60, 200), rng.uniform(16, 40), rng.uniform(-0.3, 0.3)
+        quad = rotated_rect(cx, cy, w, h, angle)
+        inside = np.ones((size, size), dtype=bool)
+        for a, b in zip(quad, np.roll(quad, -1, axis=0)):
+            cross = (b[0] - a[0]) * (ys * 4 - a[1]) - (b[1] - a[1]) * (xs * 4 - a[0])
+            inside &= cross >= 0
+        score_map[0][inside] = rng.uniform(0.8, 1.0, inside.sum())
+        origin = np.stack([xs, ys], axis=-1)[inside] * 4
+        geo = np.tile(origin, 4) - quad.reshape(1, 8)
+        geo_map[:, inside] = (geo + rng.normal(0, 3, geo.shape)).T
+
+    post = EASTPostProcess()
+    xy_text = np.argwhere(score_map[0] > post.score_thresh)
+    xy_text = xy_text[np.argsort(xy_text[:, 0])]
+    geo = geo_map.transpose(1, 2, 0)[xy_text[:, 0], xy_text[:, 1]]
+    quads = post.restore_rectangle_quad(xy_text[:, ::-1] * 4, geo)
+    boxes = np.zeros((len(quads), 9), dtype=np.float32)
+    boxes[:, :8] = quads.reshape((-1, 8))
+    boxes[:, 8] = score_map[0][xy_text[:, 0], xy_text[:, 1]]
+    return boxes.astype(np.float64)
+
+
+def test_locality_matches_shapely_on_east_maps():
+    rng = np.random.RandomState(2)
+    for _ in range(5):
+        boxes = east_proposals(rng)
+        expected = shapely_nms_locality(boxes.copy(), 0.2)
+        kept = nms_locality(boxes, 0.2)
+        assert kept.shape == expected.shape
+        np.testing.assert_allclose(kept, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_poly_nms_boundaries():
+    outer = [0, 0, 40, 0, 60, 10, 40, 20, 0, 20]
+    inner = [1, 0, 40, 1, 59, 10, 40, 19, 1, 20]
+    other = [100, 0, 140, 0, 160, 10, 140, 20, 100, 20]
+    kept = poly_nms([inner + [0.5], outer + [0.9], other + [0.7]], 0.5)
+    assert kept == [outer + [0.9], other + [0.7]]
+    assert poly_nms([], 0.5) == []
+
+
+def test_convex_polygons_and_orientation():
+    rng = np.random.RandomState(1)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, (100, 6)), axis=1)
+    polys_a = np.stack([np.cos(angles), np.sin(angles)], axis=-1) * 10
+    polys_b = polys_a[::-1] * 0.8 + rng.uniform(-5, 5, (100, 1, 2))
+    polys_a, convex_a = orient_convex(polys_a[:, ::-1])
+    polys_b, convex_b = orient_convex(polys_b)
+    assert convex_a.all() and convex_b.all()
+    expected = [
+        Polygon(a).intersection(Polygon(b)).area for a, b in zip(polys_a, polys_b)
+    ]
+    np.testing.assert_allclose(
+        convex_intersection_area(polys_a, polys_b), expected, atol=1e-8
+    )
+
+    star = np.array([[np.cos(t), np.sin(t)] for t in np.arange(5) * 4 * np.pi / 5])
+    bowtie = np.array([[0, 0], [1, 1], [1, 0], [0, 1]], dtype=np.float64)
+    _, convex = orient_convex(np.array([star]))
+    assert not convex.any()
+    _, convex = orient_convex(np.array([bowtie]))
+    assert not convex.any()
@@ -0,0 +1,65 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.poly_score import polygon_mean_scores
+
+
+def full_mask_score(score_map, poly):
+    mask = np.zeros_like(score_map, dtype=np.uint8)
+    cv2.fillPoly(mask, poly.reshape(1, -1, 2).astype(np.int32), 1)
+    return cv2.mean(score_map, mask)[0]
+
+
+def test_scores_match_full_size_masks():
+    rng = np.random.RandomState(0)
+    score_map = rng.rand(60, 90).astype(np.float32)
+    quads = rng.randint(-20, 110, (200, 4, 2)).astype(np.int32)
+    # axis aligned rectangles in both windings, lines, and boxes off the map
+    x0, y0 = rng.randint(-30, 100, (2, 200))
+    x1, y1 = x0 + rng.randint(0, 20, 200), y0 + rng.randint(0, 20, 200)
+    rects = np.stack(
+        [
+            np.stack([x0, y0], axis=1),
+            np.stack([x1, y0], axis=1),
+            np.stack([x1, y1], axis=1),
+            np.stack([x0, y1], axis=1),
+        ],
+        axis=1,
+    ).astype(np.int32)
+    rects[::2] = rects[::2, ::-1]
+    polys = np.concatenate([quads, rects])
+    expected = [full_mask_score(score_map, poly) for poly in polys]
+    np.testing.assert_allclose(
+        polygon_mean_scores(score_map, polys), expected, rtol=1e-6, atol=1e-12
+    )
+    # one box at a time, and with a summed-area table of the whole map
+    singles = [polygon_mean_scores(score_map, poly[np.newaxis])[0] for poly in polys]
+    np.testing.assert_allclose(singles, expected, rtol=1e-6, atol=1e-12)
+    integral = cv2.integral(score_map.astype(np.float64))
+    np.testing.assert_array_equal(
+        polygon_mean_scores(score_map, polys, integral),
+        [
+            polygon_mean_scores(score_map, poly[np.newaxis], integral)[0]
+            for poly in polys
+        ],
+    )
+
+
+def test_contours_of_different_lengths():
+    rng = np.random.RandomState(1)
+    score_map = rng.rand(50, 50).astype(np.float32)
+    contours = [
+        rng.randint(0, 50, (rng.randint(3, 10), 1, 2)).astype(np.int32)
+        for _ in range(30)
+    ]
+    expected = [full_mask_score(score_map, contour) for contour in contours]
+    np.testing.assert_allclose(
+        polygon_mean_scores(score_map, contours), expected, rtol=1e-6
+    )
+    assert len(polygon_mean_scores(score_map, np.zeros((0, 4, 2)))) == 0
@@ -0,0 +1,86 @@
+import os
+import sys
+import threading
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess import build_post_process
+from tools.infer.predict_cls import TextClassifier
+
+from .testing_utils import make_stub_predictor
+
+
+class TopBrightPredictor(object):
+    """Says 180 when the lower half of a crop is brighter than the upper."""
+
+    def run(self, output_names, input_dict):
+        batch = input_dict["x"]
+        half = batch.shape[2] // 2
+        upside_down = batch[:, :, half:].mean(axis=(1, 2, 3)) > batch[:, :, :half].mean(
+            axis=(1, 2, 3)
+        )
+        probs = np.stack([~upside_down, upside_down], axis=1).astype(np.float32)
+        return [probs]
+
+
+def make_classifier(image_shape="3, 48, 192", batch_num=4):
+    return make_stub_predictor(
+        TextClassifier,
+        TopBrightPredictor(),
+        cls_image_shape=[int(v) for v in image_shape.split(",")],
+        cls_batch_num=batch_num,
+        cls_thresh=0.9,
+        postprocess_op=build_post_process(
+            {"name": "ClsPostProcess", "label_list": ["0", "180"]}
+        ),
+        batch_buffers=None,
+    )
+
+
+def random_crops(num, channels=3):
+    rng = np.random.RandomState(0)
+    crops = []
+    for _ in range(num):
+        h, w = rng.randint(20, 60), rng.randint(10, 600)
+        shape = (h, w, channels) if channels > 1 else (h, w)
+        crops.append(rng.randint(0, 255, shape).astype(np.uint8))
+    return crops
+
+
+def test_batch_preprocess_matches_single():
+    for image_shape, channels in [("3, 48, 192", 3), ("1, 48, 192", 1)]:
+        classifier = make_classifier(image_shape)
+        crops = random_crops(4, channels)
+        # run twice so that the second batch reuses a dirty buffer
+        classifier.resize_norm_img_batch(random_crops(4, channels)[::-1])
+        batch = classifier.resize_norm_img_batch(crops)
+        expected = np.stack([classifier.resize_norm_img(crop) for crop in crops])
+        np.testing.assert_array_equal(batch, expected)
+
+
+def test_upside_down_crops_are_rotated():
+    rng = np.random.RandomState(1)
+    crops, upside_down = [], []
+    for ino in range(23):
+        crop = np.zeros((32, rng.randint(20, 300), 3), dtype=np.uint8)
+        crop[:16] = 200
+        if ino % 3 == 0:
+            crop = crop[::-1].copy()
+        crops.append(crop)
+        upside_down.append(ino % 3 == 0)
+    classifier = make_classifier(batch_num=4)
+    originals = [crop.copy() for crop in crops]
+    img_list, cls_res, _ = classifier(crops)
+    # the prefetch thread does not outlive the call
+    assert not any(t.name.startswith("cls_prefetch") for t in threading.enumerate())
+
+    assert [label == "180" for label, _ in cls_res] == upside_down
+    for crop, original in zip(img_list, originals):
+        assert crop.shape == original.shape
+        assert crop[:16].mean() == 200 and crop[16:].mean() == 0
+    # the input crops are left untouched
+    for crop, original in zip(crops, originals):
+        np.testing.assert_array_equal(crop, original)
@@ -0,0 +1,125 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.data import create_operators
+from ppocr.postprocess import build_post_process
+from tools.infer.predict_det import TextDetector
+
+from .testing_utils import make_stub_predictor
+
+
+class BrightPredictor(object):
+    """DB style probability map: 1 where the input is bright."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def run(self, output_names, input_dict):
+        batch = input_dict["x"]
+        self.batch_sizes.append(len(batch))
+        return [(batch.mean(axis=1, keepdims=True) > 1.0).astype(np.float32)]
+
+
+def make_detector(batch_num=8):
+    return make_stub_predictor(
+        TextDetector,
+        BrightPredictor(),
+        args=SimpleNamespace(benchmark=False, det_box_type="quad"),
+        det_algorithm="DB",
+        det_batch_num=batch_num,
+        tile_batch_size=batch_num,
+        preprocess_op=create_operators(
+            [
+                {"DetResizeForTest": {"limit_side_len": 320, "limit_type": "max"}},
+                {
+                    "NormalizeImage": {
+                        "std": [0.229, 0.224, 0.225],
+                        "mean": [0.485, 0.456, 0.406],
+                        "scale": "1./255.",
+                        "order": "hwc",
+                    }
+                },
+                {"ToCHWImage": None},
+                {"KeepKeys": {"keep_keys": ["image", "shape"]}},
+            ]
+        ),
+        postprocess_op=build_post_process(
+            {"name": "DBPostProcess", "thresh": 0.3, "box_thresh": 0.6}
+        ),
+    )
+
+
+def frames(shapes):
+    rng = np.random.RandomState(0)
+    images = []
+    for h, w in shapes:
+        image = np.zeros((h, w, 3), dtype=np.uint8)
+        for _ in range(3):
+            x, y = rng.randint(0, w - 80), rng.randint(0, h - 30)
+            image[y : y + rng.randint(12, 30), x : x + rng.randint(30, 80)] = 255
+        images.append(image)
+    return images
+
+
+def test_batch_matches_single_images():
+    # two camera resolutions interleaved, and one odd image
+    shapes = [(480, 640), (720, 1280)] * 5 + [(400, 400)]
+    images = frames(shapes)
+    detector = make_detector(batch_num=4)
+    dt_boxes_list, _ = detector.predict_batch(images)
+    # 5 images of each camera in batches of 4, and the odd one
+    assert sorted(detector.predictor.batch_sizes) == [1, 1, 1, 4, 4]
+
+    detector.predictor = BrightPredictor()
+    for image, dt_boxes in zip(images, dt_boxes_list):
+        expected, _ = detector.predict(image)
+        assert len(expected) > 0
+        np.testing.assert_array_equal(dt_boxes, expected)
+    assert detector.predictor.batch_sizes == [1] * len(images)
+
+
+class CountingTimes(object):
+    def __init__(self):
+        self.calls = []
+
+    def start(self):
+        self.calls.append("start")
+
+    def stamp(self):
+        self.calls.append("stamp")
+
+    def end(self, stamp=False):
+        self.calls.append("end")
+
+
+def test_batch_is_timed_for_benchmark():
+    detector = make_detector(batch_num=4)
+    detector.args.benchmark = True
+    detector.autolog = SimpleNamespace(times=CountingTimes())
+    detector.predict_batch(frames([(480, 640)] * 6))
+    # one start, then a stamp after preprocessing and an end per batch
+    assert detector.autolog.times.calls == ["start"] + ["stamp", "end"] * 2
+
+
+def reject_blank(data):
+    """Preprocess op rejecting images without any bright pixel."""
+    return data if data["image"].max() > 0 else None
+
+
+def test_tiled_skips_rejected_tiles():
+    image = np.zeros((300, 900, 3), dtype=np.uint8)
+    image[100:130, 40:200] = 255
+    detector = make_detector()
+    detector.preprocess_op.insert(0, reject_blank)
+    dt_boxes, _ = detector.predict_tiled(image, (300, 300))
+    # only the first of the three tiles reaches the predictor
+    assert detector.predictor.batch_sizes == [1]
+    expected, _ = detector.predict(image[:, :300])
+    assert len(dt_boxes) == 1
+    np.testing.assert_allclose(np.array(dt_boxes), expected)
@@ -0,0 +1,99 @@
+import os
+import sys
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from tools.infer.predict_rec import TextRecognizer, get_batch_ranges
+
+REC_IMAGE_SHAPE = [3, 32, 320]
+
+
+def make_recognizer(rec_image_shape=(3, 48, 320)):
+    recognizer = TextRecognizer.__new__(TextRecognizer)
+    recognizer.rec_image_shape = list(rec_image_shape)
+    recognizer.rec_algorithm = "SVTR_LCNet"
+    recognizer.use_onnx = False
+    recognizer.batch_buffer = None
+    return recognizer
+
+
+def random_crops(num, seed=0):
+    rng = np.random.RandomState(seed)
+    crops = []
+    for _ in range(num):
+        h, w = rng.randint(12, 80), rng.randint(5, 900)
+        crops.append(rng.randint(0, 255, (h, w, 3)).astype(np.uint8))
+    return crops
+
+
+def test_batch_ranges_of_no_crops():
+    for bucket in (False, True):
+        assert get_batch_ranges([], 6, REC_IMAGE_SHAPE, bucket=bucket) == ([], 1.0)
+
+
+def test_fixed_batches_without_bucketing():
+    wh_ratios = np.linspace(1, 40, 14)
+    ranges, _ = get_batch_ranges(wh_ratios, 6, REC_IMAGE_SHAPE)
+    assert ranges == [(0, 6), (6, 12), (12, 14)]
+
+
+def test_one_very_wide_crop():
+    ranges, efficiency = get_batch_ranges([200.0], 6, REC_IMAGE_SHAPE, bucket=True)
+    assert ranges == [(0, 1)] and efficiency == 1.0
+    # without buckets it pads all short crops to its width
+    wh_ratios = [2.0] * 5 + [200.0]
+    ranges, padded = get_batch_ranges(wh_ratios, 6, REC_IMAGE_SHAPE)
+    assert ranges == [(0, 6)]
+    ranges, efficiency = get_batch_ranges(wh_ratios, 6, REC_IMAGE_SHAPE, bucket=True)
+    assert ranges == [(0, 5), (5, 6)]
+    assert efficiency > padded
+    np.testing.assert_allclose(efficiency, (5 * 64 + 6400) / (5 * 320 + 6400))
+
+
+def test_bucket_boundaries():
+    # padded widths 320 and 640 are the last of buckets 0 and 1, 641 is in 2
+    wh_ratios = [1.0, 10.0, 10.03125, 20.0, 20.03125]
+    ranges, _ = get_batch_ranges(wh_ratios, 6, REC_IMAGE_SHAPE, bucket=True)
+    assert ranges == [(0, 2), (2, 4), (4, 5)]
+
+
+def test_pixel_budget_boundaries():
+    wh_ratios = [1.0] * 7
+    budget = 3 * 32 * 320
+    ranges, _ = get_batch_ranges(
+        wh_ratios, 6, REC_IMAGE_SHAPE, bucket=True, max_batch_pixels=budget
+    )
+    assert ranges == [(0, 3), (3, 6), (6, 7)]
+    ranges, _ = get_batch_ranges(
+        wh_ratios, 6, REC_IMAGE_SHAPE, bucket=True, max_batch_pixels=budget - 1
+    )
+    assert ranges == [(0, 2), (2, 4), (4, 6), (6, 7)]
+    # crops above the budget on their own still get a batch each
+    ranges, _ = get_batch_ranges(
+        [40.0, 40.0], 6, REC_IMAGE_SHAPE, bucket=True, max_batch_pixels=budget
+    )
+    assert ranges == [(0, 1), (1, 2)]
+    # batch_num still caps a batch within the budget
+    ranges, _ = get_batch_ranges(
+        wh_ratios, 2, REC_IMAGE_SHAPE, bucket=True, max_batch_pixels=10 * budget
+    )
+    assert ranges == [(0, 2), (2, 4), (4, 6), (6, 7)]
+
+
+def test_batch_preprocess_matches_single():
+    recognizer = make_recognizer()
+    # the first batch is wider, so the second reuses a dirty, larger buffer
+    for seed, num in ((1, 8), (2, 5), (3, 1)):
+        crops = random_crops(num, seed)
+        max_wh_ratio = max(
+            [320 / 48] + [crop.shape[1] / crop.shape[0] for crop in crops]
+        )
+        batch = recognizer.resize_norm_img_batch(crops, max_wh_ratio)
+        expected = np.stack(
+            [recognizer.resize_norm_img(crop, max_wh_ratio) for crop in crops]
+        )
+        assert batch.dtype == expected.dtype
+        np.testing.assert_array_equal(batch, expected)
@@ -0,0 +1,135 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from tools.infer.predict_system import TextSystem
+
+
+class BlobDetector(object):
+    """One quad per bright blob of the image."""
+
+    def __call__(self, img):
+        mask = (img.max(axis=2) > 0).astype(np.uint8)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            boxes.append([[x, y], [x + w, y], [x + w, y + h], [x, y + h]])
+        return np.array(boxes, dtype=np.float32).reshape(-1, 4, 2), 0.01
+
+    def predict_batch(self, img_list):
+        return [self(img)[0] for img in img_list], 0.01
+
+
+class GrayRecognizer(object):
+    """Reads the gray level of a crop as its text, odd levels score low."""
+
+    def __init__(self, fail_level=None):
+        self.fail_level = fail_level
+
+    def __call__(self, img_list):
+        rec_res = []
+        for img in img_list:
+            level = int(img.max())
+            if level == self.fail_level:
+                raise ValueError("unreadable crop")
+            rec_res.append((str(level), 0.3 if level % 2 else 0.9))
+        return rec_res, 0.01
+
+
+class FlagClassifier(object):
+    """Marks every crop it sees, so the test can tell it ran."""
+
+    def __call__(self, img_list):
+        img_list = [img.copy() for img in img_list]
+        for img in img_list:
+            img[0, 0] = 255
+        return img_list, [("0", 1.0)] * len(img_list), 0.01
+
+
+def make_system(use_angle_cls=False, fail_level=None):
+    system = TextSystem.__new__(TextSystem)
+    system.text_detector = BlobDetector()
+    system.text_recognizer = GrayRecognizer(fail_level)
+    system.use_angle_cls = use_angle_cls
+    if use_angle_cls:
+        system.text_classifier = FlagClassifier()
+    system.drop_score = 0.5
+    system.args = SimpleNamespace(
+        det_box_type="quad", save_crop_res=False, stream_queue_size=2
+    )
+    system.crop_image_res_index = 0
+    return system
+
+
+def pages(num, seed=0):
+    """Images with up to four gray blocks of distinct levels, some blank."""
+    rng = np.random.RandomState(seed)
+    images = []
+    for ino in range(num):
+        image = np.zeros((200, 300, 3), dtype=np.uint8)
+        if ino % 4 != 3:
+            for bno in range(rng.randint(1, 5)):
+                x, y = rng.randint(0, 200), 50 * bno + 5
+                image[y : y + 30, x : x + rng.randint(20, 100)] = rng.randint(1, 250)
+        images.append(image)
+    return images
+
+
+def assert_same_results(results, expected):
+    assert len(results) == len(expected)
+    for (boxes, rec_res, _), (exp_boxes, exp_rec_res, _) in zip(results, expected):
+        assert rec_res == exp_rec_res
+        if exp_boxes is None:
+            assert boxes is None
+        else:
+            np.testing.assert_array_equal(np.array(boxes), np.array(exp_boxes))
+
+
+def test_stream_matches_call_in_order():
+    for use_angle_cls in (False, True):
+        system = make_system(use_angle_cls)
+        images = pages(13)
+        expected = [system(image) for image in images]
+        results = list(system.stream(iter(images)))
+        assert_same_results(results, expected)
+        assert any(len(rec_res) == 0 for _, rec_res, _ in results)
+        if use_angle_cls:
+            # the rec stage saw the crops flagged by the cls stage
+            assert all(
+                text == "255" for _, rec_res, _ in results for text, _ in rec_res
+            )
+    assert [t for t in threading.enumerate() if t.name.startswith("pipeline-")] == []
+
+
+def test_stream_raises_stage_errors():
+    images = pages(12, seed=1)
+    level = int(images[5].max())
+    system = make_system(fail_level=level)
+    with pytest.raises(RuntimeError, match="stage 'rec'") as info:
+        list(system.stream(images))
+    assert isinstance(info.value.__cause__, ValueError)
+    assert [t for t in threading.enumerate() if t.name.startswith("pipeline-")] == []
+
+
+def test_predict_batch_matches_call_per_image():
+    for use_angle_cls in (False, True):
+        system = make_system(use_angle_cls)
+        images = pages(10, seed=2)
+        images[4] = None
+        expected = [system(image) for image in images]
+        results = system.predict_batch(images)
+        assert_same_results(results, expected)
+        # blank images keep their empty result, None ones give None
+        assert results[3][0] == [] and results[3][1] == []
+        assert results[4][:2] == (None, None)
+        for _, _, time_dict in results:
+            assert set(time_dict) == {"det", "rec", "cls", "all"}
@@ -0,0 +1,52 @@
+import os
+import sys
+import threading
+
+import cv2
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.pse_postprocess import PSEPostProcess
+from ppocr.postprocess.pse_postprocess.pse import pse
+
+
+def test_pse_expands_seeds_and_drops_small_ones():
+    kernels = np.zeros((2, 12, 30), dtype=np.uint8)
+    # one text region in the large kernel holding two seeds
+    kernels[0, 2:10, 2:28] = 1
+    kernels[1, 4:8, 4:10] = 1
+    kernels[1, 4:8, 18:26] = 1
+    # a seed below min_area, its region stays background
+    kernels[0, 0:2, 0:2] = 1
+    kernels[1, 0, 0] = 1
+    label = pse(kernels, min_area=4)
+
+    assert label.dtype == np.int32
+    assert label[0, 0] == 0 and label[1, 1] == 0
+    assert len(np.unique(label)) == 3
+    assert np.array_equal(label > 0, kernels[0] * (label > 0) > 0)
+    assert (label[2:10, 2:28] > 0).all()
+    # the two seeds meet halfway between them
+    assert (label[2:10, 2:13] == label[5, 5]).all()
+    assert (label[2:10, 15:28] == label[5, 20]).all()
+
+
+def test_pse_postprocess_batch():
+    maps = np.full((2, 3, 64, 64), -10.0, dtype=np.float32)
+    for k, margin in enumerate([0, 2, 4]):
+        maps[0, k, 10 + margin : 20 - margin, 5 + margin : 40 - margin] = 10
+        maps[1, k, 30 + margin : 50 - margin, 20 + margin : 60 - margin] = 10
+    post_process = PSEPostProcess(box_thresh=0.5)
+    shape_list = np.array([[64, 64, 1.0, 1.0], [128, 128, 2.0, 2.0]])
+    results = post_process({"maps": maps}, shape_list)
+
+    assert [len(result["points"]) for result in results] == [1, 1]
+    x0, y0 = results[0]["points"][0].min(axis=0)
+    x1, y1 = results[0]["points"][0].max(axis=0)
+    assert (x0, y0, x1, y1) == (5, 10, 39, 19)
+    rect = cv2.boundingRect(results[1]["points"][0].astype(np.float32))
+    assert rect[:2] == (10, 15)
+    # the worker threads do not outlive the call
+    assert not any(t.name.startswith("pse") for t in threading.enumerate())
@@ -0,0 +1,118 @@
+import logging
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.data import build_dataloader
+from ppocr.data.ratio_sampler import RatioBatchSampler
+
+
+@pytest.fixture
+def label_files(tmp_path):
+    files = []
+    for source, num in (("a", 40), ("b", 10)):
+        label_file = tmp_path / "{}.txt".format(source)
+        lines = ["{}{}.png\t{}{}".format(source, i, source, i) for i in range(num)]
+        label_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        files.append(str(label_file))
+    return files
+
+
+def make_config(tmp_path, label_files, use_label_index=False, num_workers=0):
+    return {
+        "Global": {},
+        "Train": {
+            "dataset": {
+                "name": "SimpleDataSet",
+                "data_dir": str(tmp_path),
+                "label_file_list": label_files,
+                "ratio_list": [0.5, 1.0],
+                "use_label_index": use_label_index,
+                "transforms": [{"KeepKeys": {"keep_keys": ["label"]}}],
+            },
+            "loader": {
+                "shuffle": True,
+                "batch_size_per_card": 8,
+                "drop_last": False,
+                "num_workers": num_workers,
+            },
+        },
+    }
+
+
+def epoch_labels(loader):
+    dataset = loader.dataset
+    labels = []
+    for batch in loader.batch_sampler:
+        for idx in batch:
+            line, _ = dataset.data_lines[dataset.data_idx_order_list[idx]]
+            labels.append(line.decode("utf-8").strip("\n").split("\t")[1])
+    return labels
+
+
+def test_subsets_change_every_epoch(tmp_path, label_files):
+    config = make_config(tmp_path, label_files)
+    loader = build_dataloader(config, "Train", "cpu", logging.getLogger(__name__))
+    assert isinstance(loader.batch_sampler, RatioBatchSampler)
+    assert not loader.dataset.need_reset
+    assert len(loader.dataset) == 50 and len(loader) == 4
+
+    epochs = [epoch_labels(loader) for _ in range(2)]
+    for labels in epochs:
+        assert len(labels) == len(set(labels)) == 30
+        assert sum(label.startswith("a") for label in labels) == 20
+        assert sum(label.startswith("b") for label in labels) == 10
+    assert set(epochs[0]) != set(epochs[1])
+
+    # the subset only depends on the epoch
+    loader.batch_sampler.set_epoch(1)
+    assert epoch_labels(loader) == epochs[1]
+
+
+def test_label_index_sources(tmp_path, label_files):
+    from ppocr.data.label_index import build_label_index
+
+    for label_file in label_files:
+        build_label_index(label_file)
+    config = make_config(tmp_path, label_files, use_label_index=True)
+    loader = build_dataloader(config, "Train", "cpu", logging.getLogger(__name__))
+    labels = epoch_labels(loader)
+    assert sum(label.startswith("a") for label in labels) == 20
+    assert np.array_equal(np.bincount(loader.dataset.source_ids), [40, 10])
+
+
+def test_workers_persist_across_epochs(tmp_path, label_files):
+    # the pixel value of every image encodes its sample
+    for source, num, offset in (("a", 40, 0), ("b", 10, 100)):
+        for i in range(num):
+            image = np.full((2, 2, 3), offset + i, dtype=np.uint8)
+            cv2.imwrite(str(tmp_path / "{}{}.png".format(source, i)), image)
+    config = make_config(tmp_path, label_files, num_workers=1)
+    config["Train"]["dataset"]["transforms"] = [
+        {"DecodeImage": {"img_mode": "BGR", "channel_first": False}},
+        {"KeepKeys": {"keep_keys": ["image"]}},
+    ]
+    loader = build_dataloader(config, "Train", "cpu", logging.getLogger(__name__))
+    assert loader._persistent_workers
+    iterators, epochs = [], []
+    for _ in range(2):
+        iterator = iter(loader)
+        epochs.append(
+            [int(value) for batch in iterator for value in batch[0][:, 0, 0, 0]]
+        )
+        iterators.append(iterator)
+    assert iterators[0] is iterators[1]
+    for samples in epochs:
+        assert len(set(samples)) == 30
+        assert sum(sample >= 100 for sample in samples) == 10
+    assert set(epochs[0]) != set(epochs[1])
+
+    config["Train"]["loader"]["persistent_workers"] = False
+    loader = build_dataloader(config, "Train", "cpu", logging.getLogger(__name__))
+    assert not loader._persistent_workers
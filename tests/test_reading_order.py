@@ -0,0 +1,79 @@
+import os
+import sys
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.utils.reading_order import reading_order
+from ppstructure.recovery.recovery_to_markdown import group_text_lines
+
+
+def quad(x0, y0, x1, y1, skew=0.0):
+    return np.array(
+        [[x0, y0], [x1, y0 + skew], [x1, y1 + skew], [x0, y1]], dtype=np.float32
+    )
+
+
+def test_grid_is_read_row_by_row():
+    rng = np.random.RandomState(0)
+    boxes, expected = [], []
+    for row in range(30):
+        for col in range(8):
+            x, y = col * 120 + rng.randint(0, 5), row * 40 + rng.randint(0, 8)
+            boxes.append(quad(x, y, x + 100, y + 24))
+            expected.append((row, col))
+    perm = rng.permutation(len(boxes))
+    order, line_ids = reading_order(np.array(boxes)[perm])
+    assert [expected[perm[i]] for i in order] == expected
+    assert np.array_equal(line_ids[order], [row for row, _ in expected])
+
+
+def test_skewed_line_stays_together():
+    # a line drifting down by 4 px per word, then the next line
+    boxes = [quad(i * 110, 100 + 4 * i, i * 110 + 100, 124 + 4 * i) for i in range(6)]
+    boxes.append(quad(0, 160, 100, 184))
+    boxes = np.array(boxes)[::-1]
+    order, line_ids = reading_order(boxes)
+    assert list(order) == [6, 5, 4, 3, 2, 1, 0]
+    assert list(line_ids) == [1, 0, 0, 0, 0, 0, 0]
+
+
+def test_bboxes_and_empty_input():
+    order, line_ids = reading_order([[300, 10, 400, 30], [10, 12, 100, 30]])
+    assert list(order) == [1, 0] and list(line_ids) == [0, 0]
+    order, line_ids = reading_order([])
+    assert len(order) == 0 and len(line_ids) == 0
+
+
+def test_markdown_joins_boxes_of_one_line():
+    region = {
+        "bbox": [0, 0, 500, 100],
+        "res": [
+            {"text": "Hello", "text_region": quad(0, 0, 100, 20).tolist()},
+            {"text": "world", "text_region": quad(120, 1, 220, 21).tolist()},
+            {"text": "next", "text_region": quad(0, 40, 100, 60).tolist()},
+        ],
+    }
+    lines = group_text_lines(region)
+    assert [line["text"] for line in lines] == ["Hello world", "next"]
+    assert lines[0]["text_region"] == [[0, 0], [220, 0], [220, 21], [0, 21]]
+
+
+def test_markdown_joins_cjk_boxes_without_space():
+    region = {
+        "bbox": [0, 0, 500, 100],
+        "res": [
+            {"text": "这是", "text_region": quad(0, 0, 100, 20).tolist()},
+            {"text": "一行", "text_region": quad(110, 0, 200, 20).tolist()},
+            {"text": "PaddleOCR", "text_region": quad(210, 0, 300, 20).tolist()},
+            {"text": "日本語のテキスト", "text_region": quad(0, 40, 100, 60).tolist()},
+            {"text": "です", "text_region": quad(110, 40, 200, 60).tolist()},
+        ],
+    }
+    lines = group_text_lines(region)
+    assert [line["text"] for line in lines] == [
+        "这是一行PaddleOCR",
+        "日本語のテキストです",
+    ]
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import numpy as np
+import paddle
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.modeling.heads.rec_nrtr_head import Transformer
+from ppocr.modeling.heads.rec_satrn_head import SATRNDecoder
+
+
+def test_nrtr_cached_steps_match_full_decode():
+    paddle.seed(0)
+    head = Transformer(
+        d_model=64,
+        nhead=4,
+        num_encoder_layers=0,
+        num_decoder_layers=2,
+        dim_feedforward=128,
+        out_channels=20,
+    )
+    head.eval()
+    memory = paddle.randn([3, 30, 64])
+    tokens = paddle.to_tensor(np.random.RandomState(0).randint(4, 21, (3, 12)))
+    caches = [{"self": {}, "cross": {}} for _ in range(len(head.decoder))]
+    with paddle.no_grad():
+        for step in range(1, tokens.shape[1] + 1):
+            full = head.decode_last(tokens[:, :step], memory)
+            cached = head.decode_last(tokens[:, :step], memory, caches)
+            np.testing.assert_allclose(cached.numpy(), full.numpy(), atol=1e-5)
+
+
+def test_satrn_cached_steps_match_full_decode():
+    paddle.seed(0)
+    head = SATRNDecoder(
+        n_layers=2,
+        d_embedding=64,
+        n_head=4,
+        d_k=16,
+        d_v=16,
+        d_model=64,
+        d_inner=128,
+        num_classes=20,
+        max_seq_len=12,
+        start_idx=18,
+        padding_idx=19,
+    )
+    head.eval()
+    out_enc = paddle.randn([3, 30, 64])
+    src_mask = head._get_mask(out_enc, [1.0, 0.5, 0.2])
+    tokens = np.random.RandomState(0).randint(0, 18, (3, 13))
+    tokens[:, 0] = 18
+    # a padding token in the middle of the keys is masked as well
+    tokens[1, 4] = 19
+    tokens = paddle.to_tensor(tokens)
+    caches = [{"self": {}, "enc": {}} for _ in range(len(head.layer_stack))]
+    with paddle.no_grad():
+        full = head._attention(tokens, out_enc, src_mask=src_mask)
+        for step in range(tokens.shape[1]):
+            cached = head._attention_step(
+                tokens[:, : step + 1], out_enc, caches, src_mask=src_mask
+            )
+            np.testing.assert_allclose(
+                cached.numpy(), full[:, step, :].numpy(), atol=1e-5
+            )
@@ -0,0 +1,114 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.rec_postprocess import CTCLabelDecode
+
+DICT_PATH = os.path.join(current_dir, "..", "ppocr", "utils", "ppocr_keys_v1.txt")
+
+
+@pytest.fixture
+def ctc_decode():
+    return CTCLabelDecode(character_dict_path=DICT_PATH, use_space_char=True)
+
+
+def random_preds(num_classes, batch_size=16, seq_len=40, seed=0):
+    rng = np.random.RandomState(seed)
+    # mostly blanks with runs of repeated characters, like real CTC output
+    logits = rng.rand(batch_size, seq_len, num_classes).astype(np.float32)
+    blank = rng.rand(batch_size, seq_len) < 0.5
+    logits[..., 0] += blank * 2
+    repeat = rng.rand(batch_size, seq_len) < 0.3
+    for t in range(1, seq_len):
+        logits[repeat[:, t], t] = logits[repeat[:, t], t - 1]
+    logits[0, :, 0] += 10  # one row that decodes to an empty string
+    return logits
+
+
+@pytest.mark.parametrize("is_remove_duplicate", [True, False])
+def test_decode_batch_matches_per_row_decode(ctc_decode, is_remove_duplicate):
+    preds = random_preds(len(ctc_decode.character))
+    preds_idx = preds.argmax(axis=2)
+    preds_prob = preds.max(axis=2)
+    # a list of rows takes the per-row reference path
+    expected = ctc_decode.decode(
+        list(preds_idx), list(preds_prob), is_remove_duplicate=is_remove_duplicate
+    )
+    result = ctc_decode.decode(
+        preds_idx, preds_prob, is_remove_duplicate=is_remove_duplicate
+    )
+    assert [text for text, _ in result] == [text for text, _ in expected]
+    np.testing.assert_allclose(
+        [score for _, score in result], [score for _, score in expected], rtol=1e-6
+    )
+    assert result[0] == ("", 0.0)
+
+
+def test_decode_batch_without_prob(ctc_decode):
+    label = np.array([[1, 2, 2, 0, 3], [0, 0, 0, 0, 0]])
+    assert ctc_decode.decode(label) == ctc_decode.decode(list(label))
+
+
+def test_ctc_call_returns_python_types(ctc_decode):
+    preds = random_preds(len(ctc_decode.character), batch_size=4)
+    result = ctc_decode(preds)
+    assert len(result) == 4
+    for text, score in result:
+        assert isinstance(text, str)
+        assert isinstance(score, float)
+
+
+def peaked_preds(num_classes, sequences, peak=0.9):
+    preds = np.full(
+        (len(sequences), len(sequences[0]), num_classes), 1e-6, dtype=np.float32
+    )
+    for row, seq in enumerate(sequences):
+        preds[row, np.arange(len(seq)), seq] = peak
+    return preds
+
+
+def test_beam_search_matches_greedy_on_confident_preds(ctc_decode):
+    beam_decode = CTCLabelDecode(
+        character_dict_path=DICT_PATH, use_space_char=True, decode_mode="beam_search"
+    )
+    preds = peaked_preds(
+        len(ctc_decode.character),
+        [[0, 5, 5, 0, 7, 0, 0, 7, 9, 9, 0, 12], [0] * 12],
+    )
+    results, expected = beam_decode(preds), ctc_decode(preds)
+    assert [text for text, _ in results] == [text for text, _ in expected]
+    # every frame of the only likely alignment has probability 0.9
+    np.testing.assert_allclose(results[0][1], 0.9, rtol=1e-4)
+    assert results[1] == ("", 0.0)
+
+
+def test_beam_search_with_lexicon(tmp_path):
+    from ppocr.utils.ctc_lm import build_char_lm
+
+    lexicon = tmp_path / "lexicon.txt"
+    lexicon.write_text("ab12\n", encoding="utf-8")
+    lm_path = str(tmp_path / "ctc_lm.npz")
+    build_char_lm(lm_path, lexicon_path=str(lexicon))
+
+    decode = CTCLabelDecode(use_space_char=False)
+    one, ell = decode.dict["1"], decode.dict["l"]
+    seq = [decode.dict["a"], 0, decode.dict["b"], 0, one, 0, decode.dict["2"]]
+    preds = peaked_preds(len(decode.character), [seq], peak=0.9)
+    # the third character is ambiguous and slightly favours "l"
+    preds[0, 4, one], preds[0, 4, ell] = 0.4, 0.5
+    assert decode(preds)[0][0] == "abl2"
+
+    beam_decode = CTCLabelDecode(
+        use_space_char=False, decode_mode="beam_search", lm_path=lm_path
+    )
+    text, score = beam_decode(preds)[0]
+    assert text == "ab12"
+    # the lexicon only ranks the beams, the confidence is the CTC probability
+    np.testing.assert_allclose(score, (0.9**6 * 0.4) ** (1 / 7), rtol=1e-4)
+    beam_decode.lexicon_weight = 10.0
+    assert beam_decode(preds)[0] == (text, score)
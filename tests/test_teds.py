@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+pytest.importorskip("apted")
+pytest.importorskip("lxml")
+
+from ppocr.metrics.table_metric import TableMetric
+from ppstructure.table.table_metric import TEDS
+
+
+def table_html(rows, texts):
+    body = "".join(
+        "<tr>" + "".join("<td>{}</td>".format(text) for text in texts) + "</tr>"
+        for _ in range(rows)
+    )
+    return "<html><body><table>{}</table></body></html>".format(body)
+
+
+def test_teds_scores_and_cache():
+    teds = TEDS()
+    true = table_html(3, ["a", "bc"])
+    assert teds.evaluate(true, true) == 1.0
+    assert teds.evaluate("", true) == 0.0
+    score = teds.evaluate(table_html(3, ["a", "bd"]), true)
+    assert 0.0 < score < 1.0
+    assert teds.evaluate(table_html(2, ["a", "bc"]), true) < 1.0
+    assert list(teds.true_cache) == [true]
+
+
+def test_teds_parallel_matches_serial():
+    trues = [table_html(rows, ["x", "y z"]) for rows in range(1, 9)]
+    preds = [table_html(rows % 3 + 1, ["x", "y"]) for rows in range(1, 9)]
+    preds[0] = ""
+    serial = TEDS(n_jobs=1).batch_evaluate_html(preds, trues)
+    assert TEDS(n_jobs=2).batch_evaluate_html(preds, trues) == serial
+    scores = TEDS(n_jobs=2).batch_evaluate(
+        {str(i): pred for i, pred in enumerate(preds)},
+        {str(i): {"html": true} for i, true in enumerate(trues)},
+    )
+    assert list(scores.values()) == serial
+
+
+def test_table_metric_teds():
+    metric = TableMetric(compute_teds=True)
+    structure = ["<tr>", "<td></td>", "<td", ' colspan="2"', ">", "</td>", "</tr>"]
+    preds = {
+        "structure_batch_list": [[structure, 0.9], [structure[:2] + ["</tr>"], 0.8]]
+    }
+    labels = {"structure_batch_list": [structure, structure]}
+    for _ in range(2):
+        metric((preds, labels))
+        metrics = metric.get_metric()
+        assert metrics["acc"] == pytest.approx(0.5)
+        assert 0.5 < metrics["teds"] < 1.0
+    assert len(metric.teds.true_cache) == 1
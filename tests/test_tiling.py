@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from tools.infer.tiling import fuse_boxes, make_tiles
+
+
+def rect(x0, y0, x1, y1):
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float32)
+
+
+@pytest.mark.parametrize(
+    "image_size, tile, overlap",
+    [((1000, 700), (300, 300), (0, 0)), ((5000, 640), (640, 640), (160, 160))],
+)
+def test_tiles_cover_image_with_one_shape(image_size, tile, overlap):
+    tiles = make_tiles(*image_size, *tile, *overlap)
+    covered = np.zeros(image_size, dtype=bool)
+    for y0, x0, y1, x1 in tiles:
+        assert (y1 - y0, x1 - x0) == (
+            min(tile[0], image_size[0]),
+            min(tile[1], image_size[1]),
+        )
+        covered[y0:y1, x0:x1] = True
+    assert covered.all()
+    if overlap[0] > 0:
+        starts = np.unique(tiles[:, 0])
+        assert np.all(starts[1:] - starts[:-1] <= tile[0] - overlap[0])
+
+
+def test_too_many_tiles():
+    with pytest.raises(ValueError):
+        make_tiles(100000, 100, 10, 100, maximum_slices=500)
+
+
+def test_fuse_cut_line_and_duplicates():
+    boxes = np.array(
+        [
+            # one text line cut by a vertical tile border
+            rect(10, 10, 100, 30),
+            rect(104, 11, 200, 30),
+            # the same word seen by two overlapping tiles
+            rect(300, 100, 380, 120),
+            rect(302, 101, 380, 120),
+            # a fragment of a line inside the full line
+            rect(500, 200, 560, 220),
+            rect(400, 200, 700, 221),
+            # unrelated boxes
+            rect(10, 300, 60, 320),
+            rect(10, 340, 60, 360),
+        ]
+    )
+    fused = fuse_boxes(boxes, x_threshold=10, y_threshold=10)
+    np.testing.assert_array_equal(
+        fused,
+        [
+            rect(10, 10, 200, 30),
+            rect(300, 100, 380, 120),
+            rect(400, 200, 700, 221),
+            rect(10, 300, 60, 320),
+            rect(10, 340, 60, 360),
+        ],
+    )
+
+
+def test_fuse_keeps_separate_lines():
+    rng = np.random.RandomState(0)
+    boxes = []
+    # a grid of words far enough apart to never be merged
+    for row in range(40):
+        for col in range(25):
+            x, y = col * 100 + rng.randint(0, 5), row * 50 + rng.randint(0, 5)
+            boxes.append(rect(x, y, x + 60, y + 20))
+    boxes = np.array(boxes)
+    fused = fuse_boxes(boxes, x_threshold=10, y_threshold=10)
+    np.testing.assert_array_equal(fused, boxes)
+
+
+def test_fuse_polygons_and_empty():
+    assert fuse_boxes([]).shape == (0, 4, 2)
+    poly = np.array([[0, 0], [50, 0], [60, 10], [50, 20], [0, 20]], dtype=np.float32)
+    fused = fuse_boxes([poly, rect(200, 0, 260, 20)])
+    assert len(fused) == 2
+    np.testing.assert_array_equal(fused[0], poly)
@@ -1,8 +1,26 @@
 from pathlib import Path
+from types import SimpleNamespace
 
 TEST_DATA_DIR = Path(__file__).parent / "test_files"
 
 
+def make_stub_predictor(infer_class, predictor, **attributes):
+    """
+    Create an instance of a tools/infer class without loading a model. The
+    instance runs `predictor` the onnxruntime way, `predictor.run(None,
+    {"x": batch})` returns the list of outputs, and gets `attributes` set
+    in place of the ones __init__ would read from args.
+    """
+    instance = infer_class.__new__(infer_class)
+    instance.predictor = predictor
+    instance.input_tensor = SimpleNamespace(name="x")
+    instance.output_tensors = None
+    instance.use_onnx = True
+    for name, value in attributes.items():
+        setattr(instance, name, value)
+    return instance
+
+
 def check_simple_inference_result(result, *, expected_length=1):
     assert result is not None
     assert isinstance(result, list)
@@ -0,0 +1,133 @@
+# Copyright (c) 2025 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import queue
+import threading
+
+__all__ = ["StagePipeline"]
+
+_END = object()
+
+
+class _StageError(object):
+    def __init__(self, name, exc):
+        self.name = name
+        self.exc = exc
+
+
+class StagePipeline(object):
+    """
+    Run a chain of stage functions, each in its own worker thread, connected
+    by bounded queues. A full queue blocks the upstream stage, so the number of
+    items in flight never exceeds (num_stages + 1) * queue_size and throughput
+    is bounded by the slowest stage rather than the sum of all stages.
+
+    Items keep their input order since every stage has exactly one worker.
+    An exception raised in any stage is re-raised from `run` in the caller's
+    thread.
+    args:
+        stages(list): list of (name, func) tuples, func maps one item to one item
+        queue_size(int): capacity of the queue in front of each stage
+    """
+
+    def __init__(self, stages, queue_size=2):
+        assert len(stages) > 0, "StagePipeline needs at least one stage"
+        assert queue_size > 0, "queue_size should be greater than 0"
+        self.stages = stages
+        self.queue_size = queue_size
+
+    def _put(self, q, item, stop_event):
+        while not stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q, stop_event):
+        while not stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _feed(self, items, out_q, stop_event):
+        try:
+            for item in items:
+                if not self._put(out_q, item, stop_event):
+                    return
+        except Exception as e:
+            self._put(out_q, _StageError("input", e), stop_event)
+            return
+        self._put(out_q, _END, stop_event)
+
+    def _work(self, name, func, in_q, out_q, stop_event):
+        while True:
+            item = self._get(in_q, stop_event)
+            if item is _END or isinstance(item, _StageError):
+                self._put(out_q, item, stop_event)
+                return
+            try:
+                result = func(item)
+            except Exception as e:
+                self._put(out_q, _StageError(name, e), stop_event)
+                return
+            if not self._put(out_q, result, stop_event):
+                return
+
+    def run(self, items):
+        """
+        Push every element of the iterable `items` through all stages and yield
+        the outputs of the last stage in input order.
+        """
+        stop_event = threading.Event()
+        queues = [
+            queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)
+        ]
+        threads = [
+            threading.Thread(
+                target=self._feed,
+                args=(items, queues[0], stop_event),
+                name="pipeline-input",
+                daemon=True,
+            )
+        ]
+        for sno, (name, func) in enumerate(self.stages):
+            threads.append(
+                threading.Thread(
+                    target=self._work,
+                    args=(name, func, queues[sno], queues[sno + 1], stop_event),
+                    name="pipeline-{}".format(name),
+                    daemon=True,
+                )
+            )
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _END:
+                    break
+                if isinstance(item, _StageError):
+                    raise RuntimeError(
+                        "stage '{}' of the pipeline failed".format(item.name)
+                    ) from item.exc
+                yield item
+        finally:
+            # also reached when the consumer stops iterating early
+            stop_event.set()
+            for thread in threads:
+                thread.join()
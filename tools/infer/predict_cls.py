@@ -21,11 +21,11 @@ sys.path.insert(0, os.path.abspath(os.path.join(__dir__, "../..")))
 os.environ["FLAGS_allocator_strategy"] = "auto_growth"
 
 import cv2
-import copy
 import numpy as np
 import math
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 import tools.infer.utility as utility
 from ppocr.postprocess import build_post_process
@@ -61,6 +61,7 @@ class TextClassifier(object):
             _,
         ) = utility.create_predictor(args, "cls", logger)
         self.use_onnx = args.use_onnx
+        self.batch_buffers = None
 
     def resize_norm_img(self, img):
         imgC, imgH, imgW = self.cls_image_shape
@@ -84,54 +85,113 @@ class TextClassifier(object):
         padding_im[:, :, 0:resized_w] = resized_image
         return padding_im
 
+    def get_batch_buffer(self, slot):
+        """
+        The cls input has a fixed shape, so two batch buffers (one filled while
+        the other is being predicted) are allocated once and reused.
+        """
+        if self.batch_buffers is None:
+            imgC, imgH, imgW = self.cls_image_shape
+            self.batch_buffers = [
+                (
+                    np.zeros((self.cls_batch_num, imgH, imgW, imgC), dtype=np.uint8),
+                    np.zeros((self.cls_batch_num, imgC, imgH, imgW), dtype=np.float32),
+                    np.zeros((self.cls_batch_num, imgW), dtype=np.float32),
+                )
+                for _ in range(2)
+            ]
+        return self.batch_buffers[slot]
+
+    def resize_norm_img_batch(self, img_list, slot=0):
+        """
+        Equivalent to stacking resize_norm_img of every image. The crops are
+        only resized one by one, into a uint8 staging buffer; normalization,
+        the HWC to CHW transpose and the zero padding then run once over the
+        whole batch, writing into a preallocated float32 buffer.
+        """
+        imgC, imgH, imgW = self.cls_image_shape
+        staging, norm_img_batch, valid = self.get_batch_buffer(slot)
+        batch_num = len(img_list)
+        staging, norm_img_batch = staging[:batch_num], norm_img_batch[:batch_num]
+        valid = valid[:batch_num]
+        valid[:] = 1
+        for ino, img in enumerate(img_list):
+            h, w = img.shape[:2]
+            resized_w = min(imgW, int(math.ceil(imgH * w / float(h))))
+            resized_image = cv2.resize(img, (resized_w, imgH))
+            staging[ino, :, :resized_w] = resized_image.reshape(imgH, resized_w, -1)
+            valid[ino, resized_w:] = 0
+        np.divide(
+            staging.transpose((0, 3, 1, 2)),
+            np.float32(255),
+            out=norm_img_batch,
+            dtype=np.float32,
+            casting="unsafe",
+        )
+        norm_img_batch -= 0.5
+        norm_img_batch /= 0.5
+        norm_img_batch *= valid[:, np.newaxis, np.newaxis, :]
+        return norm_img_batch
+
+    def _predict(self, norm_img_batch):
+        if self.use_onnx:
+            input_dict = {}
+            input_dict[self.input_tensor.name] = norm_img_batch
+            outputs = self.predictor.run(self.output_tensors, input_dict)
+            prob_out = outputs[0]
+        else:
+            self.input_tensor.copy_from_cpu(norm_img_batch)
+            self.predictor.run()
+            prob_out = self.output_tensors[0].copy_to_cpu()
+            self.predictor.try_shrink_memory()
+        return prob_out
+
     def __call__(self, img_list):
-        img_list = copy.deepcopy(img_list)
+        # crops are replaced rather than modified, a shallow copy is enough
+        img_list = list(img_list)
         img_num = len(img_list)
-        # Calculate the aspect ratio of all text bars
-        width_list = []
-        for img in img_list:
-            width_list.append(img.shape[1] / float(img.shape[0]))
-        # Sorting can speed up the cls process
-        indices = np.argsort(np.array(width_list))
+        # every crop is padded to the fixed input width, so unlike rec there is
+        # nothing to gain from sorting the crops by aspect ratio
+        batch_ranges = [
+            (beg_img_no, min(img_num, beg_img_no + self.cls_batch_num))
+            for beg_img_no in range(0, img_num, self.cls_batch_num)
+        ]
 
         cls_res = [["", 0.0]] * img_num
-        batch_num = self.cls_batch_num
-        elapse = 0
-        for beg_img_no in range(0, img_num, batch_num):
-            end_img_no = min(img_num, beg_img_no + batch_num)
-            norm_img_batch = []
-            max_wh_ratio = 0
-            starttime = time.time()
-            for ino in range(beg_img_no, end_img_no):
-                h, w = img_list[indices[ino]].shape[0:2]
-                wh_ratio = w * 1.0 / h
-                max_wh_ratio = max(max_wh_ratio, wh_ratio)
-            for ino in range(beg_img_no, end_img_no):
-                norm_img = self.resize_norm_img(img_list[indices[ino]])
-                norm_img = norm_img[np.newaxis, :]
-                norm_img_batch.append(norm_img)
-            norm_img_batch = np.concatenate(norm_img_batch)
-            norm_img_batch = norm_img_batch.copy()
-
-            if self.use_onnx:
-                input_dict = {}
-                input_dict[self.input_tensor.name] = norm_img_batch
-                outputs = self.predictor.run(self.output_tensors, input_dict)
-                prob_out = outputs[0]
-            else:
-                self.input_tensor.copy_from_cpu(norm_img_batch)
-                self.predictor.run()
-                prob_out = self.output_tensors[0].copy_to_cpu()
-                self.predictor.try_shrink_memory()
-            cls_result = self.postprocess_op(prob_out)
-            elapse += time.time() - starttime
-            for rno in range(len(cls_result)):
-                label, score = cls_result[rno]
-                cls_res[indices[beg_img_no + rno]] = [label, score]
-                if "180" in label and score > self.cls_thresh:
-                    img_list[indices[beg_img_no + rno]] = cv2.rotate(
-                        img_list[indices[beg_img_no + rno]], 1
+        flip = np.zeros(img_num, dtype=bool)
+        starttime = time.time()
+        # the pool lives for one call, its thread is only started by a prefetch.
+        # It only overlaps cls preprocessing with cls inference: rec needs the
+        # flipped crops, so its preprocessing cannot start before cls is done
+        with ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="cls_prefetch"
+        ) as prefetch_executor:
+            pending = None
+            for bno, (beg_img_no, end_img_no) in enumerate(batch_ranges):
+                if pending is None:
+                    norm_img_batch = self.resize_norm_img_batch(
+                        img_list[beg_img_no:end_img_no], bno % 2
+                    )
+                else:
+                    norm_img_batch = pending.result()
+                # preprocess the next batch while this one is being predicted
+                pending = None
+                if bno + 1 < len(batch_ranges):
+                    next_beg, next_end = batch_ranges[bno + 1]
+                    pending = prefetch_executor.submit(
+                        self.resize_norm_img_batch,
+                        img_list[next_beg:next_end],
+                        (bno + 1) % 2,
                     )
+                prob_out = self._predict(norm_img_batch)
+                cls_result = self.postprocess_op(prob_out)
+                for rno in range(len(cls_result)):
+                    label, score = cls_result[rno]
+                    cls_res[beg_img_no + rno] = [label, score]
+                    flip[beg_img_no + rno] = "180" in label and score > self.cls_thresh
+        for ino in np.nonzero(flip)[0]:
+            img_list[ino] = cv2.rotate(img_list[ino], cv2.ROTATE_180)
+        elapse = time.time() - starttime
         return img_list, cls_res, elapse
 
 
@@ -21,6 +21,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(__dir__, "../..")))
 os.environ["FLAGS_allocator_strategy"] = "auto_growth"
 
 import cv2
+import itertools
 import numpy as np
 import time
 import sys
@@ -31,6 +32,7 @@ from ppocr.utils.utility import get_image_file_list, check_and_read
 from ppocr.data import create_operators, transform
 from ppocr.postprocess import build_post_process
 from tools.infer.utility import preprocess_infer
+from tools.infer.tiling import make_tiles, fuse_boxes
 import json
 
 
@@ -80,6 +82,7 @@ class TextDetector(object):
             postprocess_params["use_dilation"] = args.use_dilation
             postprocess_params["score_mode"] = args.det_db_score_mode
             postprocess_params["box_type"] = args.det_box_type
+            postprocess_params["vectorized"] = getattr(args, "det_db_vectorized", False)
         elif self.det_algorithm == "DB++":
             postprocess_params["name"] = "DBPostProcess"
             postprocess_params["thresh"] = args.det_db_thresh
@@ -89,6 +92,7 @@ class TextDetector(object):
             postprocess_params["use_dilation"] = args.use_dilation
             postprocess_params["score_mode"] = args.det_db_score_mode
             postprocess_params["box_type"] = args.det_box_type
+            postprocess_params["vectorized"] = getattr(args, "det_db_vectorized", False)
             pre_process_list[1] = {
                 "NormalizeImage": {
                     "std": [1.0, 1.0, 1.0],
@@ -143,6 +147,8 @@ class TextDetector(object):
 
         self.preprocess_op = create_operators(pre_process_list)
         self.postprocess_op = build_post_process(postprocess_params)
+        self.det_batch_num = max(getattr(args, "det_batch_num", 1), 1)
+        self.tile_batch_size = max(getattr(args, "det_tile_batch_size", 8), 1)
         (
             self.predictor,
             self.input_tensor,
@@ -239,25 +245,7 @@ class TextDetector(object):
         dt_boxes = np.array(dt_boxes_new)
         return dt_boxes
 
-    def predict(self, img):
-        ori_im = img.copy()
-        data = {"image": img}
-
-        st = time.time()
-
-        if self.args.benchmark:
-            self.autolog.times.start()
-
-        data = transform(data, self.preprocess_op)
-        img, shape_list = data
-        if img is None:
-            return None, 0
-        img = np.expand_dims(img, axis=0)
-        shape_list = np.expand_dims(shape_list, axis=0)
-        img = img.copy()
-
-        if self.args.benchmark:
-            self.autolog.times.stamp()
+    def _run_predictor(self, img):
         if self.use_onnx:
             input_dict = {}
             input_dict[self.input_tensor.name] = img
@@ -269,9 +257,9 @@ class TextDetector(object):
             for output_tensor in self.output_tensors:
                 output = output_tensor.copy_to_cpu()
                 outputs.append(output)
-            if self.args.benchmark:
-                self.autolog.times.stamp()
+        return outputs
 
+    def _pack_preds(self, outputs):
         preds = {}
         if self.det_algorithm == "EAST":
             preds["f_geo"] = outputs[0]
@@ -291,122 +279,155 @@ class TextDetector(object):
             preds["score"] = outputs[1]
         else:
             raise NotImplementedError
+        return preds
+
+    def _filter_boxes(self, dt_boxes, image_shape):
+        if self.args.det_box_type == "poly":
+            return self.filter_tag_det_res_only_clip(dt_boxes, image_shape)
+        return self.filter_tag_det_res(dt_boxes, image_shape)
+
+    def predict(self, img):
+        ori_im = img.copy()
+        data = {"image": img}
+
+        st = time.time()
+
+        if self.args.benchmark:
+            self.autolog.times.start()
 
+        data = transform(data, self.preprocess_op)
+        img, shape_list = data
+        if img is None:
+            return None, 0
+        img = np.expand_dims(img, axis=0)
+        shape_list = np.expand_dims(shape_list, axis=0)
+        img = img.copy()
+
+        if self.args.benchmark:
+            self.autolog.times.stamp()
+        outputs = self._run_predictor(img)
+        if self.args.benchmark and not self.use_onnx:
+            self.autolog.times.stamp()
+
+        preds = self._pack_preds(outputs)
         post_result = self.postprocess_op(preds, shape_list)
         dt_boxes = post_result[0]["points"]
-
-        if self.args.det_box_type == "poly":
-            dt_boxes = self.filter_tag_det_res_only_clip(dt_boxes, ori_im.shape)
-        else:
-            dt_boxes = self.filter_tag_det_res(dt_boxes, ori_im.shape)
+        dt_boxes = self._filter_boxes(dt_boxes, ori_im.shape)
 
         if self.args.benchmark:
             self.autolog.times.end(stamp=True)
         et = time.time()
         return dt_boxes, et - st
 
+    def predict_batch(self, img_list, batch_size=None):
+        """
+        Detect text in several images with as few predictor runs as possible.
+        Every image is resized by the preprocess ops first, and images that
+        end up with the same input shape, like frames of one camera or any
+        images once det_limit_type / image_shape fix the input size, are
+        stacked into predictor batches of `batch_size` (det_batch_num by
+        default). Returns the boxes of every image in input order, None for
+        images the preprocess rejected, and the total time.
+        """
+        st = time.time()
+        if self.args.benchmark:
+            self.autolog.times.start()
+        if batch_size is None:
+            batch_size = self.det_batch_num
+        # FCEPostProcess only handles one image per call
+        if self.det_algorithm == "FCE":
+            batch_size = 1
+        dt_boxes_list = [None] * len(img_list)
+        inputs, groups, image_shapes = {}, {}, {}
+        # img_list is iterated only once, it may render its images lazily
+        for ino, img in enumerate(img_list):
+            image_shapes[ino] = img.shape
+            data = transform({"image": img}, self.preprocess_op)
+            if data is None or data[0] is None:
+                continue
+            inputs[ino] = data
+            groups.setdefault(data[0].shape, []).append(ino)
+
+        for indices in groups.values():
+            for beg in range(0, len(indices), batch_size):
+                batch = indices[beg : beg + batch_size]
+                norm_img_batch = np.stack([inputs[ino][0] for ino in batch])
+                shape_list = np.stack([inputs[ino][1] for ino in batch])
+                if self.args.benchmark:
+                    self.autolog.times.stamp()
+                outputs = self._run_predictor(norm_img_batch)
+                if self.args.benchmark and not self.use_onnx:
+                    self.autolog.times.stamp()
+                post_result = self.postprocess_op(self._pack_preds(outputs), shape_list)
+                for ino, result in zip(batch, post_result):
+                    dt_boxes_list[ino] = self._filter_boxes(
+                        result["points"], image_shapes[ino]
+                    )
+                if self.args.benchmark:
+                    self.autolog.times.end(stamp=True)
+        return dt_boxes_list, time.time() - st
+
+    def predict_tiles(self, tiles):
+        """
+        Detect text in a list of equally sized tiles. The tiles are stacked
+        into predictor batches of `det_tile_batch_size`, returns the boxes of
+        every tile in tile coordinates and the total time.
+        """
+        return self.predict_batch(tiles, self.tile_batch_size)
+
+    def predict_tiled(
+        self,
+        img,
+        tile_size,
+        overlap=(0, 0),
+        merge_thres=(10, 10),
+        maximum_slices=500,
+    ):
+        """
+        Detect text in a large image by cutting it into overlapping tiles of
+        tile_size (h, w), detecting all tiles in batches and fusing their
+        boxes in image coordinates. overlap is (h, w) and merge_thres is the
+        (x, y) threshold used to join text lines cut by tile borders.
+        """
+        tiles = make_tiles(
+            img.shape[0],
+            img.shape[1],
+            tile_size[0],
+            tile_size[1],
+            overlap[0],
+            overlap[1],
+            maximum_slices,
+        )
+        dt_boxes_list, elapse = self.predict_tiles(
+            [img[y0:y1, x0:x1] for y0, x0, y1, x1 in tiles]
+        )
+        dt_boxes = []
+        for (y0, x0, _, _), tile_boxes in zip(tiles, dt_boxes_list):
+            # tiles the preprocess rejected have no boxes
+            if tile_boxes is None:
+                continue
+            for box in tile_boxes:
+                dt_boxes.append(box + np.array([x0, y0], dtype=np.float32))
+        dt_boxes = fuse_boxes(
+            dt_boxes, x_threshold=merge_thres[0], y_threshold=merge_thres[1]
+        )
+        return dt_boxes, elapse
+
     def __call__(self, img, use_slice=False):
         # For image like poster with one side much greater than the other side,
-        # splitting recursively and processing with overlap to enhance performance.
-        MIN_BOUND_DISTANCE = 50
-        dt_boxes = np.zeros((0, 4, 2), dtype=np.float32)
-        elapse = 0
+        # cut it into overlapping square tiles along the long side.
         if (
             img.shape[0] / img.shape[1] > 2
             and img.shape[0] > self.args.det_limit_side_len
             and use_slice
-        ):
-            start_h = 0
-            end_h = 0
-            while end_h <= img.shape[0]:
-                end_h = start_h + img.shape[1] * 3 // 4
-                subimg = img[start_h:end_h, :]
-                if len(subimg) == 0:
-                    break
-                sub_dt_boxes, sub_elapse = self.predict(subimg)
-                offset = start_h
-                # To prevent text blocks from being cut off, roll back a certain buffer area.
-                if (
-                    len(sub_dt_boxes) == 0
-                    or img.shape[1] - max([x[-1][1] for x in sub_dt_boxes])
-                    > MIN_BOUND_DISTANCE
-                ):
-                    start_h = end_h
-                else:
-                    sorted_indices = np.argsort(sub_dt_boxes[:, 2, 1])
-                    sub_dt_boxes = sub_dt_boxes[sorted_indices]
-                    bottom_line = (
-                        0
-                        if len(sub_dt_boxes) <= 1
-                        else int(np.max(sub_dt_boxes[:-1, 2, 1]))
-                    )
-                    if bottom_line > 0:
-                        start_h += bottom_line
-                        sub_dt_boxes = sub_dt_boxes[
-                            sub_dt_boxes[:, 2, 1] <= bottom_line
-                        ]
-                    else:
-                        start_h = end_h
-                if len(sub_dt_boxes) > 0:
-                    if dt_boxes.shape[0] == 0:
-                        dt_boxes = sub_dt_boxes + np.array(
-                            [0, offset], dtype=np.float32
-                        )
-                    else:
-                        dt_boxes = np.append(
-                            dt_boxes,
-                            sub_dt_boxes + np.array([0, offset], dtype=np.float32),
-                            axis=0,
-                        )
-                elapse += sub_elapse
-        elif (
+        ) or (
             img.shape[1] / img.shape[0] > 3
             and img.shape[1] > self.args.det_limit_side_len * 3
             and use_slice
         ):
-            start_w = 0
-            end_w = 0
-            while end_w <= img.shape[1]:
-                end_w = start_w + img.shape[0] * 3 // 4
-                subimg = img[:, start_w:end_w]
-                if len(subimg) == 0:
-                    break
-                sub_dt_boxes, sub_elapse = self.predict(subimg)
-                offset = start_w
-                if (
-                    len(sub_dt_boxes) == 0
-                    or img.shape[0] - max([x[-1][0] for x in sub_dt_boxes])
-                    > MIN_BOUND_DISTANCE
-                ):
-                    start_w = end_w
-                else:
-                    sorted_indices = np.argsort(sub_dt_boxes[:, 2, 0])
-                    sub_dt_boxes = sub_dt_boxes[sorted_indices]
-                    right_line = (
-                        0
-                        if len(sub_dt_boxes) <= 1
-                        else int(np.max(sub_dt_boxes[:-1, 1, 0]))
-                    )
-                    if right_line > 0:
-                        start_w += right_line
-                        sub_dt_boxes = sub_dt_boxes[sub_dt_boxes[:, 1, 0] <= right_line]
-                    else:
-                        start_w = end_w
-                if len(sub_dt_boxes) > 0:
-                    if dt_boxes.shape[0] == 0:
-                        dt_boxes = sub_dt_boxes + np.array(
-                            [offset, 0], dtype=np.float32
-                        )
-                    else:
-                        dt_boxes = np.append(
-                            dt_boxes,
-                            sub_dt_boxes + np.array([offset, 0], dtype=np.float32),
-                            axis=0,
-                        )
-                elapse += sub_elapse
-        else:
-            dt_boxes, elapse = self.predict(img)
-        return dt_boxes, elapse
+            side = min(img.shape[:2])
+            return self.predict_tiled(img, (side, side), overlap=(side // 4, side // 4))
+        return self.predict(img)
 
 
 def main():
@@ -438,6 +459,8 @@ def main():
     args.benchmark = global_config.get("benchmark", False)
     args.warmup = global_config.get("warmup", False)
     args.page_num = global_config.get("page_num", 0)
+    args.pdf_dpi = global_config.get("pdf_dpi", None)
+    args.pdf_render_workers = global_config.get("pdf_render_workers", 1)
     args.draw_img_save_dir = global_config.get("draw_img_save_dir", "./inference_results/")
     args.save_log_path = global_config.get("save_log_path", "./log_output/")
     
@@ -454,6 +477,9 @@ def main():
     args.det_db_unclip_ratio = det_config.get("det_db_unclip_ratio", 1.5)
     args.use_dilation = det_config.get("use_dilation", False)
     args.det_db_score_mode = det_config.get("det_db_score_mode", "fast")
+    args.det_db_vectorized = det_config.get("det_db_vectorized", False)
+    args.det_batch_num = det_config.get("det_batch_num", 1)
+    args.det_tile_batch_size = det_config.get("det_tile_batch_size", 8)
     
     # EAST算法参数
     args.det_east_score_thresh = det_config.get("det_east_score_thresh", 0.8)
@@ -491,7 +517,9 @@ def main():
 
     save_results = []
     for idx, image_file in enumerate(image_file_list):
-        img, flag_gif, flag_pdf = check_and_read(image_file)
+        img, flag_gif, flag_pdf = check_and_read(
+            image_file, dpi=args.pdf_dpi, num_workers=args.pdf_render_workers
+        )
         if not flag_gif and not flag_pdf:
             img = cv2.imread(image_file)
         if not flag_pdf:
@@ -504,53 +532,63 @@ def main():
             if page_num > len(img) or page_num == 0:
                 page_num = len(img)
             imgs = img[:page_num]
-        for index, img in enumerate(imgs):
+        # pdf pages are rendered lazily and detected det_batch_num at a time
+        page_iter = iter(imgs)
+        batch_num = text_detector.det_batch_num
+        for beg in range(0, len(imgs), batch_num):
+            batch = list(itertools.islice(page_iter, batch_num))
             st = time.time()
-            dt_boxes, _ = text_detector(img)
-            elapse = time.time() - st
-            total_time += elapse
-            if len(imgs) > 1:
-                save_pred = (
-                    os.path.basename(image_file)
-                    + "_"
-                    + str(index)
-                    + "\t"
-                    + str(json.dumps([x.tolist() for x in dt_boxes]))
-                    + "\n"
-                )
+            if len(batch) > 1:
+                dt_boxes_list, _ = text_detector.predict_batch(batch)
             else:
-                save_pred = (
-                    os.path.basename(image_file)
-                    + "\t"
-                    + str(json.dumps([x.tolist() for x in dt_boxes]))
-                    + "\n"
-                )
-            save_results.append(save_pred)
-            logger.info(save_pred)
-            if len(imgs) > 1:
-                logger.info(
-                    "{}_{} The predict time of {}: {}".format(
-                        idx, index, image_file, elapse
+                dt_boxes_list = [text_detector(batch[0])[0]]
+            elapse = (time.time() - st) / len(batch)
+            total_time += elapse * len(batch)
+            for index, (img, dt_boxes) in enumerate(
+                zip(batch, dt_boxes_list), start=beg
+            ):
+                if len(imgs) > 1:
+                    save_pred = (
+                        os.path.basename(image_file)
+                        + "_"
+                        + str(index)
+                        + "\t"
+                        + str(json.dumps([x.tolist() for x in dt_boxes]))
+                        + "\n"
+                    )
+                else:
+                    save_pred = (
+                        os.path.basename(image_file)
+                        + "\t"
+                        + str(json.dumps([x.tolist() for x in dt_boxes]))
+                        + "\n"
+                    )
+                save_results.append(save_pred)
+                logger.info(save_pred)
+                if len(imgs) > 1:
+                    logger.info(
+                        "{}_{} The predict time of {}: {}".format(
+                            idx, index, image_file, elapse
+                        )
+                    )
+                else:
+                    logger.info(
+                        "{} The predict time of {}: {}".format(idx, image_file, elapse)
                     )
-                )
-            else:
-                logger.info(
-                    "{} The predict time of {}: {}".format(idx, image_file, elapse)
-                )
 
-            src_im = utility.draw_text_det_res(dt_boxes, img)
+                src_im = utility.draw_text_det_res(dt_boxes, img)
 
-            if flag_gif:
-                save_file = image_file[:-3] + "png"
-            elif flag_pdf:
-                save_file = image_file.replace(".pdf", "_" + str(index) + ".png")
-            else:
-                save_file = image_file
-            img_path = os.path.join(
-                draw_img_save_dir, "det_res_{}".format(os.path.basename(save_file))
-            )
-            cv2.imwrite(img_path, src_im)
-            logger.info("The visualized image saved in {}".format(img_path))
+                if flag_gif:
+                    save_file = image_file[:-3] + "png"
+                elif flag_pdf:
+                    save_file = image_file.replace(".pdf", "_" + str(index) + ".png")
+                else:
+                    save_file = image_file
+                img_path = os.path.join(
+                    draw_img_save_dir, "det_res_{}".format(os.path.basename(save_file))
+                )
+                cv2.imwrite(img_path, src_im)
+                logger.info("The visualized image saved in {}".format(img_path))
 
     with open(os.path.join(draw_img_save_dir, "det_results.txt"), "w") as f:
         f.writelines(save_results)
@@ -70,12 +70,21 @@ class TextRecognizer(object):
             logger = get_logger()
         self.rec_image_shape = [int(v) for v in args.rec_image_shape.split(",")]
         self.rec_batch_num = args.rec_batch_num
+        self.rec_bucket_batching = getattr(args, "rec_bucket_batching", False)
+        self.rec_max_batch_pixels = getattr(args, "rec_max_batch_pixels", 0)
+        self.padding_efficiency = 1.0
         self.rec_algorithm = args.rec_algorithm
         # if self.rec_algorithm == "SVTR*":
         postprocess_params = {
             "name": "CTCLabelDecode",
             "character_dict_path": args.rec_char_dict_path,
             "use_space_char": args.use_space_char,
+            "decode_mode": getattr(args, "rec_decode_mode", "greedy"),
+            "beam_width": getattr(args, "rec_beam_width", 10),
+            "beam_topk": getattr(args, "rec_beam_topk", 10),
+            "lm_path": getattr(args, "rec_lm_path", None),
+            "lm_weight": getattr(args, "rec_lm_weight", 0.5),
+            "lexicon_weight": getattr(args, "rec_lexicon_weight", 1.0),
         }
         if self.rec_algorithm == "SRN":
             postprocess_params = {
@@ -203,6 +212,27 @@ class TextRecognizer(object):
                 logger=logger,
             )
         self.return_word_box = args.return_word_box
+        # algorithms fed by the plain resize_norm_img write into a reused buffer
+        self.use_batch_buffer = self.rec_algorithm not in [
+            "SAR",
+            "SRN",
+            "SVTR",
+            "SATRN",
+            "ParseQ",
+            "CPPD",
+            "CPPDPadding",
+            "VisionLAN",
+            "PREN",
+            "SPIN",
+            "ABINet",
+            "RobustScanner",
+            "CAN",
+            "LaTeXOCR",
+            "NRTR",
+            "ViTSTR",
+            "RFL",
+        ]
+        self.batch_buffer = None
 
     def resize_norm_img(self, img, max_wh_ratio):
         imgC, imgH, imgW = self.rec_image_shape
@@ -233,6 +263,21 @@ class TextRecognizer(object):
             return resized_image
 
         assert imgC == img.shape[2]
+        imgW = self.get_padded_width(max_wh_ratio)
+        resized_w = self.get_resized_width(img, imgW)
+        resized_image = cv2.resize(img, (resized_w, imgH))
+        resized_image = resized_image.astype("float32")
+        resized_image = resized_image.transpose((2, 0, 1)) / 255
+        resized_image -= 0.5
+        resized_image /= 0.5
+        padding_im = np.zeros((imgC, imgH, imgW), dtype=np.float32)
+        padding_im[:, :, 0:resized_w] = resized_image
+        return padding_im
+
+    def get_padded_width(self, max_wh_ratio):
+        imgC, imgH, imgW = self.rec_image_shape
+        if self.rec_algorithm == "RARE":
+            return imgW
         imgW = int((imgH * max_wh_ratio))
         if self.use_onnx:
             w = self.input_tensor.shape[3:][0]
@@ -240,6 +285,10 @@ class TextRecognizer(object):
                 pass
             elif w is not None and w > 0:
                 imgW = w
+        return imgW
+
+    def get_resized_width(self, img, imgW):
+        imgH = self.rec_image_shape[1]
         h, w = img.shape[:2]
         ratio = w / float(h)
         if math.ceil(imgH * ratio) > imgW:
@@ -247,17 +296,47 @@ class TextRecognizer(object):
         else:
             resized_w = int(math.ceil(imgH * ratio))
         if self.rec_algorithm == "RARE":
-            if resized_w > self.rec_image_shape[2]:
-                resized_w = self.rec_image_shape[2]
-            imgW = self.rec_image_shape[2]
-        resized_image = cv2.resize(img, (resized_w, imgH))
-        resized_image = resized_image.astype("float32")
-        resized_image = resized_image.transpose((2, 0, 1)) / 255
-        resized_image -= 0.5
-        resized_image /= 0.5
-        padding_im = np.zeros((imgC, imgH, imgW), dtype=np.float32)
-        padding_im[:, :, 0:resized_w] = resized_image
-        return padding_im
+            resized_w = min(resized_w, self.rec_image_shape[2])
+        return resized_w
+
+    def get_batch_buffer(self, batch_size, imgW):
+        """
+        Return a contiguous float32 view of shape (batch_size, C, H, imgW) into
+        a flat buffer that is reused across batches and only grows when a
+        batch needs more room, so steady-state preprocessing does not allocate.
+        The predictor copies its input, so the buffer may be overwritten as
+        soon as the batch has been run.
+        """
+        imgC, imgH = self.rec_image_shape[:2]
+        size = batch_size * imgC * imgH * imgW
+        if self.batch_buffer is None or self.batch_buffer.size < size:
+            self.batch_buffer = np.empty(size, dtype=np.float32)
+        return self.batch_buffer[:size].reshape(batch_size, imgC, imgH, imgW)
+
+    def resize_norm_img_batch(self, img_list, max_wh_ratio):
+        """
+        Equivalent to stacking resize_norm_img of every image, but each crop
+        is resized and normalized straight into the shared batch buffer.
+        """
+        imgC, imgH = self.rec_image_shape[:2]
+        imgW = self.get_padded_width(max_wh_ratio)
+        norm_img_batch = self.get_batch_buffer(len(img_list), imgW)
+        for ino, img in enumerate(img_list):
+            assert imgC == img.shape[2]
+            resized_w = self.get_resized_width(img, imgW)
+            resized_image = cv2.resize(img, (resized_w, imgH))
+            norm_img = norm_img_batch[ino, :, :, :resized_w]
+            np.divide(
+                resized_image.transpose((2, 0, 1)),
+                np.float32(255),
+                out=norm_img,
+                dtype=np.float32,
+                casting="unsafe",
+            )
+            norm_img -= 0.5
+            norm_img /= 0.5
+            norm_img_batch[ino, :, :, resized_w:] = 0
+        return norm_img_batch
 
     def resize_norm_img_vl(self, img, image_shape):
         imgC, imgH, imgW = image_shape
@@ -577,12 +656,22 @@ class TextRecognizer(object):
         # Sorting can speed up the recognition process
         indices = np.argsort(np.array(width_list))
         rec_res = [["", 0.0]] * img_num
-        batch_num = self.rec_batch_num
+        batch_ranges, self.padding_efficiency = get_batch_ranges(
+            np.array(width_list)[indices],
+            self.rec_batch_num,
+            self.rec_image_shape,
+            bucket=self.rec_bucket_batching,
+            max_batch_pixels=self.rec_max_batch_pixels,
+        )
+        logger.debug(
+            "rec batches num: {}, padding efficiency: {:.3f}".format(
+                len(batch_ranges), self.padding_efficiency
+            )
+        )
         st = time.time()
         if self.benchmark:
             self.autolog.times.start()
-        for beg_img_no in range(0, img_num, batch_num):
-            end_img_no = min(img_num, beg_img_no + batch_num)
+        for beg_img_no, end_img_no in batch_ranges:
             norm_img_batch = []
             if self.rec_algorithm == "SRN":
                 encoder_word_pos_list = []
@@ -599,89 +688,96 @@ class TextRecognizer(object):
                 wh_ratio = w * 1.0 / h
                 max_wh_ratio = max(max_wh_ratio, wh_ratio)
                 wh_ratio_list.append(wh_ratio)
-            for ino in range(beg_img_no, end_img_no):
-                if self.rec_algorithm == "SAR":
-                    norm_img, _, _, valid_ratio = self.resize_norm_img_sar(
-                        img_list[indices[ino]], self.rec_image_shape
-                    )
-                    norm_img = norm_img[np.newaxis, :]
-                    valid_ratio = np.expand_dims(valid_ratio, axis=0)
-                    valid_ratios.append(valid_ratio)
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm == "SRN":
-                    norm_img = self.process_image_srn(
-                        img_list[indices[ino]], self.rec_image_shape, 8, 25
-                    )
-                    encoder_word_pos_list.append(norm_img[1])
-                    gsrm_word_pos_list.append(norm_img[2])
-                    gsrm_slf_attn_bias1_list.append(norm_img[3])
-                    gsrm_slf_attn_bias2_list.append(norm_img[4])
-                    norm_img_batch.append(norm_img[0])
-                elif self.rec_algorithm in ["SVTR", "SATRN", "ParseQ", "CPPD"]:
-                    norm_img = self.resize_norm_img_svtr(
-                        img_list[indices[ino]], self.rec_image_shape
-                    )
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm in ["CPPDPadding"]:
-                    norm_img = self.resize_norm_img_cppd_padding(
-                        img_list[indices[ino]], self.rec_image_shape
-                    )
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm in ["VisionLAN", "PREN"]:
-                    norm_img = self.resize_norm_img_vl(
-                        img_list[indices[ino]], self.rec_image_shape
-                    )
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm == "SPIN":
-                    norm_img = self.resize_norm_img_spin(img_list[indices[ino]])
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm == "ABINet":
-                    norm_img = self.resize_norm_img_abinet(
-                        img_list[indices[ino]], self.rec_image_shape
-                    )
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm == "RobustScanner":
-                    norm_img, _, _, valid_ratio = self.resize_norm_img_sar(
-                        img_list[indices[ino]],
-                        self.rec_image_shape,
-                        width_downsample_ratio=0.25,
-                    )
-                    norm_img = norm_img[np.newaxis, :]
-                    valid_ratio = np.expand_dims(valid_ratio, axis=0)
-                    valid_ratios = []
-                    valid_ratios.append(valid_ratio)
-                    norm_img_batch.append(norm_img)
-                    word_positions_list = []
-                    word_positions = np.array(range(0, 40)).astype("int64")
-                    word_positions = np.expand_dims(word_positions, axis=0)
-                    word_positions_list.append(word_positions)
-                elif self.rec_algorithm == "CAN":
-                    norm_img = self.norm_img_can(img_list[indices[ino]], max_wh_ratio)
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                    norm_image_mask = np.ones(norm_img.shape, dtype="float32")
-                    word_label = np.ones([1, 36], dtype="int64")
-                    norm_img_mask_batch = []
-                    word_label_list = []
-                    norm_img_mask_batch.append(norm_image_mask)
-                    word_label_list.append(word_label)
-                elif self.rec_algorithm == "LaTeXOCR":
-                    norm_img = self.norm_img_latexocr(img_list[indices[ino]])
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                else:
-                    norm_img = self.resize_norm_img(
-                        img_list[indices[ino]], max_wh_ratio
-                    )
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-            norm_img_batch = np.concatenate(norm_img_batch)
-            norm_img_batch = norm_img_batch.copy()
+            if self.use_batch_buffer:
+                norm_img_batch = self.resize_norm_img_batch(
+                    [img_list[indices[ino]] for ino in range(beg_img_no, end_img_no)],
+                    max_wh_ratio,
+                )
+            else:
+                for ino in range(beg_img_no, end_img_no):
+                    if self.rec_algorithm == "SAR":
+                        norm_img, _, _, valid_ratio = self.resize_norm_img_sar(
+                            img_list[indices[ino]], self.rec_image_shape
+                        )
+                        norm_img = norm_img[np.newaxis, :]
+                        valid_ratio = np.expand_dims(valid_ratio, axis=0)
+                        valid_ratios.append(valid_ratio)
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm == "SRN":
+                        norm_img = self.process_image_srn(
+                            img_list[indices[ino]], self.rec_image_shape, 8, 25
+                        )
+                        encoder_word_pos_list.append(norm_img[1])
+                        gsrm_word_pos_list.append(norm_img[2])
+                        gsrm_slf_attn_bias1_list.append(norm_img[3])
+                        gsrm_slf_attn_bias2_list.append(norm_img[4])
+                        norm_img_batch.append(norm_img[0])
+                    elif self.rec_algorithm in ["SVTR", "SATRN", "ParseQ", "CPPD"]:
+                        norm_img = self.resize_norm_img_svtr(
+                            img_list[indices[ino]], self.rec_image_shape
+                        )
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm in ["CPPDPadding"]:
+                        norm_img = self.resize_norm_img_cppd_padding(
+                            img_list[indices[ino]], self.rec_image_shape
+                        )
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm in ["VisionLAN", "PREN"]:
+                        norm_img = self.resize_norm_img_vl(
+                            img_list[indices[ino]], self.rec_image_shape
+                        )
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm == "SPIN":
+                        norm_img = self.resize_norm_img_spin(img_list[indices[ino]])
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm == "ABINet":
+                        norm_img = self.resize_norm_img_abinet(
+                            img_list[indices[ino]], self.rec_image_shape
+                        )
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm == "RobustScanner":
+                        norm_img, _, _, valid_ratio = self.resize_norm_img_sar(
+                            img_list[indices[ino]],
+                            self.rec_image_shape,
+                            width_downsample_ratio=0.25,
+                        )
+                        norm_img = norm_img[np.newaxis, :]
+                        valid_ratio = np.expand_dims(valid_ratio, axis=0)
+                        valid_ratios = []
+                        valid_ratios.append(valid_ratio)
+                        norm_img_batch.append(norm_img)
+                        word_positions_list = []
+                        word_positions = np.array(range(0, 40)).astype("int64")
+                        word_positions = np.expand_dims(word_positions, axis=0)
+                        word_positions_list.append(word_positions)
+                    elif self.rec_algorithm == "CAN":
+                        norm_img = self.norm_img_can(
+                            img_list[indices[ino]], max_wh_ratio
+                        )
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                        norm_image_mask = np.ones(norm_img.shape, dtype="float32")
+                        word_label = np.ones([1, 36], dtype="int64")
+                        norm_img_mask_batch = []
+                        word_label_list = []
+                        norm_img_mask_batch.append(norm_image_mask)
+                        word_label_list.append(word_label)
+                    elif self.rec_algorithm == "LaTeXOCR":
+                        norm_img = self.norm_img_latexocr(img_list[indices[ino]])
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                    else:
+                        norm_img = self.resize_norm_img(
+                            img_list[indices[ino]], max_wh_ratio
+                        )
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                norm_img_batch = np.concatenate(norm_img_batch)
             if self.benchmark:
                 self.autolog.times.stamp()
 
@@ -849,6 +945,58 @@ class TextRecognizer(object):
         return rec_res, time.time() - st
 
 
+def get_batch_ranges(
+    wh_ratios, batch_num, rec_image_shape, bucket=False, max_batch_pixels=0
+):
+    """
+    Cut crops sorted by aspect ratio into recognition batches.
+    Without bucketing this is the fixed `batch_num` slicing. With bucketing,
+    crops are grouped into width buckets (<= W, <= 2W, <= 4W, ... where W is
+    the model input width) and a batch never crosses a bucket boundary, so a
+    single long line cannot drag short ones to its padded width; a batch is
+    additionally closed once batch size * padded width * H would exceed
+    `max_batch_pixels` (0 means no limit).
+    args:
+        wh_ratios(array): width / height of every crop, in ascending order
+        batch_num(int): maximum number of crops in one batch
+        rec_image_shape(list): [C, H, W] of the recognition model input
+    return:
+        list of (beg, end) ranges into the sorted crops, and the padding
+        efficiency, i.e. real pixels / padded pixels over all batches
+    """
+    imgC, imgH, imgW = rec_image_shape[:3]
+    img_num = len(wh_ratios)
+    # padded width of a batch whose widest crop is this one
+    widths = np.maximum(imgW, imgH * np.asarray(wh_ratios, dtype=np.float64))
+    bucket_ids = np.maximum(np.ceil(np.log2(widths / imgW)), 0).astype(np.int64)
+
+    batch_ranges = []
+    beg_img_no = 0
+    while beg_img_no < img_num:
+        end_img_no = beg_img_no + 1
+        while end_img_no < img_num and end_img_no - beg_img_no < batch_num:
+            if bucket:
+                if bucket_ids[end_img_no] != bucket_ids[beg_img_no]:
+                    break
+                batch_pixels = (end_img_no - beg_img_no + 1) * imgH * widths[end_img_no]
+                if max_batch_pixels > 0 and batch_pixels > max_batch_pixels:
+                    break
+            end_img_no += 1
+        batch_ranges.append((beg_img_no, end_img_no))
+        beg_img_no = end_img_no
+
+    real_pixels, padded_pixels = 0.0, 0.0
+    for beg_img_no, end_img_no in batch_ranges:
+        batch_width = int(widths[end_img_no - 1])
+        real_widths = np.minimum(
+            np.ceil(imgH * np.asarray(wh_ratios[beg_img_no:end_img_no])), batch_width
+        )
+        real_pixels += real_widths.sum()
+        padded_pixels += batch_width * (end_img_no - beg_img_no)
+    padding_efficiency = real_pixels / padded_pixels if padded_pixels > 0 else 1.0
+    return batch_ranges, padding_efficiency
+
+
 def main():
     config, logger = preprocess_infer()
     
@@ -883,10 +1031,18 @@ def main():
     args.rec_algorithm = rec_config.get("rec_algorithm", "SVTR_LCNet")
     args.rec_image_shape = rec_config.get("rec_image_shape", "3, 48, 320")
     args.rec_batch_num = rec_config.get("rec_batch_num", 6)
+    args.rec_bucket_batching = rec_config.get("rec_bucket_batching", False)
+    args.rec_max_batch_pixels = rec_config.get("rec_max_batch_pixels", 0)
     args.rec_char_dict_path = rec_config.get("rec_char_dict_path", "./ppocr/utils/ppocr_keys_v1.txt")
     args.use_space_char = rec_config.get("use_space_char", True)
     args.rec_image_inverse = rec_config.get("rec_image_inverse", True)
     args.max_text_length = rec_config.get("max_text_length", 25)
+    args.rec_decode_mode = rec_config.get("rec_decode_mode", "greedy")
+    args.rec_beam_width = rec_config.get("rec_beam_width", 10)
+    args.rec_beam_topk = rec_config.get("rec_beam_topk", 10)
+    args.rec_lm_path = rec_config.get("rec_lm_path", None)
+    args.rec_lm_weight = rec_config.get("rec_lm_weight", 0.5)
+    args.rec_lexicon_weight = rec_config.get("rec_lexicon_weight", 1.0)
     
     image_file_list = get_image_file_list(args.image_dir)
     valid_image_file_list = []
@@ -23,6 +23,7 @@ os.environ["FLAGS_allocator_strategy"] = "auto_growth"
 
 import cv2
 import copy
+import collections
 import numpy as np
 import json
 import time
@@ -34,14 +35,14 @@ import tools.infer.predict_det as predict_det
 import tools.infer.predict_cls as predict_cls
 from ppocr.utils.utility import get_image_file_list, check_and_read
 from ppocr.utils.logging import get_logger
+from ppocr.utils.reading_order import reading_order
 from tools.infer.utility import (
     draw_ocr_box_txt,
     get_rotate_crop_image,
     get_minarea_rect_crop,
-    slice_generator,
-    merge_fragmented,
     preprocess_infer,
 )
+from tools.infer.pipeline import StagePipeline
 
 logger = get_logger()
 
@@ -74,6 +75,40 @@ class TextSystem(object):
             logger.debug(f"{bno}, {rec_res[bno]}")
         self.crop_image_res_index += bbox_num
 
+    def _detect(self, img, slice={}):
+        if slice:
+            overlap = slice.get("overlap", 0)
+            dt_boxes, elapse = self.text_detector.predict_tiled(
+                img,
+                (slice["vertical_stride"], slice["horizontal_stride"]),
+                overlap=(overlap, overlap),
+                merge_thres=(slice["merge_x_thres"], slice["merge_y_thres"]),
+                maximum_slices=slice.get("maximum_slices", 500),
+            )
+        else:
+            dt_boxes, elapse = self.text_detector(img)
+        return dt_boxes, elapse
+
+    def _crop(self, ori_im, dt_boxes):
+        img_crop_list = []
+        for bno in range(len(dt_boxes)):
+            tmp_box = copy.deepcopy(dt_boxes[bno])
+            if self.args.det_box_type == "quad":
+                img_crop = get_rotate_crop_image(ori_im, tmp_box)
+            else:
+                img_crop = get_minarea_rect_crop(ori_im, tmp_box)
+            img_crop_list.append(img_crop)
+        return img_crop_list
+
+    def _filter(self, dt_boxes, rec_res):
+        filter_boxes, filter_rec_res = [], []
+        for box, rec_result in zip(dt_boxes, rec_res):
+            text, score = rec_result[0], rec_result[1]
+            if score >= self.drop_score:
+                filter_boxes.append(box)
+                filter_rec_res.append(rec_result)
+        return filter_boxes, filter_rec_res
+
     def __call__(self, img, cls=True, slice={}):
         time_dict = {"det": 0, "rec": 0, "cls": 0, "all": 0}
 
@@ -83,31 +118,7 @@ class TextSystem(object):
 
         start = time.time()
         ori_im = img.copy()
-        if slice:
-            slice_gen = slice_generator(
-                img,
-                horizontal_stride=slice["horizontal_stride"],
-                vertical_stride=slice["vertical_stride"],
-            )
-            elapsed = []
-            dt_slice_boxes = []
-            for slice_crop, v_start, h_start in slice_gen:
-                dt_boxes, elapse = self.text_detector(slice_crop, use_slice=True)
-                if dt_boxes.size:
-                    dt_boxes[:, :, 0] += h_start
-                    dt_boxes[:, :, 1] += v_start
-                    dt_slice_boxes.append(dt_boxes)
-                    elapsed.append(elapse)
-            dt_boxes = np.concatenate(dt_slice_boxes)
-
-            dt_boxes = merge_fragmented(
-                boxes=dt_boxes,
-                x_threshold=slice["merge_x_thres"],
-                y_threshold=slice["merge_y_thres"],
-            )
-            elapse = sum(elapsed)
-        else:
-            dt_boxes, elapse = self.text_detector(img)
+        dt_boxes, elapse = self._detect(img, slice)
 
         time_dict["det"] = elapse
 
@@ -120,17 +131,10 @@ class TextSystem(object):
             logger.debug(
                 "dt_boxes num : {}, elapsed : {}".format(len(dt_boxes), elapse)
             )
-        img_crop_list = []
 
         dt_boxes = sorted_boxes(dt_boxes)
+        img_crop_list = self._crop(ori_im, dt_boxes)
 
-        for bno in range(len(dt_boxes)):
-            tmp_box = copy.deepcopy(dt_boxes[bno])
-            if self.args.det_box_type == "quad":
-                img_crop = get_rotate_crop_image(ori_im, tmp_box)
-            else:
-                img_crop = get_minarea_rect_crop(ori_im, tmp_box)
-            img_crop_list.append(img_crop)
         if self.use_angle_cls and cls:
             img_crop_list, angle_list, elapse = self.text_classifier(img_crop_list)
             time_dict["cls"] = elapse
@@ -147,16 +151,156 @@ class TextSystem(object):
         logger.debug("rec_res num  : {}, elapsed : {}".format(len(rec_res), elapse))
         if self.args.save_crop_res:
             self.draw_crop_rec_res(self.args.crop_res_save_dir, img_crop_list, rec_res)
-        filter_boxes, filter_rec_res = [], []
-        for box, rec_result in zip(dt_boxes, rec_res):
-            text, score = rec_result[0], rec_result[1]
-            if score >= self.drop_score:
-                filter_boxes.append(box)
-                filter_rec_res.append(rec_result)
+        filter_boxes, filter_rec_res = self._filter(dt_boxes, rec_res)
         end = time.time()
         time_dict["all"] = end - start
         return filter_boxes, filter_rec_res, time_dict
 
+    def predict_batch(self, img_list, cls=True, slice={}):
+        """
+        Run the OCR system on several images at once. Without slicing, images
+        of the same detector input shape are detected in one batch, see
+        TextDetector.predict_batch. The crops of all images are pooled into
+        one queue so that cls and rec see full batches of similar aspect
+        ratio instead of one small batch per image.
+        args:
+            img_list(list): list of BGR images, None entries are allowed
+        return:
+            list of (filter_boxes, filter_rec_res, time_dict), one per image
+        """
+        results = [None] * len(img_list)
+        valid = [ino for ino, img in enumerate(img_list) if img is not None]
+        if slice:
+            det_res = [self._detect(img_list[ino].copy(), slice) for ino in valid]
+        else:
+            dt_boxes_list, elapse = self.text_detector.predict_batch(
+                [img_list[ino] for ino in valid]
+            )
+            # the batched det time is shared equally between the images
+            det_res = [(dt_boxes, elapse / len(valid)) for dt_boxes in dt_boxes_list]
+        det_res = dict(zip(valid, det_res))
+
+        all_crops, crop_owner, owner_boxes = [], [], {}
+        for ino, img in enumerate(img_list):
+            time_dict = {"det": 0, "rec": 0, "cls": 0, "all": 0}
+            if img is None:
+                logger.debug("no valid image provided")
+                results[ino] = (None, None, time_dict)
+                continue
+            start = time.time()
+            dt_boxes, elapse = det_res[ino]
+            time_dict["det"] = elapse
+            if dt_boxes is None:
+                logger.debug("no dt_boxes found, elapsed : {}".format(elapse))
+                time_dict["all"] = elapse + time.time() - start
+                results[ino] = (None, None, time_dict)
+                continue
+            dt_boxes = sorted_boxes(dt_boxes)
+            img_crop_list = self._crop(img, dt_boxes)
+            all_crops.extend(img_crop_list)
+            crop_owner.extend([ino] * len(img_crop_list))
+            owner_boxes[ino] = dt_boxes
+            time_dict["all"] = elapse + time.time() - start
+            results[ino] = (dt_boxes, None, time_dict)
+
+        crop_owner = np.array(crop_owner, dtype=np.int64)
+        cls_elapse, rec_elapse = 0, 0
+        if len(all_crops) > 0:
+            if self.use_angle_cls and cls:
+                all_crops, _, cls_elapse = self.text_classifier(all_crops)
+            rec_res, rec_elapse = self.text_recognizer(all_crops)
+            logger.debug(
+                "batch rec crops num: {}, images num: {}, elapsed : {}".format(
+                    len(all_crops), len(owner_boxes), rec_elapse
+                )
+            )
+            if self.args.save_crop_res:
+                self.draw_crop_rec_res(self.args.crop_res_save_dir, all_crops, rec_res)
+        else:
+            rec_res = []
+
+        # the shared cls/rec time is attributed to each image by crop count
+        crop_num = max(len(all_crops), 1)
+        for ino, dt_boxes in owner_boxes.items():
+            crop_idx = np.nonzero(crop_owner == ino)[0]
+            time_dict = results[ino][2]
+            time_dict["cls"] = cls_elapse * len(crop_idx) / crop_num
+            time_dict["rec"] = rec_elapse * len(crop_idx) / crop_num
+            time_dict["all"] += time_dict["cls"] + time_dict["rec"]
+            filter_boxes, filter_rec_res = self._filter(
+                dt_boxes, [rec_res[idx] for idx in crop_idx]
+            )
+            results[ino] = (filter_boxes, filter_rec_res, time_dict)
+        return results
+
+    def stream(self, images, cls=True, slice={}, queue_size=None):
+        """
+        Run the OCR system over an iterable of images as a pipeline. det, crop,
+        cls and rec each run in their own worker thread with bounded queues in
+        between, so the pre/post-processing of one image overlaps the inference
+        of its neighbours.
+        args:
+            images(iterable): BGR images, may be a lazy generator
+            queue_size(int): capacity of each stage queue, defaults to
+                Global.stream_queue_size
+        return:
+            generator of (filter_boxes, filter_rec_res, time_dict), in input order
+        """
+        if queue_size is None:
+            queue_size = getattr(self.args, "stream_queue_size", 2)
+
+        def det_stage(img):
+            time_dict = {"det": 0, "rec": 0, "cls": 0, "all": 0}
+            state = {"time_dict": time_dict, "img": img, "dt_boxes": None}
+            if img is None:
+                logger.debug("no valid image provided")
+                return state
+            start = time.time()
+            dt_boxes, elapse = self._detect(img.copy(), slice)
+            time_dict["det"] = elapse
+            time_dict["all"] += time.time() - start
+            state["dt_boxes"] = dt_boxes
+            return state
+
+        def crop_stage(state):
+            if state["dt_boxes"] is None:
+                return state
+            start = time.time()
+            state["dt_boxes"] = sorted_boxes(state["dt_boxes"])
+            state["crops"] = self._crop(state["img"], state["dt_boxes"])
+            state["time_dict"]["all"] += time.time() - start
+            return state
+
+        def cls_stage(state):
+            if state["dt_boxes"] is None or len(state["crops"]) == 0:
+                return state
+            start = time.time()
+            state["crops"], _, elapse = self.text_classifier(state["crops"])
+            state["time_dict"]["cls"] = elapse
+            state["time_dict"]["all"] += time.time() - start
+            return state
+
+        def rec_stage(state):
+            time_dict = state["time_dict"]
+            if state["dt_boxes"] is None:
+                return None, None, time_dict
+            start = time.time()
+            rec_res, elapse = self.text_recognizer(state["crops"])
+            time_dict["rec"] = elapse
+            if self.args.save_crop_res:
+                self.draw_crop_rec_res(
+                    self.args.crop_res_save_dir, state["crops"], rec_res
+                )
+            filter_boxes, filter_rec_res = self._filter(state["dt_boxes"], rec_res)
+            time_dict["all"] += time.time() - start
+            return filter_boxes, filter_rec_res, time_dict
+
+        stages = [("det", det_stage), ("crop", crop_stage)]
+        if self.use_angle_cls and cls:
+            stages.append(("cls", cls_stage))
+        stages.append(("rec", rec_stage))
+        return StagePipeline(stages, queue_size=queue_size).run(images)
+
 
 def sorted_boxes(dt_boxes):
     """
@@ -166,36 +310,23 @@ def sorted_boxes(dt_boxes):
     return:
         sorted boxes(array) with shape [4, 2]
     """
-    num_boxes = dt_boxes.shape[0]
-    sorted_boxes = sorted(dt_boxes, key=lambda x: (x[0][1], x[0][0]))
-    _boxes = list(sorted_boxes)
-
-    for i in range(num_boxes - 1):
-        for j in range(i, -1, -1):
-            if abs(_boxes[j + 1][0][1] - _boxes[j][0][1]) < 10 and (
-                _boxes[j + 1][0][0] < _boxes[j][0][0]
-            ):
-                tmp = _boxes[j]
-                _boxes[j] = _boxes[j + 1]
-                _boxes[j + 1] = tmp
-            else:
-                break
-    return _boxes
+    order, _ = reading_order(dt_boxes)
+    return [dt_boxes[i] for i in order]
 
 
 def main():
     config, logger = preprocess_infer()
-    
+
     # 创建一个args对象，用于兼容现有的TextSystem接口
     class Args:
         pass
-    
+
     args = Args()
     global_config = config["Global"]
     det_config = config.get("Det", {})
     rec_config = config.get("Rec", {})
     cls_config = config.get("Cls", {})
-    
+
     # 全局参数
     args.image_dir = global_config.get("image_dir", "./")
     args.use_gpu = global_config.get("use_gpu", True)
@@ -215,14 +346,21 @@ def main():
     args.warmup = global_config.get("warmup", False)
     args.drop_score = global_config.get("drop_score", 0.5)
     args.vis_font_path = global_config.get("vis_font_path", "./doc/fonts/simfang.ttf")
-    args.draw_img_save_dir = global_config.get("draw_img_save_dir", "./inference_results/")
+    args.draw_img_save_dir = global_config.get(
+        "draw_img_save_dir", "./inference_results/"
+    )
     args.save_crop_res = global_config.get("save_crop_res", False)
     args.crop_res_save_dir = global_config.get("crop_res_save_dir", "./output/")
     args.process_id = global_config.get("process_id", 0)
     args.total_process_num = global_config.get("total_process_num", 1)
     args.page_num = global_config.get("page_num", 0)
+    args.pdf_dpi = global_config.get("pdf_dpi", None)
+    args.pdf_render_workers = global_config.get("pdf_render_workers", 1)
     args.show_log = global_config.get("show_log", True)
-    
+    args.image_batch_num = global_config.get("image_batch_num", 1)
+    args.use_stream = global_config.get("use_stream", False)
+    args.stream_queue_size = global_config.get("stream_queue_size", 2)
+
     # 检测模型参数
     args.det_model_dir = det_config.get("det_model_dir", "")
     args.det_algorithm = det_config.get("det_algorithm", "DB")
@@ -234,6 +372,9 @@ def main():
     args.det_db_unclip_ratio = det_config.get("det_db_unclip_ratio", 1.5)
     args.use_dilation = det_config.get("use_dilation", False)
     args.det_db_score_mode = det_config.get("det_db_score_mode", "fast")
+    args.det_db_vectorized = det_config.get("det_db_vectorized", False)
+    args.det_batch_num = det_config.get("det_batch_num", 1)
+    args.det_tile_batch_size = det_config.get("det_tile_batch_size", 8)
     # EAST算法参数
     args.det_east_score_thresh = det_config.get("det_east_score_thresh", 0.8)
     args.det_east_cover_thresh = det_config.get("det_east_cover_thresh", 0.1)
@@ -251,24 +392,34 @@ def main():
     args.alpha = det_config.get("alpha", 1.0)
     args.beta = det_config.get("beta", 1.0)
     args.fourier_degree = det_config.get("fourier_degree", 5)
-    
+
     # 识别模型参数
     args.rec_model_dir = rec_config.get("rec_model_dir", "")
     args.rec_algorithm = rec_config.get("rec_algorithm", "SVTR_LCNet")
     args.rec_image_shape = rec_config.get("rec_image_shape", "3, 48, 320")
     args.rec_batch_num = rec_config.get("rec_batch_num", 6)
-    args.rec_char_dict_path = rec_config.get("rec_char_dict_path", "./ppocr/utils/ppocr_keys_v1.txt")
+    args.rec_bucket_batching = rec_config.get("rec_bucket_batching", False)
+    args.rec_max_batch_pixels = rec_config.get("rec_max_batch_pixels", 0)
+    args.rec_char_dict_path = rec_config.get(
+        "rec_char_dict_path", "./ppocr/utils/ppocr_keys_v1.txt"
+    )
     args.use_space_char = rec_config.get("use_space_char", True)
     args.rec_image_inverse = rec_config.get("rec_image_inverse", True)
     args.max_text_length = rec_config.get("max_text_length", 25)
-    
+    args.rec_decode_mode = rec_config.get("rec_decode_mode", "greedy")
+    args.rec_beam_width = rec_config.get("rec_beam_width", 10)
+    args.rec_beam_topk = rec_config.get("rec_beam_topk", 10)
+    args.rec_lm_path = rec_config.get("rec_lm_path", None)
+    args.rec_lm_weight = rec_config.get("rec_lm_weight", 0.5)
+    args.rec_lexicon_weight = rec_config.get("rec_lexicon_weight", 1.0)
+
     # 角度分类器参数
     args.use_angle_cls = cls_config.get("use_angle_cls", False)
     args.cls_model_dir = cls_config.get("cls_model_dir", "")
     args.cls_image_shape = cls_config.get("cls_image_shape", "3, 48, 192")
     args.cls_batch_num = cls_config.get("cls_batch_num", 6)
     args.cls_thresh = cls_config.get("cls_thresh", 0.9)
-    
+
     image_file_list = get_image_file_list(args.image_dir)
     image_file_list = image_file_list[args.process_id :: args.total_process_num]
     text_sys = TextSystem(args)
@@ -294,93 +445,143 @@ def main():
     cpu_mem, gpu_mem, gpu_util = 0, 0, 0
     _st = time.time()
     count = 0
-    for idx, image_file in enumerate(image_file_list):
-        img, flag_gif, flag_pdf = check_and_read(image_file)
-        if not flag_gif and not flag_pdf:
-            img = cv2.imread(image_file)
-        if not flag_pdf:
-            if img is None:
-                logger.debug("error in loading image:{}".format(image_file))
-                continue
-            imgs = [img]
+
+    def save_result(image_file, idx, index, page_cnt, img, dt_boxes, rec_res, elapse):
+        if page_cnt > 1:
+            logger.debug(
+                str(idx)
+                + "_"
+                + str(index)
+                + "  Predict time of %s: %.3fs" % (image_file, elapse)
+            )
         else:
-            page_num = args.page_num
-            if page_num > len(img) or page_num == 0:
-                page_num = len(img)
-            imgs = img[:page_num]
-        for index, img in enumerate(imgs):
-            starttime = time.time()
-            dt_boxes, rec_res, time_dict = text_sys(img)
-            elapse = time.time() - starttime
-            total_time += elapse
-            if len(imgs) > 1:
-                logger.debug(
-                    str(idx)
-                    + "_"
-                    + str(index)
-                    + "  Predict time of %s: %.3fs" % (image_file, elapse)
-                )
+            logger.debug(
+                str(idx) + "  Predict time of %s: %.3fs" % (image_file, elapse)
+            )
+        for text, score in rec_res:
+            logger.debug("{}, {:.3f}".format(text, score))
+
+        res = [
+            {
+                "transcription": rec_res[i][0],
+                "points": np.array(dt_boxes[i]).astype(np.int32).tolist(),
+            }
+            for i in range(len(dt_boxes))
+        ]
+        if page_cnt > 1:
+            save_pred = (
+                os.path.basename(image_file)
+                + "_"
+                + str(index)
+                + "\t"
+                + json.dumps(res, ensure_ascii=False)
+                + "\n"
+            )
+        else:
+            save_pred = (
+                os.path.basename(image_file)
+                + "\t"
+                + json.dumps(res, ensure_ascii=False)
+                + "\n"
+            )
+        save_results.append(save_pred)
+
+        if is_visualize:
+            image = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+            boxes = dt_boxes
+            txts = [rec_res[i][0] for i in range(len(rec_res))]
+            scores = [rec_res[i][1] for i in range(len(rec_res))]
+
+            draw_img = draw_ocr_box_txt(
+                image,
+                boxes,
+                txts,
+                scores,
+                drop_score=drop_score,
+                font_path=font_path,
+            )
+            if image_file.lower().endswith("gif"):
+                save_file = image_file[:-3] + "png"
+            elif image_file.lower().endswith("pdf"):
+                save_file = image_file.replace(".pdf", "_" + str(index) + ".png")
             else:
-                logger.debug(
-                    str(idx) + "  Predict time of %s: %.3fs" % (image_file, elapse)
-                )
-            for text, score in rec_res:
-                logger.debug("{}, {:.3f}".format(text, score))
-
-            res = [
-                {
-                    "transcription": rec_res[i][0],
-                    "points": np.array(dt_boxes[i]).astype(np.int32).tolist(),
-                }
-                for i in range(len(dt_boxes))
-            ]
-            if len(imgs) > 1:
-                save_pred = (
-                    os.path.basename(image_file)
-                    + "_"
-                    + str(index)
-                    + "\t"
-                    + json.dumps(res, ensure_ascii=False)
-                    + "\n"
+                save_file = image_file
+            cv2.imwrite(
+                os.path.join(draw_img_save_dir, os.path.basename(save_file)),
+                draw_img[:, :, ::-1],
+            )
+            logger.debug(
+                "The visualized image saved in {}".format(
+                    os.path.join(draw_img_save_dir, os.path.basename(save_file))
                 )
+            )
+
+    # pages waiting for a cross-image batch, see Global.image_batch_num
+    pending = []
+
+    def flush_pending():
+        if len(pending) == 0:
+            return 0
+        starttime = time.time()
+        results = text_sys.predict_batch([item[-1] for item in pending])
+        elapse = time.time() - starttime
+        for item, (dt_boxes, rec_res, time_dict) in zip(pending, results):
+            if dt_boxes is None:
+                dt_boxes, rec_res = [], []
+            save_result(*item, dt_boxes, rec_res, time_dict["all"])
+        pending.clear()
+        return elapse
+
+    def iter_pages():
+        for idx, image_file in enumerate(image_file_list):
+            img, flag_gif, flag_pdf = check_and_read(
+                image_file, dpi=args.pdf_dpi, num_workers=args.pdf_render_workers
+            )
+            if not flag_gif and not flag_pdf:
+                img = cv2.imread(image_file)
+            if not flag_pdf:
+                if img is None:
+                    logger.debug("error in loading image:{}".format(image_file))
+                    continue
+                imgs = [img]
             else:
-                save_pred = (
-                    os.path.basename(image_file)
-                    + "\t"
-                    + json.dumps(res, ensure_ascii=False)
-                    + "\n"
-                )
-            save_results.append(save_pred)
-
-            if is_visualize:
-                image = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-                boxes = dt_boxes
-                txts = [rec_res[i][0] for i in range(len(rec_res))]
-                scores = [rec_res[i][1] for i in range(len(rec_res))]
-
-                draw_img = draw_ocr_box_txt(
-                    image,
-                    boxes,
-                    txts,
-                    scores,
-                    drop_score=drop_score,
-                    font_path=font_path,
-                )
-                if flag_gif:
-                    save_file = image_file[:-3] + "png"
-                elif flag_pdf:
-                    save_file = image_file.replace(".pdf", "_" + str(index) + ".png")
-                else:
-                    save_file = image_file
-                cv2.imwrite(
-                    os.path.join(draw_img_save_dir, os.path.basename(save_file)),
-                    draw_img[:, :, ::-1],
-                )
-                logger.debug(
-                    "The visualized image saved in {}".format(
-                        os.path.join(draw_img_save_dir, os.path.basename(save_file))
-                    )
-                )
+                page_num = args.page_num
+                if page_num > len(img) or page_num == 0:
+                    page_num = len(img)
+                imgs = img[:page_num]
+            for index, img in enumerate(imgs):
+                yield image_file, idx, index, len(imgs), img
+
+    if args.use_stream:
+        # pages are read lazily by the pipeline's input thread, their
+        # metadata is queued here and consumed in the same order
+        page_infos = collections.deque()
+
+        def stream_inputs():
+            for item in iter_pages():
+                page_infos.append(item)
+                yield item[-1]
+
+        starttime = time.time()
+        for dt_boxes, rec_res, time_dict in text_sys.stream(stream_inputs()):
+            item = page_infos.popleft()
+            if dt_boxes is None:
+                dt_boxes, rec_res = [], []
+            save_result(*item, dt_boxes, rec_res, time_dict["all"])
+        total_time += time.time() - starttime
+    else:
+        for item in iter_pages():
+            if args.image_batch_num > 1:
+                pending.append(item)
+                if len(pending) >= args.image_batch_num:
+                    total_time += flush_pending()
+                continue
+            starttime = time.time()
+            dt_boxes, rec_res, time_dict = text_sys(item[-1])
+            elapse = time.time() - starttime
+            total_time += elapse
+            save_result(*item, dt_boxes, rec_res, elapse)
+        total_time += flush_pending()
 
     logger.info("The predict total time is {}".format(time.time() - _st))
     if args.benchmark:
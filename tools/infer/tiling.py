@@ -0,0 +1,197 @@
+# Copyright (c) 2025 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tiling of large images for text detection.
+
+`make_tiles` cuts an image into overlapping tiles of one shape, so that they
+can be stacked into a single predictor batch, and `fuse_boxes` joins the
+boxes found in all tiles in one pass: duplicates from the overlaps and text
+lines cut by a tile border are merged through a grid hash of the box extents
+and a connected-components labelling, instead of pairwise comparisons.
+"""
+
+import math
+
+import numpy as np
+
+__all__ = ["make_tiles", "fuse_boxes"]
+
+
+def _tile_starts(length, tile, overlap, maximum_slices, axis):
+    if length <= tile:
+        return np.zeros(1, dtype=np.int64), length
+    step = max(tile - overlap, 1)
+    num = int(math.ceil((length - tile) / step)) + 1
+    if num >= maximum_slices:
+        raise ValueError(
+            "Too computationally expensive with {} {} slices, try a larger "
+            "tile or a smaller overlap".format(num, axis)
+        )
+    # the last tile is moved back to end at the border, so all have one shape
+    return np.minimum(np.arange(num, dtype=np.int64) * step, length - tile), tile
+
+
+def make_tiles(
+    image_h,
+    image_w,
+    tile_h,
+    tile_w,
+    overlap_h=0,
+    overlap_w=0,
+    maximum_slices=500,
+):
+    """
+    Cover an image_h x image_w image with tiles of tile_h x tile_w (clipped to
+    the image size) that overlap by at least overlap_h / overlap_w pixels.
+    Returns an int64 array of shape (N, 4) holding (y0, x0, y1, x1).
+    """
+    assert tile_h > 0 and tile_w > 0, "tile size should be greater than 0"
+    ys, tile_h = _tile_starts(image_h, tile_h, overlap_h, maximum_slices, "vertical")
+    xs, tile_w = _tile_starts(image_w, tile_w, overlap_w, maximum_slices, "horizontal")
+    ys, xs = np.meshgrid(ys, xs, indexing="ij")
+    ys, xs = ys.reshape(-1), xs.reshape(-1)
+    return np.stack([ys, xs, ys + tile_h, xs + tile_w], axis=1)
+
+
+def _box_extents(boxes):
+    if isinstance(boxes, np.ndarray) and boxes.ndim == 3:
+        return np.concatenate([boxes.min(axis=1), boxes.max(axis=1)], axis=1)
+    return np.array(
+        [np.concatenate([np.min(box, axis=0), np.max(box, axis=0)]) for box in boxes],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+
+
+def _candidate_pairs(extents, x_threshold, y_threshold):
+    """
+    Pairs (i, j), i < j, of boxes that share a cell of a uniform grid after
+    growing every box by the thresholds to the right and bottom.
+    """
+    num = len(extents)
+    heights = extents[:, 3] - extents[:, 1]
+    cell = max(2.0 * float(np.median(heights)), x_threshold, y_threshold, 16.0)
+    origin = extents[:, :2].min(axis=0)
+    cx0 = np.floor((extents[:, 0] - origin[0]) / cell).astype(np.int64)
+    cy0 = np.floor((extents[:, 1] - origin[1]) / cell).astype(np.int64)
+    cx1 = np.floor((extents[:, 2] + x_threshold - origin[0]) / cell).astype(np.int64)
+    cy1 = np.floor((extents[:, 3] + y_threshold - origin[1]) / cell).astype(np.int64)
+    ncx, ncy = cx1 - cx0 + 1, cy1 - cy0 + 1
+    counts = ncx * ncy
+
+    # one (cell, box) entry for every cell a box covers
+    box_ids = np.repeat(np.arange(num), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    row_len = np.repeat(ncx, counts)
+    cell_x = np.repeat(cx0, counts) + offsets % row_len
+    cell_y = np.repeat(cy0, counts) + offsets // row_len
+    keys = cell_y * (int(cx1.max()) + 1) + cell_x
+    order = np.lexsort((box_ids, keys))
+    keys, box_ids = keys[order], box_ids[order]
+
+    # entries of one cell are contiguous, pair every entry with the ones after it
+    pairs = []
+    for dist in range(1, len(keys)):
+        same = keys[dist:] == keys[:-dist]
+        if not same.any():
+            break
+        pairs.append(box_ids[:-dist][same] * num + box_ids[dist:][same])
+    if len(pairs) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    pairs = np.unique(np.concatenate(pairs))
+    return pairs // num, pairs % num
+
+
+def _connected_components(num, first, second):
+    """Label every node with the smallest node index of its component."""
+    labels = np.arange(num)
+    while len(first) > 0:
+        low = np.minimum(labels[first], labels[second])
+        new_labels = labels.copy()
+        np.minimum.at(new_labels, labels[first], low)
+        np.minimum.at(new_labels, labels[second], low)
+        # pointer jumping until every node points at a root
+        while True:
+            jumped = new_labels[new_labels]
+            if np.array_equal(jumped, new_labels):
+                break
+            new_labels = jumped
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    return labels
+
+
+def fuse_boxes(boxes, x_threshold=10, y_threshold=10, contain_thresh=0.7):
+    """
+    Merge boxes detected in different tiles. Two boxes are joined when the
+    smaller one lies at least `contain_thresh` inside the other (the same text
+    seen by two overlapping tiles), or when their top and bottom edges are
+    within `y_threshold` and the horizontal gap between them is at most
+    `x_threshold` (one text line cut by a tile border). Joined groups become
+    the axis aligned rectangle around them, other boxes are kept unchanged.
+    """
+    num = len(boxes)
+    if num == 0:
+        return np.zeros((0, 4, 2), dtype=np.float32)
+    extents = _box_extents(boxes)
+    first, second = _candidate_pairs(extents, x_threshold, y_threshold)
+    if len(first) > 0:
+        a, b = extents[first], extents[second]
+        inter_w = np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0])
+        inter_h = np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1])
+        inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+        area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+        area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+        contained = inter >= contain_thresh * np.maximum(
+            np.minimum(area_a, area_b), 1e-6
+        )
+        gap = np.maximum(a[:, 0] - b[:, 2], b[:, 0] - a[:, 2])
+        same_line = (
+            (np.abs(a[:, 1] - b[:, 1]) <= y_threshold)
+            & (np.abs(a[:, 3] - b[:, 3]) <= y_threshold)
+            & (gap <= x_threshold)
+        )
+        merge = contained | same_line
+        first, second = first[merge], second[merge]
+    labels = _connected_components(num, first, second)
+
+    roots, inverse, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    x0 = np.full(len(roots), np.inf)
+    y0 = np.full(len(roots), np.inf)
+    x1 = np.full(len(roots), -np.inf)
+    y1 = np.full(len(roots), -np.inf)
+    np.minimum.at(x0, inverse, extents[:, 0])
+    np.minimum.at(y0, inverse, extents[:, 1])
+    np.maximum.at(x1, inverse, extents[:, 2])
+    np.maximum.at(y1, inverse, extents[:, 3])
+
+    fused = []
+    for rno, root in enumerate(roots):
+        if sizes[rno] == 1:
+            fused.append(np.asarray(boxes[root], dtype=np.float32))
+        else:
+            fused.append(
+                np.array(
+                    [
+                        [x0[rno], y0[rno]],
+                        [x1[rno], y0[rno]],
+                        [x1[rno], y1[rno]],
+                        [x0[rno], y1[rno]],
+                    ],
+                    dtype=np.float32,
+                )
+            )
+    if all(box.shape == fused[0].shape for box in fused):
+        return np.array(fused, dtype=np.float32)
+    return fused
@@ -32,12 +32,13 @@ import copy
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
 
 from ppocr.utils.stats import TrainingStats
-from ppocr.utils.save_load import save_model
+from ppocr.utils.save_load import CheckpointWriter, prune_checkpoints, save_model
 from ppocr.utils.utility import print_dict, AverageMeter
 from ppocr.utils.logging import get_logger
 from ppocr.utils.loggers import WandbLogger, Loggers
 from ppocr.utils import profiler
 from ppocr.data import build_dataloader
+from ppocr.data.ratio_sampler import RatioBatchSampler
 from ppocr.utils.export_model import export
 
 
@@ -240,6 +241,8 @@ def train(
     save_model_dir = config["Global"]["save_model_dir"]
     if not os.path.exists(save_model_dir):
         os.makedirs(save_model_dir)
+    checkpoint_writer = CheckpointWriter(config["Global"].get("async_save", True))
+    max_checkpoints = config["Global"].get("max_checkpoints", None)
     main_indicator = eval_class.main_indicator
     best_model_dict = {main_indicator: 0}
     best_model_dict.update(pre_best_model_dict)
@@ -308,6 +311,8 @@ def train(
                 if platform.system() == "Windows"
                 else len(train_dataloader)
             )
+        elif isinstance(train_dataloader.batch_sampler, RatioBatchSampler):
+            train_dataloader.batch_sampler.set_epoch(epoch)
 
         for idx, batch in enumerate(train_dataloader):
             model.train()
@@ -549,6 +554,7 @@ def train(
                         best_model_dict=best_model_dict,
                         epoch=epoch,
                         global_step=global_step,
+                        writer=checkpoint_writer,
                     )
                 best_str = "best metric, {}".format(
                     ", ".join(
@@ -568,6 +574,8 @@ def train(
                         step=global_step,
                     )
 
+                    # the loggers read the checkpoint files
+                    checkpoint_writer.wait()
                     log_writer.log_model(
                         is_best=True, prefix="best_accuracy", metadata=best_model_dict
                     )
@@ -597,9 +605,11 @@ def train(
                 best_model_dict=best_model_dict,
                 epoch=epoch,
                 global_step=global_step,
+                writer=checkpoint_writer,
             )
 
             if log_writer is not None:
+                checkpoint_writer.wait()
                 log_writer.log_model(is_best=False, prefix="latest")
 
         if dist.get_rank() == 0 and epoch > 0 and epoch % save_epoch_step == 0:
@@ -627,8 +637,14 @@ def train(
                 epoch=epoch,
                 global_step=global_step,
                 done_flag=epoch == config["Global"]["epoch_num"],
+                writer=checkpoint_writer,
             )
+            if max_checkpoints:
+                checkpoint_writer.submit(
+                    [(prune_checkpoints, (save_model_dir, max_checkpoints))]
+                )
             if log_writer is not None:
+                checkpoint_writer.wait()
                 log_writer.log_model(
                     is_best=False, prefix="iter_epoch_{}".format(epoch)
                 )
@@ -637,6 +653,7 @@ def train(
         ", ".join(["{}: {}".format(k, v) for k, v in best_model_dict.items()])
     )
     logger.info(best_str)
+    checkpoint_writer.wait()
     if dist.get_rank() == 0 and log_writer is not None:
         log_writer.close()
     return